@@ -0,0 +1,183 @@
+def CST_elemArrays(xnode, ynode, conn):
+  """
+  Gather the node locations of every CST element.
+  Usage - [xElem, yElem] = CST_elemArrays(xnode, ynode, conn)
+  Returns two nElem x 3 arrays.
+  """
+  from numpy import asarray
+  from ..common.helpers import connArray
+
+  connArr, index = connArray(conn)
+  return [asarray(xnode, dtype=float)[connArr], asarray(ynode, dtype=float)[connArr]]
+
+def CST_JBatch(xnode, ynode, conn):
+  """
+  Jacobian of every CST element (constant over each element).
+  Usage - J = CST_JBatch(xnode, ynode, conn)
+  Returns an nElem x 2 x 2 array, J = [[dx/dxi, dy/dxi], [dx/deta, dy/deta]] as in CST_J.
+  """
+  from numpy import zeros
+  [xElem, yElem] = CST_elemArrays(xnode, ynode, conn)
+
+  J = zeros((len(xElem), 2, 2))
+  J[:, 0, 0] = xElem[:, 1] - xElem[:, 0]
+  J[:, 0, 1] = yElem[:, 1] - yElem[:, 0]
+  J[:, 1, 0] = xElem[:, 2] - xElem[:, 0]
+  J[:, 1, 1] = yElem[:, 2] - yElem[:, 0]
+  return J
+
+def CST_areaBatch(xnode, ynode, conn):
+  """
+  Area of every CST element.
+  Usage - A = CST_areaBatch(xnode, ynode, conn)
+  Returns an nElem array.  Areas are positive for counter-clockwise elements.
+  """
+  J = CST_JBatch(xnode, ynode, conn)
+  return (J[:, 0, 0]*J[:, 1, 1] - J[:, 0, 1]*J[:, 1, 0])/2
+
+def CST_BBatch(xnode, ynode, conn, type2D='planeStress'):
+  """
+  B matrix of every CST element.
+  Usage - B = CST_BBatch(xnode, ynode, conn, type2D)
+  ---------
+    Input
+  ---------
+  xnode - (list or array) x locations of all nodes
+  ynode - (list or array) y locations of all nodes
+  conn - (list of lists or nElem x 3 array) connectivity of CST elements
+  type2D - (string) "planeStress", "planeStrain", "axisymmetric", or "diffusion"
+  ----------
+    Output
+  ----------
+  B - (nElem x nStrain x 3*nDOF array):
+      3 x 6 for planeStress and planeStrain (same layout as CST_B)
+      4 x 6 for axisymmetric, evaluated at the centroid
+      2 x 3 for diffusion
+  """
+  from numpy import linalg, zeros
+  from .CST_shapeFunctions import CST_shapeDerivatives
+
+  J = CST_JBatch(xnode, ynode, conn)
+  dpsidxy = linalg.inv(J) @ CST_shapeDerivatives(1/3, 1/3)
+  nElem = len(J)
+
+  if (type2D == 'axisymmetric'):
+    [xElem, yElem] = CST_elemArrays(xnode, ynode, conn)
+    r = xElem.mean(axis=1)
+    B = zeros((nElem, 4, 6))
+    B[:, 0, 0::2] = dpsidxy[:, 0]
+    B[:, 1, 1::2] = dpsidxy[:, 1]
+    B[:, 2, 0::2] = 1/3 / r[:, None]
+    B[:, 3, 0::2] = dpsidxy[:, 1]
+    B[:, 3, 1::2] = dpsidxy[:, 0]
+  elif (type2D == 'diffusion'):
+    B = dpsidxy
+  else:
+    B = zeros((nElem, 3, 6))
+    B[:, 0, 0::2] = dpsidxy[:, 0]
+    B[:, 1, 1::2] = dpsidxy[:, 1]
+    B[:, 2, 0::2] = dpsidxy[:, 1]
+    B[:, 2, 1::2] = dpsidxy[:, 0]
+  return B
+
+def CST_stiffnessBatch(xnode, ynode, conn, D, thickness=None, type2D='planeStress'):
+  """
+  Stiffness matrix of every CST element.
+  Usage - kElem = CST_stiffnessBatch(xnode, ynode, conn, D, thickness, type2D)
+  K = A * t * B^T D B, with t = 2*pi*r at the centroid for axisymmetric elements.
+  ---------
+    Input
+  ---------
+  xnode - (list or array) x locations of all nodes
+  ynode - (list or array) y locations of all nodes
+  conn - (list of lists or nElem x 3 array) connectivity of CST elements
+  D - (array) constituitive matrix (or nElem x D for per-element properties)
+  thickness - (float or nElem array) thickness of elements in third dimension
+              (ignored for axisymmetric)
+  type2D - (string) "planeStress", "planeStrain", "axisymmetric", or "diffusion"
+  ----------
+    Output
+  ----------
+  kElem - (nElem x 3*nDOF x 3*nDOF array) element stiffness matrices, in the order of conn
+  """
+  from numpy import asarray, pi
+
+  B = CST_BBatch(xnode, ynode, conn, type2D)
+  A = CST_areaBatch(xnode, ynode, conn)
+  if (type2D == 'axisymmetric'):
+    [xElem, yElem] = CST_elemArrays(xnode, ynode, conn)
+    thickness = 2*pi*xElem.mean(axis=1)
+  scale = A * asarray(thickness, dtype=float)
+  return B.transpose(0, 2, 1) @ asarray(D, dtype=float) @ B * scale[:, None, None]
+
+def CST_strainBatch(xnode, ynode, conn, u, type2D='planeStress'):
+  """
+  Strain (or temperature gradient for diffusion) in every CST element.
+  Usage - eps = CST_strainBatch(xnode, ynode, conn, u, type2D)
+  u - (list or array) solution at all nodes, [u1, v1, u2, v2, ...] or [T1, T2, ...]
+  Returns an nElem x nStrain array, e.g. [epsx, epsy, gammaxy] for each element.
+  """
+  from numpy import asarray
+  from ..common.assemble import elemDOFs
+  from ..common.nDOF import nDOF as numDOF
+
+  B = CST_BBatch(xnode, ynode, conn, type2D)
+  uElem = asarray(u, dtype=float)[elemDOFs(conn, numDOF(type2D))]
+  return (B @ uElem[:, :, None])[:, :, 0]
+
+def CST_stressBatch(xnode, ynode, conn, u, D, type2D='planeStress', output=None):
+  """
+  Stress (or D times the temperature gradient for diffusion) in every CST element.
+  Usage - sigma = CST_stressBatch(xnode, ynode, conn, u, D, type2D, output)
+  ---------
+    Input
+  ---------
+  u - (list or array) solution at all nodes
+  D - (array) constituitive matrix (or nElem x D for per-element properties)
+  output - (string) None for the full stress vector of each element, or one of:
+      'VM' - von Mises stress
+      'sigx', 'sigy', or 'tauxy' - normal stress in x or y, or shear stress
+      'sig1' or 'sig2' - maximum or minimum principal stress
+      'qx' or 'qy' - components of D @ grad(T) for diffusion (as in LST_stress)
+  ----------
+    Output
+  ----------
+  sigma - (nElem x nStrain array) or (nElem array) for a single output
+  """
+  from numpy import asarray, sqrt, zeros
+
+  D = asarray(D, dtype=float)
+  eps = CST_strainBatch(xnode, ynode, conn, u, type2D)
+  sig = (D @ eps[:, :, None])[:, :, 0]
+  if (output == None):
+    return sig
+  elif (output == 'sigx' or output == 'qx'):
+    return sig[:, 0]
+  elif (output == 'sigy' or output == 'qy'):
+    return sig[:, 1]
+  elif (output == 'tauxy'):
+    return sig[:, -1]
+  elif (type2D == 'diffusion'):
+    raise Exception('Error in CST_stressBatch: diffusion output must be qx or qy')
+
+  sigx = sig[:, 0]
+  sigy = sig[:, 1]
+  tauxy = sig[:, -1]
+  sig1 = (sigx + sigy)/2 + sqrt(((sigx - sigy)/2)**2 + tauxy**2)
+  sig2 = (sigx + sigy)/2 - sqrt(((sigx - sigy)/2)**2 + tauxy**2)
+  if (type2D == 'planeStrain'):
+    # D[0,1] / (D[0,0] + D[0,1]) recovers Poisson's ratio
+    nu = D[..., 0, 1] / (D[..., 0, 0] + D[..., 0, 1])
+    sig3 = nu*(sigx + sigy)
+  elif (type2D == 'axisymmetric'):
+    sig3 = sig[:, 2]
+  else:
+    sig3 = zeros(len(sig))
+  if (output == 'sig1'):
+    return sig1
+  elif (output == 'sig2'):
+    return sig2
+  elif (output == 'VM'):
+    return sqrt(1/2)*sqrt((sig1-sig2)**2 + (sig2-sig3)**2 + (sig3-sig1)**2)
+  else:
+    raise Exception('Error in CST_stressBatch: output must be sigx, sigy, tauxy, sig1, sig2, VM, qx, or qy')
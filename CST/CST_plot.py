@@ -1,3 +1,5 @@
+from ..common.helpers import plotMeshInput
+
 def get_color(val, min, max, colormap):
   """
   Defines the element color based on a colormap.
@@ -12,11 +14,13 @@ def get_color(val, min, max, colormap):
   colorVal = colormap(float(x)) #scalarMap.to_rgba(x)
   return colorVal
 
+@plotMeshInput
 def CST_plot(xList, yList, conn, u, sigmaMax, 
                 stressUnit="", lengthUnit="", cmapString="jet", scaling=None, equalAxis=True):
   """
   Plots a completed simulation using CST elements.
   Usage: CST_plot(xList, yList, conn, u, sigmaMax, stressUnit, lengthUnit, cmapString)
+         CST_plot(mesh, u, sigmaMax, ...)
   xList - (array - nnode) list of x positions of nodes
   yList - (array - nnode) list of y positions of nodes
   conn  - (array - nElem by 3) connectivity array or list of lists.  Each "row" should have three nodes.
@@ -0,0 +1,22 @@
+def CST_shapeFunctions(xi, eta):
+  """
+  [psi1, psi2, psi3] = CST_shapeFunctions(xi, eta)
+  Return the shape function values at a given xi and eta.
+  """
+  psi1 = 1 - xi - eta
+  psi2 = xi
+  psi3 = eta
+
+  return [psi1, psi2, psi3]
+
+
+def CST_shapeDerivatives(xi, eta):
+  """
+  [dpsidxi, dpsideta] = CST_shapeDerivatives(xi, eta)
+  Find the derivatives of the shape functions with respect to xi and eta.
+  These are constant over the element.
+  """
+  dpsidxi = [-1, 1, 0]
+  dpsideta = [-1, 0, 1]
+
+  return [dpsidxi, dpsideta]
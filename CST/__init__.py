@@ -1,3 +1,5 @@
 from .CST_J import CST_J
 from .CST_B import CST_B
 from .CST_plot import CST_plot
+from .CST_shapeFunctions import CST_shapeFunctions, CST_shapeDerivatives
+from .CST_batch import CST_JBatch, CST_BBatch, CST_areaBatch, CST_stiffnessBatch, CST_strainBatch, CST_stressBatch
@@ -0,0 +1,34 @@
+def LST_massBatch(xnode, ynode, conn, rhoc=1.0, thickness=1.0, lumped=False, gaussPoints=None):
+  """
+  Calculate the mass (capacitance) matrices of every LST element at once.
+  Usage - mElem = LST_massBatch(xnode, ynode, conn, rhoc, thickness, lumped)
+  For transient diffusion, M dT/dt + K T = F with M = integral of rho*c*t * psi^T psi.
+  ---------
+    Input
+  ---------
+  xnode - (list or array) x locations of all nodes
+  ynode - (list or array) y locations of all nodes
+  conn - (list of lists or nElem x 6 array) connectivity of LST elements
+  rhoc - (float or nElem array) density times specific heat
+  thickness - (float or nElem array) thickness of elements in third dimension
+  lumped - (logical) if True, diagonal (lumped) matrices - for straight-sided elements
+           each corner gets 1/19 and each midside node 16/57 of the element's mass
+  gaussPoints - (quadPoints) quadrature used for integration - defaults to precision 4,
+                which is exact for straight-sided elements
+  ----------
+    Output
+  ----------
+  mElem - (nElem x 6 x 6 array) element mass matrices, in the order of conn
+  """
+  from numpy import asarray
+  from ..common.helpers import connArray
+  from ..common.quadPoints import quadPoints
+  from ..common.elementQuadrature import massQuadrature
+
+  if (gaussPoints == None):
+    gaussPoints = quadPoints('triangle', 4)
+
+  connArr, index = connArray(conn)
+  xElem = asarray(xnode, dtype=float)[connArr]
+  yElem = asarray(ynode, dtype=float)[connArr]
+  return massQuadrature(xElem, yElem, rhoc, thickness, gaussPoints, 'LST', lumped)
@@ -1,4 +1,4 @@
-def LST_mesh(xnode, ynode, CSTconn, conn2line, CSTline2node, CSTbcs):
+def LST_mesh(xnode, ynode=None, CSTconn=None, conn2line=[], CSTline2node=[], CSTbcs=[], prolongation=False):
   """
   Usage - LST_mesh(xnode, ynode, CSTconn, conn2line, line2node)
   Creates additional nodes for LST elements:
@@ -19,11 +19,32 @@ def LST_mesh(xnode, ynode, CSTconn, conn2line, CSTline2node, CSTbcs):
   LSTynode - list of y locations of nodes, including line midpoints
   LSTconn - connectivity matrix for six node elements
   LSTline2node - connectivity between lines and LST nodes
+  LSTbcs - boundary conditions on the LST nodes
+  P - (only with prolongation=True) interpolation of CST fields onto the LST nodes,
+      the last level of a multigrid hierarchy (see midpointProlongation)
+  If CSTconn is an (nElem x 3) array, LST_meshArrays is used instead.
+  A CST Mesh can be given instead of the lists - mesh = LST_mesh(mesh) returns the
+  LST Mesh (and P with prolongation=True).  Its lines are those of the CST mesh.
   """
+  from numpy import ndarray
   from ..common.helpers import connIndex
-  from ..common.meshRefine import lineExists, cellExists, buildc2lAndl2n
+  from ..common.mesh import Mesh
+  from ..common.meshRefine import lineExists, lineKey, lineLookup, cellLookup, buildc2lAndl2n, midpointProlongation
   from ..common.BC import BC
   
+  if (isinstance(xnode, Mesh)):
+    mesh = xnode
+    if (mesh.conn.shape[1] != 3):
+      raise Exception('Error in LST_mesh: the mesh must have 3 node (CST) elements.')
+    [conn2line, line2node] = mesh.edges()
+    LST = LST_meshArrays(mesh.xnode, mesh.ynode, mesh.conn, conn2line, line2node, mesh.bcs, prolongation)
+    meshNew = Mesh(LST[0], LST[1], LST[2], LST[4], conn2line, line2node, index=0)
+    meshNew.index = mesh.index
+    if (prolongation):
+      return [meshNew, LST[5]]
+    return meshNew
+  if (isinstance(CSTconn, ndarray)):
+    return LST_meshArrays(xnode, ynode, CSTconn, conn2line, CSTline2node, CSTbcs, prolongation)
   if (len(conn2line) == 0):
     conn2line, CSTline2node = buildc2lAndl2n(CSTconn)
   
@@ -42,14 +63,15 @@ def LST_mesh(xnode, ynode, CSTconn, conn2line, CSTline2node, CSTbcs):
     ymid = (ynode[i1-index] + ynode[i2-index]) / 2
     LSTxnode.append(xmid)
     LSTynode.append(ymid)
+    LSTline2node.append([i1, nodeCount + index, i2])
     nodeCount += 1
-    LSTline2node.append([i1, nodeCount, i2])
   
   # Create LST connectivity
   LSTLineList = []
   LSTconn = []
   for i, elem in enumerate(CSTconn):
     LSTelem = elem.copy()
+    # Only the element's own three lines are searched
     lines = [0]*3
     lines[0] = CSTline2node[conn2line[i][0]]
     lines[1] = CSTline2node[conn2line[i][1]]
@@ -69,6 +91,8 @@ def LST_mesh(xnode, ynode, CSTconn, conn2line, CSTline2node, CSTbcs):
     LSTconn.append(LSTelem)
   
   LSTbcs = []
+  CSTlines = lineLookup(CSTline2node)
+  CSTcells = None
   for bc in CSTbcs:
     LSTbc = bc.copy()
 
@@ -76,12 +100,107 @@ def LST_mesh(xnode, ynode, CSTconn, conn2line, CSTline2node, CSTbcs):
     if len(bcnodes) == 1:
       pass
     elif len(bcnodes) == 2:
-      CSTline = lineExists(CSTline2node, [bcnodes[0], bcnodes[1]])
+      CSTline = CSTlines.get(lineKey(bcnodes), -1)
+      if CSTline == -1:
+        raise Exception('Error in LST_mesh: BC line ' + str(bcnodes) + ' does not exist in the mesh')
       LSTbc.nodes = LSTline2node[CSTline]
     elif len(bcnodes) == 3:
-      CSTelem = cellExists(CSTconn, bcnodes)
+      if (CSTcells == None):
+        CSTcells = cellLookup(CSTconn)
+      CSTelem = CSTcells.get(tuple(sorted(bcnodes)), -1)
+      if CSTelem == -1:
+        raise Exception('Error in LST_mesh: BC face ' + str(bcnodes) + ' does not exist in the mesh')
       LSTbc.nodes = LSTconn[CSTelem]
     
     LSTbcs.append(LSTbc)
   
+  if (prolongation):
+    P = midpointProlongation(len(xnode), CSTline2node, index)
+    return [LSTxnode, LSTynode, LSTconn, LSTline2node, LSTbcs, P]
+  return [LSTxnode, LSTynode, LSTconn, LSTline2node, LSTbcs]
+
+def LST_meshArrays(xnode, ynode, CSTconn, conn2line, CSTline2node, CSTbcs, prolongation=False):
+  """
+  Usage - [LSTxnode, LSTynode, LSTconn, LSTline2node, LSTbcs] = LST_meshArrays(xnode, ynode, CSTconn, conn2line, line2node, bcs)
+  Array version of LST_mesh, with the same numbering: the midside node of line l
+  is node nNode + l.  The lines come from edgeTable if conn2line is empty.  Each
+  element's midside nodes are found by matching the keys of its three edges with
+  those of its lines, so conn2line can list an element's lines in any order.
+  Line and face BCs are found with one sorted search of the line and element keys.
+  ---------
+    Input
+  ---------
+  xnode, ynode - (lists or arrays) node locations
+  CSTconn - (nElem x 3 array) connectivity of three node elements
+  conn2line - (nElem x 3 array) lines of each element, or [] to build them
+  CSTline2node - (nLine x 2 array) end nodes of each line
+  CSTbcs - (list) boundary conditions (BC)
+  ----------
+    Output
+  ----------
+  LSTxnode, LSTynode - (float arrays) node locations, including line midpoints
+  LSTconn - (nElem x 6 array) connectivity of six node elements
+  LSTline2node - (nLine x 3 array) end nodes and midside node of each line
+  LSTbcs - (list) boundary conditions on the LST nodes
+  P - (only with prolongation=True) see LST_mesh
+  """
+  from numpy import arange, argmax, asarray, concatenate, empty
+  from ..common.meshRefine import edgeTable, bcFinders, nodeKeys, midpointProlongation
+
+  CSTconn = asarray(CSTconn)
+  if (len(conn2line) == 0):
+    [conn2line, CSTline2node] = edgeTable(CSTconn)
+  conn2line = asarray(conn2line, dtype=CSTconn.dtype)
+  CSTline2node = asarray(CSTline2node, dtype=CSTconn.dtype)
+  index = int(CSTconn.min())
+  xnode = asarray(xnode, dtype=float)
+  ynode = asarray(ynode, dtype=float)
+  nNode = len(xnode)
+  nLine = len(CSTline2node)
+  nElem = len(CSTconn)
+
+  # New nodes at the middle of every line
+  ends = CSTline2node - index
+  LSTxnode = concatenate((xnode, (xnode[ends[:, 0]] + xnode[ends[:, 1]]) / 2))
+  LSTynode = concatenate((ynode, (ynode[ends[:, 0]] + ynode[ends[:, 1]]) / 2))
+  mid = (arange(nLine) + nNode + index).astype(CSTconn.dtype)
+  LSTline2node = empty((nLine, 3), dtype=CSTconn.dtype)
+  LSTline2node[:, 0] = CSTline2node[:, 0]
+  LSTline2node[:, 1] = mid
+  LSTline2node[:, 2] = CSTline2node[:, 1]
+
+  # Nodes 4, 5, and 6 are on the edges opposite nodes 1, 2, and 3
+  M = int(CSTconn.max()) + 1
+  lineKeys = nodeKeys(CSTline2node, M)[conn2line]
+  LSTconn = empty((nElem, 6), dtype=CSTconn.dtype)
+  LSTconn[:, :3] = CSTconn
+  for j, [a, b] in enumerate([[1, 2], [0, 2], [0, 1]]):
+    edgeKeys = nodeKeys(CSTconn[:, [a, b]], M)
+    position = argmax(lineKeys == edgeKeys[:, None], axis=1)
+    LSTconn[:, 3 + j] = mid[conn2line[arange(nElem), position]]
+
+  [findLine, findCell] = bcFinders(CSTbcs, CSTconn, CSTline2node)
+  LSTbcs = []
+  for bc in CSTbcs:
+    LSTbc = bc.copy()
+
+    bcnodes = bc.nodes
+    if len(bcnodes) == 1:
+      pass
+    elif len(bcnodes) == 2:
+      CSTline = findLine(bcnodes)
+      if CSTline == -1:
+        raise Exception('Error in LST_mesh: BC line ' + str(bcnodes) + ' does not exist in the mesh')
+      LSTbc.nodes = LSTline2node[CSTline].tolist()
+    elif len(bcnodes) == 3:
+      CSTelem = findCell(bcnodes)
+      if CSTelem == -1:
+        raise Exception('Error in LST_mesh: BC face ' + str(bcnodes) + ' does not exist in the mesh')
+      LSTbc.nodes = LSTconn[CSTelem].tolist()
+    
+    LSTbcs.append(LSTbc)
+
+  if (prolongation):
+    P = midpointProlongation(nNode, CSTline2node, index)
+    return [LSTxnode, LSTynode, LSTconn, LSTline2node, LSTbcs, P]
   return [LSTxnode, LSTynode, LSTconn, LSTline2node, LSTbcs]
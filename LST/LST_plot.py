@@ -1,3 +1,5 @@
+from ..common.helpers import plotMeshInput
+
 def createTriangles(nPlot):
   tri = []
   base = 0
@@ -53,6 +55,7 @@ def outputString(type2D, output):
     raise Exception('Error in LST_plot: type2D not in list')
   return outStr
 
+@plotMeshInput
 def LST_plot(conn, xnode, ynode, u=None, D=None, 
              type2D="planeStress", output="J", scaling=None, minMax=None, nPlot=2, 
              colormap='jet', undeformedLines=True, deformedLines=True, nodeNumbers=True):
@@ -60,6 +63,7 @@ def LST_plot(conn, xnode, ynode, u=None, D=None,
   Plot the entire 2D solid.  Defaults to plotting the determinant of the Jacobian on the undeformed mesh.
   Usage (Jacobian) - plotAll(conn, xnode, ynode)
   Usage (Solution) - plotAll(conn, xnode, ynode, u, D, type2D="planeStress", output="J")
+  Usage (Mesh) - plotAll(mesh, u, D, ...) - node numbers as in the lists the Mesh was made from
   
   ---------
     Input
@@ -12,7 +12,7 @@ def LST_stiffness(xElem, yElem, xi, eta, D, thickness=None, type2D='planeStress'
   D - (array) constituitive matrix
   thickness - (float) thickness of element in third dimension
   """
-  from numpy import array, linalg, transpose
+  from numpy import array, linalg, transpose, pi
   from .LST_B import LST_B
   from .LST_J import LST_J
   from .LST_shapeFunctions import LST_shapeFunctions
@@ -21,5 +21,6 @@ def LST_stiffness(xElem, yElem, xi, eta, D, thickness=None, type2D='planeStress'
   if (type2D == 'axisymmetric'):
     psi = LST_shapeFunctions(xi, eta)
     thickness = 2*pi*(array(xElem) @ array(psi))
-  Area = linalg.det(LST_J(xElem, yElem, xi, eta))
+  # The reference triangle has an area of 1/2, while the quadrature weights sum to 1
+  Area = linalg.det(LST_J(xElem, yElem, xi, eta))/2
   return Area*thickness*(transpose(B)@D@B)
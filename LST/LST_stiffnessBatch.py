@@ -0,0 +1,133 @@
+def LST_stiffnessBatch(xnode, ynode, conn, D, thickness=None, type2D='planeStress', gaussPoints=None, straightTol=1e-10):
+  """
+  Calculate the integrated stiffness matrices of every LST element at once.
+  Usage - kElem = LST_stiffnessBatch(xnode, ynode, conn, D, thickness, type2D, gaussPoints)
+  Gives the same matrices as summing LST_stiffness(...) * weight over the Gauss
+  points for each element, but with all elements handled as array operations.
+
+  Elements with straight sides and midside nodes at the midpoints (everything made by
+  meshRefine and LST_mesh) have a constant Jacobian.  Their stiffness is found in closed
+  form from reference blocks scaled by the inverse Jacobian.  Other elements, and all
+  axisymmetric elements, are integrated at the Gauss points.
+  ---------
+    Input
+  ---------
+  xnode - (list or array) x locations of all nodes
+  ynode - (list or array) y locations of all nodes
+  conn - (list of lists or nElem x 6 array) connectivity of LST elements
+  D - (array) constituitive matrix (or nElem x D for per-element properties)
+  thickness - (float or nElem array) thickness of elements in third dimension
+              (ignored for axisymmetric)
+  type2D - (string) "planeStress", "planeStrain", "axisymmetric", or "diffusion"
+  gaussPoints - (quadPoints) quadrature used for integration - defaults to precision 3
+  straightTol - (float) allowed distance of a midside node from the midpoint, relative to
+                the longest side, for the closed form - None to always use quadrature
+  ----------
+    Output
+  ----------
+  kElem - (nElem x 6*nDOF x 6*nDOF array) element stiffness matrices, in the order of conn
+  """
+  from numpy import asarray, broadcast_to, zeros
+  from ..common.helpers import connArray
+  from ..common.nDOF import nDOF as numDOF
+  from ..common.quadPoints import quadPoints
+  from ..common.elementQuadrature import stiffnessQuadrature
+
+  if (gaussPoints == None):
+    gaussPoints = quadPoints('triangle', 3)
+
+  connArr, index = connArray(conn)
+  xElem = asarray(xnode, dtype=float)[connArr]
+  yElem = asarray(ynode, dtype=float)[connArr]
+  nElem = len(connArr)
+  n = 6*numDOF(type2D)
+
+  D = asarray(D, dtype=float)
+  if (type2D != 'axisymmetric'):
+    thickness = broadcast_to(asarray(thickness, dtype=float), (nElem,))
+
+  if (type2D == 'axisymmetric' or straightTol == None):
+    return stiffnessQuadrature(xElem, yElem, D, thickness, type2D, gaussPoints, 'LST')
+
+  straight = LST_isStraight(xElem, yElem, straightTol)
+  kElem = zeros((nElem, n, n))
+  for subset in [straight, ~straight]:
+    if (not subset.any()):
+      continue
+    # Per-element properties are split along with the elements
+    if (D.ndim == 3):
+      Dsub = D[subset]
+    else:
+      Dsub = D
+    if (subset is straight):
+      kElem[subset] = LST_stiffnessStraight(xElem[subset], yElem[subset], Dsub, thickness[subset], type2D, gaussPoints)
+    else:
+      kElem[subset] = stiffnessQuadrature(xElem[subset], yElem[subset], Dsub, thickness[subset], type2D, gaussPoints, 'LST')
+  return kElem
+
+def LST_isStraight(xElem, yElem, tol=1e-10):
+  """
+  Find which LST elements have straight sides with the midside nodes at the midpoints.
+  xElem, yElem - (nElem x 6 arrays) node locations of each element
+  Returns an nElem boolean array.
+  """
+  from numpy import hypot, maximum
+
+  # node 4 between 2 and 3, node 5 between 1 and 3, node 6 between 1 and 2
+  corners = [[1, 2], [0, 2], [0, 1]]
+  size = 0
+  offset = 0
+  for mid, [a, b] in enumerate(corners):
+    size = maximum(size, hypot(xElem[:, a] - xElem[:, b], yElem[:, a] - yElem[:, b]))
+    offset = maximum(offset, hypot(xElem[:, 3 + mid] - (xElem[:, a] + xElem[:, b])/2,
+                                   yElem[:, 3 + mid] - (yElem[:, a] + yElem[:, b])/2))
+  return offset <= tol*size
+
+def strainSelection(type2D):
+  # A[c] maps the nodal DOFs to the strain vector, for a unit derivative of the shape
+  # function in direction c (x or y):  B_node = dpsi/dx * A[0] + dpsi/dy * A[1]
+  from numpy import array
+  if (type2D == 'diffusion'):
+    return array([[[1], [0]],
+                  [[0], [1]]], dtype=float)
+  else:
+    return array([[[1, 0], [0, 0], [0, 1]],
+                  [[0, 0], [0, 1], [1, 0]]], dtype=float)
+
+def LST_stiffnessStraight(xElem, yElem, D, thickness, type2D, gaussPoints):
+  # Closed-form stiffness for elements with a constant Jacobian:
+  #   K = t*det(J)/2 * sum_cd sum_ab Jinv[c,a] Jinv[d,b] R_ab (x) (A_c^T D A_d)
+  # with reference blocks R_ab = sum_g w_g dpsi_g[a]^T dpsi_g[b]
+  # D is either one matrix for all elements or nElem x D
+  from numpy import einsum, zeros
+
+  nElem = len(xElem)
+  dpsi = gaussPoints.shapeDerivatives('LST')
+  R = einsum('g,gai,gbj->abij', gaussPoints.weights, dpsi, dpsi).reshape(4, 36)
+
+  # J = [[dx/dxi,  dy/dxi ],
+  #      [dx/deta, dy/deta]]
+  J = zeros((nElem, 2, 2))
+  J[:, 0, 0] = xElem[:, 1] - xElem[:, 0]
+  J[:, 0, 1] = yElem[:, 1] - yElem[:, 0]
+  J[:, 1, 0] = xElem[:, 2] - xElem[:, 0]
+  J[:, 1, 1] = yElem[:, 2] - yElem[:, 0]
+  detJ = J[:, 0, 0]*J[:, 1, 1] - J[:, 0, 1]*J[:, 1, 0]
+  Jinv = zeros((nElem, 2, 2))
+  Jinv[:, 0, 0] = J[:, 1, 1]/detJ
+  Jinv[:, 0, 1] = -J[:, 0, 1]/detJ
+  Jinv[:, 1, 0] = -J[:, 1, 0]/detJ
+  Jinv[:, 1, 1] = J[:, 0, 0]/detJ
+
+  scale = detJ/2 * thickness
+  if (type2D == 'diffusion'):
+    # G = Jinv^T D Jinv
+    G = Jinv.transpose(0, 2, 1) @ D @ Jinv
+    return ((G*scale[:, None, None]).reshape(nElem, 4) @ R).reshape(nElem, 6, 6)
+
+  # P[c,d] = A_c^T D A_d, either one for all elements or one per element
+  A = strainSelection(type2D)
+  P = einsum('csp,...st,dtq->...cdpq', A, D, A).reshape(-1, 4, 4)
+  S = (einsum('eca,edb->ecdab', Jinv, Jinv).reshape(nElem, 4, 4) @ R) * scale[:, None, None]
+  K = S.reshape(nElem, 4, 36).transpose(0, 2, 1) @ P
+  return K.reshape(nElem, 6, 6, 2, 2).transpose(0, 1, 3, 2, 4).reshape(nElem, 12, 12)
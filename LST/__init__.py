@@ -4,5 +4,7 @@ from .LST_plot import LST_plot
 from .LST_plotSingle import LST_plotSingle, LST_map
 from .LST_shapeFunctions import LST_shapeFunctions, LST_shapeDerivatives
 from .LST_stiffness import LST_stiffness
+from .LST_stiffnessBatch import LST_stiffnessBatch
+from .LST_massBatch import LST_massBatch
 from .LST_strain import LST_strain
-from .LST_mesh import LST_mesh
+from .LST_mesh import LST_mesh, LST_meshArrays
@@ -18,7 +18,7 @@ def Q4_B(x1234, y1234, xi, eta, type2D='planeStress'):
   ----------
     Output
   ----------
-  B: (3x8 array) - B matrix
+  B: (3x8 array) - B matrix (4x8 for axisymmetric, 2x4 for diffusion)
   """
   from numpy import array, linalg, zeros
   from .Q4_J import Q4_J
@@ -38,6 +38,13 @@ def Q4_B(x1234, y1234, xi, eta, type2D='planeStress'):
       B[2, 2*i  ] = psi[i] / (array(x1234) @ array(psi))
       B[3, 2*i  ] = dpsidxy[1]
       B[3, 2*i+1] = dpsidxy[0]
+  elif (type2D == 'diffusion'):
+    # Heat transfer or mass diffusion
+    B = zeros((2, 4))
+    for i in range(4):
+      dpsidxy = Jinv @ array([dpsidxi[i], dpsideta[i]])
+      B[0, i] = dpsidxy[0] # B = [ dpsi_1/dx dpsi_2/dx ...]
+      B[1, i] = dpsidxy[1] #     [ dpsi_1/dy dpsi_2/dy ...]
   else:
     B = zeros((3, 8))
     for i in range(4):
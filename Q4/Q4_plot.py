@@ -1,9 +1,13 @@
-def Q4_plot(conn, xnode, ynode, u=None, D=None, type2D="planeStress", output="J", scaling=None, minMax=None, Nplot=10, 
-                  colormap='jet', undeformedLines=True, deformedLines=True):
+from ..common.helpers import plotMeshInput
+
+@plotMeshInput
+def Q4_plot(conn, xnode, ynode, u=None, D=None, type2D="planeStress", output="J", scaling=None, minMax=None, nPlot=10, 
+                  colormap='jet', undeformedLines=True, deformedLines=True, nodeNumbers=True, Nplot=None):
   """
   Plot the entire 2D solid.  Defaults to plotting the determinant of the Jacobian on the undeformed mesh.
-  Usage (Jacobian) - plotAll(conn, xnode, ynode)
-  Usage (Solution) - plotAll(conn, xnode, ynode, u, D, type2D="planeStress", output="J")
+  Usage (Jacobian) - Q4_plot(conn, xnode, ynode)
+  Usage (Solution) - Q4_plot(conn, xnode, ynode, u, D, type2D="planeStress", output="VM")
+  Usage (Mesh) - Q4_plot(mesh, u, D, ...) - node numbers as in the lists the Mesh was made from
   
   ---------
     Input
@@ -11,100 +15,98 @@ def Q4_plot(conn, xnode, ynode, u=None, D=None, type2D="planeStress", output="J"
   conn - (list of lists) connectivity matrix - [[n1, n2, n3, n4], [n5, n6, n7, n8], ...]
   xnode - (list) x locations of nodes
   ynode - (list) y locations of nodes
-  u - (list) deformation of nodes [u1, v2, u2, v2, u3, v3, u4, v4, ...]
+  u - (list) deformation of nodes [u1, v2, u2, v2, u3, v3, u4, v4, ...] (or temperatures for diffusion)
   D - (array) constituitive matrix - should match type2D
-  type2D - (string) "planeStress", "planeStrain", or "axisymmetric"
+  type2D - (string) "planeStress", "planeStrain", or "diffusion"
   minMax - (list) min and max value of output plot - omit to have min/max automatically calculated
   output - (string) Plot type:
       'VM' - von Mises stress
       'sigx', 'sigy', or 'tauxy' - normal stress in x or y, or shear stress
       'sig1' or 'sig2' - maximum or minimum principal stress
+      'T', 'qx', or 'qy' - temperature or flux (diffusion)
        'J' - determinant of Jacobian matrix
-  Nplot - number of points to plot in contour
+  nPlot - number of divisions in each direction of each element
   colormap - (string) name of colormap
   undeformedLines - (logical) if True, display undeformed lines
   deformedLines - (logical) if True, display deformed lines - set to False if u is not given
   scaling - (float) Ratio of displayed deformation to actual deformation - choose None for automatic scaling
+  nodeNumbers - (logical) if True, label the nodes
+  Nplot - (deprecated) number of points in each direction, used as nPlot = Nplot - 1
   """
   from matplotlib import pyplot
   from matplotlib import cm
   from matplotlib import colors
-  #from matplotlib import colorbar
-  from matplotlib import figure
-  from numpy import sqrt, floor, arange
-  from .Q4_plotSingle import Q4_plotSingle
-  from .Q4_stress import Q4_stress
-  from .Q4_strain import Q4_strain
+  from matplotlib import tri
+  from numpy import sqrt, floor, arange, linspace, array
+  from .Q4_plotSingle import Q4_plotSingle, createQuadTriangles, plotDivisions
+  from ..LST.LST_plot import appendTriangles, outputString
+  from ..common.helpers import connIndex
+  from ..common.nDOF import nDOF as numDOF
   
-  if (len(u) < 2):
+  nPlot = plotDivisions(nPlot, Nplot, 'Q4_plot')
+  
+  if (type(u) == type(None) or type2D == 'diffusion'):
     deformedLines=False
-  if (minMax == None):
-    calcMinMax = True
   
-  # Determine Scaling valued
+  nDOF = numDOF(type2D)
+  index = connIndex(conn)
+  
+  # Determine Scaling value
   dxMax = max(xnode) - min(xnode) # these are used for text placement as well
   dyMax = max(ynode) - min(ynode)
-  if (len(u) < 2):
+  if (type(u) == type(None)):
     scaling = 1.0
+  elif (type2D == 'diffusion'):
+    scaling = 0.0
   elif (scaling == None):
     rMax = sqrt(dxMax**2 + dyMax**2)
     uMax = max(max(u), abs(min(u)))
     scaling = max(floor(rMax/(25*uMax)), 1)
   
-  if (calcMinMax):
-    for nodes in conn:
-      # Find the x and y position of nodes for the local element
-      x1234 = [xnode[nodes[0]-1], xnode[nodes[1]-1], xnode[nodes[2]-1], xnode[nodes[3]-1]] 
-      y1234 = [ynode[nodes[0]-1], ynode[nodes[1]-1], ynode[nodes[2]-1], ynode[nodes[3]-1]]
-    
-      # Define deformation vector for local element
-      if (len(u) < 2):
-        uElem = None
-      else:
-        uElem = []
-        for node in nodes:
-          uElem.append(u[node*2-2])
-          uElem.append(u[node*2-1])
-    
-      # Calculate the stress at the nodes of the local element
-      if (output[0] == 's' or output[0]=='t' or output == 'VM'):
-        sigA = Q4_stress(x1234, y1234, uElem, -1, -1, D, type2D, output)
-        sigB = Q4_stress(x1234, y1234, uElem,  1, -1, D, type2D, output)
-        sigC = Q4_stress(x1234, y1234, uElem,  1,  1, D, type2D, output)
-        sigD = Q4_stress(x1234, y1234, uElem, -1,  1, D, type2D, output)
-      else:
-        sigA = Q4_strain(x1234, y1234, uElem, -1, -1, type2D, output)
-        sigB = Q4_strain(x1234, y1234, uElem,  1, -1, type2D, output)
-        sigC = Q4_strain(x1234, y1234, uElem,  1,  1, type2D, output)
-        sigD = Q4_strain(x1234, y1234, uElem, -1,  1, type2D, output)
-      if (minMax == None):
-        minMax=[0, 0]
-        minMax[0] = min(sigA, sigB, sigC, sigD)
-        minMax[1] = max(sigA, sigB, sigC, sigD)
-      else:
-        minMax[0] = min(sigA, sigB, sigC, sigD, minMax[0])
-        minMax[1] = max(sigA, sigB, sigC, sigD, minMax[1])
-  
-  fig = figure.Figure(figsize=(8, 5), dpi=100, facecolor='w', edgecolor='k')
-  
+  fig, ax = pyplot.subplots()
+  fig.set_figheight(5)
+  fig.set_figwidth(8)
+  fig.set_dpi(100)
+  fig.set_facecolor('w')
+  fig.set_edgecolor('k')
+  Xall = []
+  Yall = []
+  Zall = []
+  plotTriangles = None
   for nodes in conn:
     # Find the x and y position of nodes for the local element
-    x1234 = [xnode[nodes[0]-1], xnode[nodes[1]-1], xnode[nodes[2]-1], xnode[nodes[3]-1]] 
-    y1234 = [ynode[nodes[0]-1], ynode[nodes[1]-1], ynode[nodes[2]-1], ynode[nodes[3]-1]]
+    x1234 = []
+    y1234 = []
+    for node in nodes:
+      x1234.append(xnode[node-index])
+      y1234.append(ynode[node-index])
   
     # Define deformation vector for local element
-    if (len(u) < 2):
+    if (type(u) == type(None)):
       uElem = None
     else:
       uElem = []
       for node in nodes:
-        uElem.append(u[node*2-2])
-        uElem.append(u[node*2-1])
+        for j in range(nDOF):
+          uElem.append(u[nDOF*(node-index)+j])
           
-    Q4_plotSingle(x1234, y1234, uElem, D, minMax, output, Nplot, 
-                  colormap, undeformedLines, deformedLines, scaling, type2D=type2D)
-  #pyplot.xlabel('x')
-  #pyplot.ylabel('y')
+    [X, Y, Z] = Q4_plotSingle(x1234, y1234, uElem, D, minMax, output, nPlot, 
+                              colormap, undeformedLines, deformedLines, scaling, type2D=type2D)
+    
+    plotTriangles = appendTriangles(plotTriangles, array(createQuadTriangles(nPlot)))
+    Xall += X
+    Yall += Y
+    Zall += Z
+  plotTri = tri.Triangulation(Xall, Yall, plotTriangles)
+  if (minMax==None):
+    minMax = [min(Zall), max(Zall)]
+  
+  if (abs(min(Zall) - max(Zall))<1e-10):
+    ax.tricontourf(plotTri, Zall, vmin=minMax[0], vmax=minMax[1], cmap=colormap)
+  else:
+    ax.tricontourf(plotTri, Zall, vmin=minMax[0], vmax=minMax[1], 
+                   levels=linspace(minMax[0], minMax[1], 20), cmap=colormap)
+  dx = dxMax
   if (output != 'J'):
     xMax = xnode[0]
     xMin = xnode[0]
@@ -113,8 +115,12 @@ def Q4_plot(conn, xnode, ynode, u=None, D=None, type2D="planeStress", output="J"
     
     # Find bounds of plot to help place text
     for i, x in enumerate(xnode):
-      xd = xnode[i] + u[2*i]*scaling
-      yd = ynode[i] + u[2*i+1]*scaling
+      if (type2D == 'diffusion'):
+        xd = xnode[i]
+        yd = ynode[i]
+      else:
+        xd = xnode[i] + u[2*i]*scaling
+        yd = ynode[i] + u[2*i+1]*scaling
       xMax = max(xMax, xd, xnode[i])
       xMin = min(xMin, xd, xnode[i])
       yMax = max(yMax, yd, ynode[i])
@@ -122,16 +128,22 @@ def Q4_plot(conn, xnode, ynode, u=None, D=None, type2D="planeStress", output="J"
     xAvg = (xMax + xMin)/2
     dx = xMax - xMin
     dy = yMax - yMin
-    pyplot.text(xAvg - .6*(dx), yMin - (dy)*.15, 'Deformation scaled by ' + str(int(scaling)) + 'x', fontsize=8)
-    pyplot.text(xAvg - .05*(dx), yMin - (dy)*.15, 'Max stress = %8.3e ' % minMax[1], fontsize=8)
-    pyplot.text(xAvg + .4*(dx), yMin - (dy)*.15, 'Min stress = %8.3e ' % minMax[0], fontsize=8)
+    if (type2D != 'diffusion'):
+      pyplot.text(xAvg - .6*(dx), yMin - (dy)*.15, 'Deformation scaled by ' + str(int(scaling)) + 'x', fontsize=8)
+    oString = outputString(type2D, output)
+    pyplot.text(xAvg - .05*(dx), yMin - (dy)*.15, f'Max {oString} = {max(Zall):8.3e}', fontsize=8)
+    pyplot.text(xAvg + .4*(dx), yMin - (dy)*.15, f'Min {oString} = {min(Zall):8.3e}', fontsize=8)
+    
+  if (nodeNumbers):
+    for i in range(len(xnode)):
+      pyplot.text(xnode[i]+.01*dx, ynode[i]+.01*dx, str(i+index))
   
   # Create colorbar
   nValues = arange(0, 30)
   cnorm = colors.Normalize(vmin = minMax[0], vmax = minMax[1])
   scmap = cm.ScalarMappable(norm=cnorm, cmap=colormap)
   scmap.set_array(nValues)
-  cbar = pyplot.colorbar(scmap)
+  cbar = pyplot.colorbar(scmap, ax=ax)
   
   # Label colorbar
   if (output == 'VM'):
@@ -148,3 +160,9 @@ def Q4_plot(conn, xnode, ynode, u=None, D=None, type2D="planeStress", output="J"
     cbar.set_label('Max normal stress')
   elif (output == 'sig2'):
     cbar.set_label('Min normal stress')
+  elif (output == 'T'):
+    cbar.set_label('Temperature')
+  elif (output == 'qx'):
+    cbar.set_label('Flux - x')
+  elif (output == 'qy'):
+    cbar.set_label('Flux - y')
@@ -1,11 +1,18 @@
-def Q4_map(x1234, y1234, xi, eta):
+def Q4_map(x1234=None, y1234=None, xi=0, eta=0):
   """
   Get the x and y location associated with xi and eta.  Primarily an internal 
-  function for Q4_plot and Q4_plotSingle.
+  function for Q4_plot and Q4_plotSingle.  With only x1234 given, interpolates
+  a nodal value (e.g. temperature) instead.
   """
   from .Q4_shapeFunctions import Q4_shapeFunctions
   psi = Q4_shapeFunctions(xi, eta)
 
+  if (y1234 == None):
+    x = 0
+    for i, p in enumerate(psi):
+      x += p*x1234[i]
+    return x
+
   x = 0
   y = 0
   for i, p in enumerate(psi):
@@ -14,93 +21,116 @@ def Q4_map(x1234, y1234, xi, eta):
   
   return([x,y])
 
-def Q4_plotSingle(x1234, y1234, u=None, D=None, minMax=None, output='VM', Nplot=10, 
-                  colormap='jet', undeformedLines=True, deformedLines=True, scaling=1.0, type2D="planeStress"):
+def createQuadTriangles(nPlot):
+  # Two triangles for each cell of the (nPlot+1) x (nPlot+1) lattice used by Q4_plotSingle
+  tri = []
+  for i in range(nPlot):
+    for j in range(nPlot):
+      base = i*(nPlot+1) + j
+      tri.append([base, base + 1, base + nPlot + 2])
+      tri.append([base, base + nPlot + 2, base + nPlot + 1])
+  return tri
+
+def plotDivisions(nPlot, Nplot, caller):
+  # Nplot (the number of points along each direction) was renamed nPlot (the number
+  # of divisions) - keep the old keyword working, with a warning
+  if (Nplot == None):
+    return nPlot
+  from warnings import warn
+  warn(caller + ': Nplot is deprecated, use nPlot (the number of divisions, Nplot - 1).', DeprecationWarning, stacklevel=3)
+  return max(Nplot - 1, 1)
+
+def Q4_plotSingle(x1234, y1234, u=None, D=None, minMax=None, output='VM', nPlot=10, 
+                  colormap='jet', undeformedLines=True, deformedLines=True, scaling=1.0, type2D="planeStress", Nplot=None):
   """
   Plot a single quadrilateral element.
-  Usage - fig = Q4_plotSingle(x1234, y1234, u=None, D=None, minMax=None, output='VM', Nplot=10, colormap='jet')
+  Usage - [X, Y, Z] = Q4_plotSingle(x1234, y1234, u=None, D=None, minMax=None, output='VM', nPlot=10, colormap='jet')
+  Values are found on an (nPlot+1) x (nPlot+1) lattice of points in the element.
   ---------
     Input
   ---------
   x1234 - (list) x locations of nodes
   y1234 - (list) y locations of nodes
-  u - (list) deformation of nodes [u1, v2, u2, v2, u3, v3, u4, v4]
+  u - (list) deformation of nodes [u1, v2, u2, v2, u3, v3, u4, v4] (or [T1, T2, T3, T4])
   minMax - (list) min and max value of output plot
   D - (array) constituitive matrix
   output - (string) Plot type:
       'VM' - von Mises stress
       'sigx', 'sigy', or 'tauxy' - normal stress in x or y, or shear stress
       'sig1' or 'sig2' - maximum or minimum principal stress
+      'epsx', 'epsy', or 'gammaxy' - strains
+      'T', 'qx', or 'qy' - temperature or flux (diffusion)
        'J' - determinant of Jacobian matrix
-  Nplot - number of points to plot in contour
+  nPlot - number of divisions in each direction
   colormap - (string) name of colormap
   undeformedLines - (logical) if True, display undeformed lines
   deformedLines - (logical) if True, display deformed lines
   scaling - (float) Ratio of displayed deformation to actual deformation
+  Nplot - (deprecated) number of points in each direction, used as nPlot = Nplot - 1
+  ----------
+    Output
+  ----------
+  X, Y, Z - (lists) plot locations and values, numbered as in createQuadTriangles
   """
-  from numpy import linalg, meshgrid, linspace, zeros, shape
-  from matplotlib.pyplot import contourf, plot
+  from numpy import linalg
+  from matplotlib import pyplot
   from .Q4_stress import Q4_stress
   from .Q4_strain import Q4_strain
+  from .Q4_J import Q4_J
+
+  nPlot = plotDivisions(nPlot, Nplot, 'Q4_plotSingle')
 
   # Get deformed node locations
-  if (u != None):
+  if (u is None or type2D == 'diffusion'):
+    xd = list(x1234)
+    yd = list(y1234)
+  else:
     xd = []
     yd = []
     for i, x in enumerate(x1234):
       xd.append(x+scaling*u[2*i])
     for i, y in enumerate(y1234):
       yd.append(y+scaling*u[2*i+1])
-  else:
-    xd = x1234
-    yd = y1234
 
-  # Initialize meshgrid values
-  [xi, eta] = meshgrid(linspace(-1, 1, Nplot), linspace(-1, 1, Nplot))
-  Z = zeros(shape(xi))
-  X = zeros(shape(xi))
-  Y = zeros(shape(xi))
-  
   # Calculate plot values and locations
-  for i in range(Nplot):
-    for j in range(Nplot):
+  X = []
+  Y = []
+  Z = []
+  for i in range(nPlot+1):
+    for j in range(nPlot+1):
+      xi = -1 + 2*j/nPlot
+      eta = -1 + 2*i/nPlot
+      [xval, yval] = Q4_map(xd, yd, xi, eta)
+      X.append(xval)
+      Y.append(yval)
       if (output == 'J'):
-        Z[i,j] = linalg.det(Q4_J(x1234, y1234, xi[i,j], eta[i,j]))
+        Z.append(linalg.det(Q4_J(x1234, y1234, xi, eta)))
+      elif (type2D == 'diffusion'):
+        if (output == 'T'):
+          Z.append(Q4_map(u, xi=xi, eta=eta))
+        elif (output == 'qx' or output == 'qy'):
+          Z.append(-Q4_stress(x1234, y1234, u, xi, eta, D, type2D=type2D, output=output))
+        else:
+          print('Mismatch between output type and type2D: ', type2D, ' has no output ', output)
+          raise Exception
       elif (output == 'VM' or output == 'sigx' or output == 'sigy' or output == 'tauxy' or output == 'sig1' or output == 'sig2'):
-        Z[i,j] = Q4_stress(x1234, y1234, u, xi[i,j], eta[i,j], D, type2D=type2D, output=output)
+        Z.append(Q4_stress(x1234, y1234, u, xi, eta, D, type2D=type2D, output=output))
       elif (output == 'epsx' or output == 'epsy' or output == 'gammaxy'):
-        eps = Q4_strain(x1234, y1234, u, xi[i,j], eta[i,j], type2D=type2D)
-        if (output == 'epsx'):
-          Z[i,j] = eps[0]
-        elif (output == 'epsy'):
-          Z[i,j] = eps[1]
-        else:
-          Z[i,j] = eps[2]
+        Z.append(Q4_strain(x1234, y1234, u, xi, eta, type2D=type2D, output=output))
       else:
         print('Output type', output, ' not supported')
         raise Exception
-      [X[i,j], Y[i,j]] = Q4_map(xd, yd, xi[i,j], eta[i,j])
   
   # Plot things
   if (undeformedLines):
-    x=x1234.copy()
-    x.append(x1234[0])
-    y=y1234.copy()
-    y.append(y1234[0])
-    plot(x, y, 'k--')
-  if (deformedLines):
-    x=xd.copy()
-    x.append(xd[0])
-    y=yd.copy()
-    y.append(yd[0])
-    plot(x, y, 'k')
-
-  if (minMax == None):
-    return contourf(X, Y, Z, cmap=colormap)
-  else:
-    
-    lenMinMax = len(minMax)
-    if lenMinMax != 2:
-      print('Warning: minMax (in C4_plot) should be a list of two values')
+    x = list(x1234) + [x1234[0]]
+    y = list(y1234) + [y1234[0]]
+    pyplot.plot(x, y, 'k--')
+  if (deformedLines and type2D != 'diffusion'):
+    x = xd + [xd[0]]
+    y = yd + [yd[0]]
+    pyplot.plot(x, y, 'k')
 
-    return contourf(X, Y, Z, cmap=colormap, vmin=minMax[0], vmax=minMax[1], levels=10)
+  if (minMax != None and len(minMax) != 2):
+    print('Warning: minMax (in Q4_plotSingle) should be a list of two values')
+  return [X, Y, Z]
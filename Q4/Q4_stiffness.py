@@ -11,12 +11,17 @@ def Q4_stiffness(x1234, y1234, xi, eta, D, thickness=None, type2D='planeStress')
   eta - (float) position in unmapped element
   D - (array) constituitive matrix
   thickness - (float) thickness of element in third dimension
+  type2D - (string) "planeStress", "planeStrain", "axisymmetric", or "diffusion"
+  Multiply by the weights of quadPoints('quad', ...) and sum to integrate.
   """
-  from numpy import array
+  from numpy import array, linalg, transpose, pi
   from .Q4_B import Q4_B
+  from .Q4_J import Q4_J
   from .Q4_shapeFunctions import Q4_shapeFunctions
   B = Q4_B(x1234, y1234, xi, eta, type2D)
   if (type2D == 'axisymmetric'):
     psi = Q4_shapeFunctions(xi, eta)
     thickness = 2*pi*(array(x1234) @ array(psi))
-  return Q4_area(x1234, y1234)*thickness*(transpose(B)@D@B)
+  # The quad quadrature weights sum to 4, the area of the reference square
+  Area = linalg.det(Q4_J(x1234, y1234, xi, eta))
+  return Area*thickness*(transpose(B)@D@B)
@@ -0,0 +1,34 @@
+def Q4_stiffnessBatch(xnode, ynode, conn, D, thickness=None, type2D='planeStress', gaussPoints=None):
+  """
+  Calculate the integrated stiffness matrices of every Q4 element at once.
+  Usage - kElem = Q4_stiffnessBatch(xnode, ynode, conn, D, thickness, type2D, gaussPoints)
+  Gives the same matrices as summing Q4_stiffness(...) * weight over the Gauss
+  points for each element, but with all elements handled as array operations.
+  ---------
+    Input
+  ---------
+  xnode - (list or array) x locations of all nodes
+  ynode - (list or array) y locations of all nodes
+  conn - (list of lists or nElem x 4 array) connectivity of Q4 elements (counter-clockwise)
+  D - (array) constituitive matrix (or nElem x D for per-element properties)
+  thickness - (float or nElem array) thickness of elements in third dimension
+              (ignored for axisymmetric)
+  type2D - (string) "planeStress", "planeStrain", "axisymmetric", or "diffusion"
+  gaussPoints - (quadPoints) quadrature used for integration - defaults to 2x2 Gauss points
+  ----------
+    Output
+  ----------
+  kElem - (nElem x 4*nDOF x 4*nDOF array) element stiffness matrices, in the order of conn
+  """
+  from numpy import asarray
+  from ..common.helpers import connArray
+  from ..common.quadPoints import quadPoints
+  from ..common.elementQuadrature import stiffnessQuadrature
+
+  if (gaussPoints == None):
+    gaussPoints = quadPoints('quad', 3)
+
+  connArr, index = connArray(conn)
+  xElem = asarray(xnode, dtype=float)[connArr]
+  yElem = asarray(ynode, dtype=float)[connArr]
+  return stiffnessQuadrature(xElem, yElem, D, thickness, type2D, gaussPoints, 'Q4')
@@ -16,6 +16,7 @@ def Q4_stress(x1234, y1234, u, xi, eta, D, type2D='PlaneStress', output='VM'):
       'VM' - von Mises stress
       'sigx', 'sigy', or 'tauxy' - normal stress in x or y, or shear stress
       'sig1' or 'sig2' - maximum or minimum principal stress
+      'qx' or 'qy' - components of D @ grad(T) for diffusion
   ----------
     Output
   ----------
@@ -26,9 +27,9 @@ def Q4_stress(x1234, y1234, u, xi, eta, D, type2D='PlaneStress', output='VM'):
 
   eps = array(Q4_strain(x1234, y1234, u, xi, eta, type2D))
   sigxy = D @ eps
-  if (output == 'sigx'):
+  if (output == 'sigx' or output=='qx'):
     return sigxy[0]
-  elif (output == 'sigy'):
+  elif (output == 'sigy' or output=='qy'):
     return sigxy[1]
   elif (output == 'tauxy'):
     return sigxy[2]
@@ -36,10 +37,12 @@ def Q4_stress(x1234, y1234, u, xi, eta, D, type2D='PlaneStress', output='VM'):
     sigx = sigxy[0]
     sigy = sigxy[1]
     tauxy = sigxy[2]
-    sig1 = (sigx + sigy)/2 + sqrt((sigx - sigy)**2/2 + tauxy**2)
-    sig2 = (sigx + sigy)/2 - sqrt((sigx - sigy)**2/2 + tauxy**2)
+    sig1 = (sigx + sigy)/2 + sqrt(((sigx - sigy)/2)**2 + tauxy**2)
+    sig2 = (sigx + sigy)/2 - sqrt(((sigx - sigy)/2)**2 + tauxy**2)
     if (type2D == 'planeStrain'):
-      sig3 = nu*E/((1+nu)*(1-2*nu)) * (eps[0]+eps[1])
+      # D[0,1] / (D[0,0] + D[0,1]) recovers Poisson's ratio
+      nu = D[0][1] / (D[0][0] + D[0][1])
+      sig3 = nu*(sigx + sigy)
     else:
       sig3 = 0
     if (output == 'sig1'):
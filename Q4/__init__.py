@@ -4,4 +4,6 @@ from .Q4_plot import Q4_plot
 from .Q4_plotSingle import Q4_plotSingle, Q4_map
 from .Q4_shapeFunctions import Q4_shapeFunctions, Q4_shapeDerivatives
 from .Q4_stiffness import Q4_stiffness
+from .Q4_stiffnessBatch import Q4_stiffnessBatch
 from .Q4_strain import Q4_strain
+from .Q4_stress import Q4_stress
@@ -69,7 +69,11 @@ class BC:
   def __str__(self):
     return f"BC with {self.kind} kind on {self.geom} (nodes {self.nodes}): value={self.value}, coefficient={self.coefficient}."
   def copy(self):
-    return BC(geom=self.geom, nodes=self.nodes, kind=self.kind, value=self.value, coefficient=self.coefficient)
+    # Copy without re-running the checks, as LST line BCs hold 3 nodes
+    from copy import copy
+    bc = copy(self)
+    bc.nodes = list(self.nodes)
+    return bc
 
   def VarType(self, valOrCoef):
     if (valOrCoef == 'value'):
@@ -2,8 +2,20 @@ from .constMatrix import constMatrix
 from .helpers import connIndex
 from .nDOF import nDOF
 from .isElemOnLeft import isElemOnLeft
-from .meshRefine import meshRefine
+from .meshRefine import meshRefine, meshRefineArrays
 from .BC import BC
 from .quadPoints import quadPoints
-from .applyBCs import applyBCs, convectionBC
+from .applyBCs import applyBCs, applyBCsSparse, convectionBC, dofMap
+from .assemble import assemble, assembleStiffness, assemblyPlan, elemDOFs, elementStiffness, assembleMass, elementMass
 from .faceArea import faceArea, lineLength
+from .stiffnessCache import stiffnessCache
+from .solvers import pcg
+from .matrixFree import stiffnessOperator
+from .multigrid import multigrid
+from .renumber import renumberNodes, rcmPermutation
+from .banded import bandedCholesky, bandStats
+from .loadCases import loadCaseSolver
+from .transient import thetaMethod, thetaStepper, adaptiveThetaMethod
+from .nonlinear import newtonDiffusion
+from .sweep import parameterSweep
+from .mesh import Mesh
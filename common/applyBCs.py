@@ -1,7 +1,61 @@
 from .faceArea import faceArea, lineLength
 from .quadPoints import quadPoints
-from ..LST.LST_shapeFunctions import LST_shapeFunctions
-from numpy import zeros, array
+from .helpers import meshBCsInput
+from numpy import zeros, array, full
+
+# ---------------------------------------------------------------------------
+
+def bcVariation(bc, valOrCoef, x, y, s=None):
+  '''
+  Evaluate the value or coefficient of a BC at a set of points.
+  x, y - (arrays) physical locations of the points
+  s - (array) normalized position along a line (0 to 1), for NumPy polynomials
+  Returns None if the type of variation is not allowed (polynomials on faces).
+  '''
+  if (valOrCoef == 'value'):
+    val = bc.value
+  else:
+    val = bc.coefficient
+  varType = bc.VarType(valOrCoef)
+  if (varType == 'const'):
+    return full(len(x), float(val))
+  elif (varType == 'poly' and s is not None):
+    return val(s)
+  elif (varType == 'func'):
+    return array([val(xk, yk) for xk, yk in zip(x, y)], dtype=float)
+  return None
+
+# ---------------------------------------------------------------------------
+
+def bcQuadrature(bc, nNode, precision, caller):
+  '''
+  Find the quadrature and element family for the nodes of a line or face BC.
+    lines - 3 nodes (LST, quadratic) or 2 nodes (CST, linear)
+    faces - 6 nodes (LST), 3 nodes (CST), or 4 nodes (Q4)
+  '''
+  if (bc.geom == 'line' and nNode == 3):
+    return quadPoints('line', precision), 'LST'
+  elif (bc.geom == 'line' and nNode == 2):
+    return quadPoints('line', precision), 'CST'
+  elif (bc.geom == 'face' and nNode == 6):
+    return quadPoints('triangle', precision), 'LST'
+  elif (bc.geom == 'face' and nNode == 3):
+    return quadPoints('triangle', precision), 'CST'
+  elif (bc.geom == 'face' and nNode == 4):
+    return quadPoints('quad', precision), 'Q4'
+  print('len(xBC) = ', nNode, ', bc.geom = ', bc.geom)
+  raise Exception('Problem in ' + caller + ': only LST, CST, and Q4 elements implemented')
+
+def faceScale(qP, family, xBC, yBC):
+  '''
+  Area factor of a face at each quadrature point.  Triangles use the face area
+  (weights sum to 1); quads use det(J) at each point (weights sum to 4).
+  '''
+  from .elementQuadrature import mapElements
+  if (family == 'Q4'):
+    [psi, detJ, dpsidxy] = mapElements(array([xBC], dtype=float), array([yBC], dtype=float), qP, family)
+    return detJ[0]
+  return faceArea(xBC, yBC)
 
 # ---------------------------------------------------------------------------
 
@@ -9,120 +63,56 @@ def convectionBC(bc, xBC, yBC, thickness, precision=5):
   '''
   Create stiffness matrix and force vector for a convection boundary condition.
   '''
-  if not (len(xBC) == 6 and bc.geom == 'face') and not (len(xBC) ==3 and bc.geom == 'line'):
-    print('len(xBC) = ', len(xBC), ', bc.geom = ', bc.geom)
-    raise Exception('Problem in convectionBC: LST elements implemented')
+  qP, family = bcQuadrature(bc, len(xBC), precision, 'convectionBC')
   if (bc.geom == 'line'):
     # Find the convection stiffness and force for a line
-    
-    L = lineLength(xBC, yBC)  
-    
-    # Set up shape functions, x, and y as functions of xi
-    psi1 = lambda xi: LST_shapeFunctions(xi, 0)[0]
-    psi2 = lambda xi: LST_shapeFunctions(xi, 0)[5]
-    psi3 = lambda xi: LST_shapeFunctions(xi, 0)[1]
-    x = lambda xi: psi1(xi)*xBC[0] + psi2(xi)*xBC[1] + psi3(xi)*xBC[2]
-    y = lambda xi: psi1(xi)*yBC[0] + psi2(xi)*yBC[1] + psi3(xi)*yBC[2]
-    
-    # Set up Tinf as a function of xi
-    if (bc.VarType('value') == 'const'):
-      Tinf = lambda xi: bc.value
-    elif (bc.VarType('value') == 'poly'):
-      Tinf = lambda xi: bc.value(xi)
-    elif (bc.VarType('value') == 'func'):
-      Tinf = lambda xi: bc.value(x(xi), y(xi))
-    else:
-      print ('bc.VarType("value") = ', bc.VarType("value"))
-      raise Exception('Problem in convectionBC: bc.value must be a constant, NumPy polynomial, or function')
-    
-    # Set up h as a function of xi
-    if (bc.VarType('coefficient') == 'const'):
-      h = lambda xi: bc.coefficient
-    elif (bc.VarType('coefficient') == 'poly'):
-      h = lambda xi: bc.coefficient(xi)
-    elif (bc.VarType('coefficient') == 'func'):
-      h = lambda xi: bc.coefficient(x(xi), y(xi))
-    else:
-      raise Exception('Problem in convectionBC: bc.value must be a constant, NumPy polynomial, or function')
-    
-    # perform integration of forces and stiffness matrix using Gaussian quadrature
-    qP = quadPoints('line', precision)
-    kbc = zeros([3, 3])
-    forces = zeros(3)
-    for k, xi in enumerate(qP.points):
-      for i, pi in enumerate([psi1, psi2, psi3]):
-        forces[i] += L*thickness*h(xi)*Tinf(xi)*pi(xi)*qP.weights[k]
-        for j, pj in enumerate([psi1, psi2, psi3]):
-          kbc[i, j] += L*thickness*h(xi)*pi(xi)*pj(xi)*qP.weights[k]
+    scale = lineLength(xBC, yBC)*thickness
+    s = qP.points
   elif (bc.geom == 'face'):
     # Find the convection stiffness and force on a face
-    
-    # Set up shape functions, x, and y as functions of xi
-    psi = lambda xi, eta: LST_shapeFunctions(xi, eta)
-    x = lambda xi, eta: array(psi(xi, eta))@array(xBC)
-    y = lambda xi, eta: array(psi(xi, eta))@array(yBC)
-    Area = faceArea(xBC, yBC)
-
-    # Set up Tinf as a function of xi
-    if (bc.VarType('value') == 'const'):
-      Tinf = lambda xi, eta: bc.value
-    elif (bc.VarType('value') == 'func'):
-      Tinf = lambda xi, eta: bc.value(x(xi, eta), y(xi, eta))
-    else:
-      raise Exception('Problem in convectionBC: for faces, bc.value must be a constant or function')
-    
-    # Set up h as a function of xi
-    if (bc.VarType('coefficient') == 'const'):
-      h = lambda xi, eta: bc.coefficient
-    elif (bc.VarType('coefficient') == 'func'):
-      h = lambda xi, eta: bc.coefficient(x(xi, eta), y(xi, eta))
-    else:
-      raise Exception('Problem in convectionBC: for faces, bc.value must be a constant or function')
-    
-    # perform integration of forces and stiffness matrix using Gaussian quadrature
-    qP = quadPoints('triangle', precision)
-    kbc = zeros([6, 6])
-    forces = zeros(6)
-    for k, xieta in enumerate(qP.points):
-      xi, eta = xieta
-      for i in range(0, 6):
-        forces[i] += Area*h(xi, eta)*Tinf(xi, eta)*psi(xi, eta)[i]*qP.weights[k]
-        for j in range(0, 6):
-          kbc[i, j] += Area*h(xi, eta)*psi(xi, eta)[i]*psi(xi, eta)[j]*qP.weights[k]
+    scale = faceScale(qP, family, xBC, yBC)
+    s = None
+
+  # Shape functions and x, y at the quadrature points
+  psi = qP.shapeFunctions(family)
+  x = psi @ array(xBC, dtype=float)
+  y = psi @ array(yBC, dtype=float)
+  
+  # Tinf and h at the quadrature points
+  Tinf = bcVariation(bc, 'value', x, y, s)
+  if (Tinf is None):
+    raise Exception('Problem in convectionBC: for faces, bc.value must be a constant or function')
+  h = bcVariation(bc, 'coefficient', x, y, s)
+  if (h is None):
+    raise Exception('Problem in convectionBC: for faces, bc.value must be a constant or function')
+  
+  # perform integration of forces and stiffness matrix using Gaussian quadrature
+  w = scale*h*qP.weights
+  kbc = psi.T @ (w[:, None]*psi)
+  forces = psi.T @ (w*Tinf)
   return kbc, forces
 
 # ---------------------------------------------------------------------------
 def flowBC(bc, xBC, yBC, precision=5):
   '''
   Create force vector for a flow boundary condition.
+  The total flow is split between the nodes in proportion to the integral of
+  each shape function over the line or face.
   '''
-  if not (len(xBC) == 6 and bc.geom == 'face') and not (len(xBC) ==3 and bc.geom == 'line'):
-    raise Exception('Problem in convectionBC: LST elements implemented')
-  if (bc.geom == 'line'):
-    # Find the force for a line
-    
-    L = lineLength(xBC, yBC)  
-    
-    # Set up Tinf as a function of xi
-    if (bc.VarType('value') == 'const'):
-      Q = bc.value
-    else:
-      print ('bc.VarType("value") = ', bc.VarType("value"))
-      raise Exception('Problem in convectionBC: bc.value must be a constant for flow')
-    forces = [Q/6, 2*Q/3, Q/6]
-      
-  elif (bc.geom == 'face'):
-    # Find the force for a face
-    
-    Area = faceArea(xBC, yBC)  
-    
-    # Set up Tinf as a function of xi
-    if (bc.VarType('value') == 'const'):
-      Q = bc.value
-    else:
-      print ('bc.VarType("value") = ', bc.VarType("value"))
-      raise Exception('Problem in convectionBC: bc.value must be a constant for flow')
-    forces = [0, 0, 0, 1/3, 1/3, 1/3]
+  qP, family = bcQuadrature(bc, len(xBC), precision, 'flowBC')
+  if (bc.VarType('value') == 'const'):
+    Q = bc.value
+  else:
+    print ('bc.VarType("value") = ', bc.VarType("value"))
+    raise Exception('Problem in convectionBC: bc.value must be a constant for flow')
+  
+  psi = qP.shapeFunctions(family)
+  if (bc.geom == 'face' and family == 'Q4'):
+    # Distorted quads do not split the flow evenly
+    w = faceScale(qP, family, xBC, yBC)*qP.weights
+  else:
+    w = qP.weights
+  forces = Q * (psi.T @ w) / w.sum()
   return forces
 
 # ---------------------------------------------------------------------------
@@ -130,73 +120,51 @@ def fluxBC(bc, xBC, yBC, thickness, precision=5):
   '''
   Create force vector for a flux boundary condition.
   '''
-  if not (len(xBC) == 6 and bc.geom == 'face') and not (len(xBC) ==3 and bc.geom == 'line'):
-    raise Exception('Problem in convectionBC: LST elements implemented')
+  qP, family = bcQuadrature(bc, len(xBC), precision, 'fluxBC')
   if (bc.geom == 'line'):
-    # Find the convection stiffness and force for a line
-    
-    L = lineLength(xBC, yBC)  
-    
-    # Set up shape functions, x, and y as functions of xi
-    psi1 = lambda xi: LST_shapeFunctions(xi, 0)[0]
-    psi2 = lambda xi: LST_shapeFunctions(xi, 0)[5]
-    psi3 = lambda xi: LST_shapeFunctions(xi, 0)[1]
-    x = lambda xi: psi1(xi)*xBC[0] + psi2(xi)*xBC[1] + psi3(xi)*xBC[2]
-    y = lambda xi: psi1(xi)*yBC[0] + psi2(xi)*yBC[1] + psi3(xi)*yBC[2]
-    
-    # Set up Tinf as a function of xi
-    if (bc.VarType('value') == 'const'):
-      q = lambda xi: bc.value
-    elif (bc.VarType('value') == 'poly'):
-      q = lambda xi: bc.value(xi)
-    elif (bc.VarType('value') == 'func'):
-      q = lambda xi: bc.value(x(xi), y(xi))
-    else:
-      print ('bc.VarType("value") = ', bc.VarType("value"))
-      raise Exception('Problem in convectionBC: bc.value must be a constant, NumPy polynomial, or function')
-    
-    # perform integration of forces and stiffness matrix using Gaussian quadrature
-    qP = quadPoints('line', precision)
-    kbc = zeros([3, 3])
-    forces = zeros(3)
-    for k, xi in enumerate(qP.points):
-      for i, pi in enumerate([psi1, psi2, psi3]):
-        forces[i] += L*thickness*q(xi)*pi(xi)*qP.weights[k]
-        
+    # Find the force for a line
+    scale = lineLength(xBC, yBC)*thickness
+    s = qP.points
   elif (bc.geom == 'face'):
-    # Find the convection stiffness and force on a face
-    
-    # Set up shape functions, x, and y as functions of xi
-    psi = lambda xi, eta: LST_shapeFunctions(xi, eta)
-    x = lambda xi, eta: array(psi(xi, eta))@array(xBC)
-    y = lambda xi, eta: array(psi(xi, eta))@array(yBC)
-    Area = faceArea(xBC, yBC)
-
-    # Set up Tinf as a function of xi
-    if (bc.VarType('value') == 'const'):
-      q = lambda xi, eta: bc.value
-    elif (bc.VarType('value') == 'func'):
-      q = lambda xi, eta: bc.value(x(xi, eta), y(xi, eta))
-    else:
-      raise Exception('Problem in convectionBC: for faces, bc.value must be a constant or function')
-    
-    # perform integration of forces and stiffness matrix using Gaussian quadrature
-    qP = quadPoints('triangle', precision)
-    kbc = zeros([6, 6])
-    forces = zeros(6)
-    for k, xieta in enumerate(qP.points):
-      xi, eta = xieta
-      for i in range(0, 6):
-        forces[i] += Area*q(xi, eta)*psi(xi, eta)[i]*qP.weights[k]
-
+    # Find the force on a face
+    scale = faceScale(qP, family, xBC, yBC)
+    s = None
+  
+  # Shape functions and x, y at the quadrature points
+  psi = qP.shapeFunctions(family)
+  x = psi @ array(xBC, dtype=float)
+  y = psi @ array(yBC, dtype=float)
+  
+  # q at the quadrature points
+  q = bcVariation(bc, 'value', x, y, s)
+  if (q is None):
+    raise Exception('Problem in convectionBC: for faces, bc.value must be a constant or function')
+  
+  # perform integration of forces using Gaussian quadrature
+  forces = psi.T @ (scale*q*qP.weights)
   return forces
 # ---------------------------------------------------------------------------
 
-def applyBCs(k, bcs, xnode, ynode, thickness, type2D, index):
+def boundaryTerms(bcs, xnode, ynode, thickness, type2D, index):
+  """
+  Collect the contributions of all boundary conditions without touching a stiffness matrix.
+  Usage - [rows, cols, vals, forces, fixedDOF, fixedValue] = boundaryTerms(bcs, xnode, ynode, thickness, type2D, index)
+  ----------
+    Output
+  ----------
+  rows, cols, vals - (arrays) stiffness entries to add (convection), as COO triplets
+  forces - (array) force vector from all non-constraint BCs
+  fixedDOF - (array) zero-indexed DOFs with a temperature constraint
+  fixedValue - (array) constrained values, in the order of fixedDOF
+  """
+  from numpy import array
   
-  kbc = k.copy()
-  forces = [0]*len(k)
-  nDOF = len(k)/len(xnode)
+  rows = []
+  cols = []
+  vals = []
+  forces = zeros(len(xnode))
+  fixedDOF = []
+  fixedValue = []
   if type2D == 'diffusion':
     # Check for incompatible kinds
     for bc in bcs:
@@ -218,7 +186,9 @@ def applyBCs(k, bcs, xnode, ynode, thickness, type2D, index):
         kconv, fconv = convectionBC(bc, xElem, yElem, thickness)
         for i, inode in enumerate(bc.nodes):
           for j, jnode in enumerate(bc.nodes):
-            kbc[inode-index, jnode-index] += kconv[i, j]
+            rows.append(inode-index)
+            cols.append(jnode-index)
+            vals.append(kconv[i, j])
           forces[inode-index] += fconv[i]
       elif bc.kind == 'flow':
         fflow = flowBC(bc, xElem, yElem)
@@ -229,25 +199,162 @@ def applyBCs(k, bcs, xnode, ynode, thickness, type2D, index):
         for i, inode in enumerate(bc.nodes):
           forces[inode - index] += fflux[i]
         
-    # Apply temperature constraints
+    # Collect temperature constraints
     for bc in bcs:
       if bc.kind == 'temperature':  
         for i, bcnode in enumerate(bc.nodes):
           node = bcnode - index
-          kbc[node, :] = 0
-          kbc[node, node] = 1
+          fixedDOF.append(node)
           if bc.VarType("value") == 'const':
-            forces[node] = bc.value
+            fixedValue.append(bc.value)
           elif bc.VarType("value") == 'poly':  # poly only allowed on lines
-            forces[node] = bc.value(i/(len(bc.nodes)-1))
+            fixedValue.append(bc.value(i/(len(bc.nodes)-1)))
           elif bc.VarType("value") == 'func':
             x = xnode[node]
             y = ynode[node]
-            forces[node] = bc.value(x, y)
+            fixedValue.append(bc.value(x, y))
   elif type2D == 'planeStress' or type2D == 'planeStrain':
     raise Exception('planeStress and planeStrain BCs not yet implemented')
   elif type2D == 'axisymmetric':
     raise Exception('axisymmetric BCs not yet implemented')
   else:
     raise Exception('Error when applying BCs: diffusion BCs must be one of: \n "temperature", "convection", "flux", or "flow".')
-  return kbc, forces
\ No newline at end of file
+  return [array(rows, dtype=int), array(cols, dtype=int), array(vals, dtype=float), 
+          forces, array(fixedDOF, dtype=int), array(fixedValue, dtype=float)]
+
+# ---------------------------------------------------------------------------
+
+class dofMap:
+  """
+  Map between the reduced (free DOF) system and the full set of DOFs.
+  Returned by applyBCs and applyBCsSparse with method='reduce'.
+  Usage - u = bcMap.expand(uFree)
+  
+  Contains the following attributes:
+    nDOF - (int) size of the full system
+    free - (array) zero-indexed free DOFs, in the order of the reduced system
+    fixed - (array) zero-indexed constrained DOFs
+    fixedValue - (array) constrained values, in the order of fixed
+  """
+  def __init__(self, nDOF, fixedDOF, fixedValue):
+    from numpy import ones, unique, zeros
+    
+    # A node shared by two temperature BCs takes the value of the last one
+    values = zeros(nDOF)
+    values[fixedDOF] = fixedValue
+    isFree = ones(nDOF, dtype=bool)
+    isFree[fixedDOF] = False
+    self.nDOF = nDOF
+    self.free = isFree.nonzero()[0]
+    self.fixed = unique(fixedDOF)
+    self.fixedValue = values[self.fixed]
+  
+  def expand(self, uFree):
+    """
+    Scatter a solution of the reduced system (or nFree x nCases) into the full set of DOFs,
+    filling in the constrained values.
+    """
+    from numpy import asarray, zeros
+    
+    uFree = asarray(uFree, dtype=float)
+    u = zeros((self.nDOF,) + uFree.shape[1:])
+    u[self.free] = uFree
+    u[self.fixed] = self.fixedValue.reshape((-1,) + (1,)*(uFree.ndim - 1))
+    return u
+
+# ---------------------------------------------------------------------------
+
+def constrainDOFs(kbc, forces, fixedDOF, fixedValue, method, caller):
+  # Apply temperature constraints to the assembled matrix and forces (dense or CSR)
+  #   'row' - replace each constrained row with a 1 on the diagonal (unsymmetric)
+  #   'symmetric' - also move the known values to the right hand side (lifting)
+  #                 and zero the constrained columns, keeping the matrix symmetric
+  #   'reduce' - keep only the free DOFs, and return a dofMap as well
+  from numpy import ones, ix_
+  from scipy.sparse import diags, issparse
+  
+  nRow = kbc.shape[0]
+  if (method == 'reduce'):
+    bcMap = dofMap(nRow, fixedDOF, fixedValue)
+    free = bcMap.free
+    fixed = bcMap.fixed
+    if (issparse(kbc)):
+      kfree = kbc[free]
+      kff = kfree[:, free].tocsr()
+      forcesFree = forces[free] - kfree[:, fixed] @ bcMap.fixedValue
+    else:
+      kff = kbc[ix_(free, free)]
+      forcesFree = forces[free] - kbc[ix_(free, fixed)] @ bcMap.fixedValue
+    return [kff, forcesFree, bcMap]
+  elif (method == 'symmetric'):
+    lift = zeros(nRow)
+    lift[fixedDOF] = fixedValue
+    forces = forces - kbc @ lift
+  elif (method != 'row'):
+    raise Exception('Error in ' + caller + ': method must be "row", "symmetric", or "reduce".')
+  
+  free = ones(nRow)
+  free[fixedDOF] = 0
+  if (issparse(kbc)):
+    if (method == 'symmetric'):
+      kbc = (diags(free) @ kbc @ diags(free) + diags(1 - free)).tocsr()
+    else:
+      kbc = (diags(free) @ kbc + diags(1 - free)).tocsr()
+    kbc.eliminate_zeros()
+  else:
+    kbc[fixedDOF, :] = 0
+    if (method == 'symmetric'):
+      kbc[:, fixedDOF] = 0
+    kbc[fixedDOF, fixedDOF] = 1
+  forces[fixedDOF] = fixedValue
+  return [kbc, forces]
+
+# ---------------------------------------------------------------------------
+
+@meshBCsInput
+def applyBCs(k, bcs, xnode, ynode, thickness, type2D, index, method='row'):
+  """
+  Apply boundary conditions to a dense global stiffness matrix.
+  Usage - [kbc, forces] = applyBCs(k, bcs, xnode, ynode, thickness, type2D, index)
+          [kff, forces, bcMap] = applyBCs(k, bcs, xnode, ynode, thickness, type2D, index, method='reduce')
+          [kbc, forces] = applyBCs(k, mesh, thickness, type2D)
+  method - (string) how temperature constraints are imposed:
+      'row' - replace the row of the constrained node with a 1 on the diagonal
+      'symmetric' - as 'row', but the known values are also moved to the right hand
+                    side and the columns zeroed, so kbc stays symmetric (for
+                    Cholesky or pcg).  The solution includes the constrained values.
+      'reduce' - return only the free DOF system, with a dofMap whose
+                 expand(uFree) gives the full solution
+  A Mesh can take the place of bcs, xnode, ynode, and index (its BCs and nodes are
+  numbered from 0).
+  """
+  from numpy import add
+  
+  [rows, cols, vals, forces, fixedDOF, fixedValue] = boundaryTerms(bcs, xnode, ynode, thickness, type2D, index)
+  kbc = k.copy()
+  add.at(kbc, (rows, cols), vals)
+  
+  # Apply temperature constraints
+  result = constrainDOFs(kbc, forces, fixedDOF, fixedValue, method, 'applyBCs')
+  if (method == 'row'):
+    return result[0], list(result[1])
+  return result
+
+# ---------------------------------------------------------------------------
+
+@meshBCsInput
+def applyBCsSparse(k, bcs, xnode, ynode, thickness, type2D, index, method='row'):
+  """
+  Apply boundary conditions to a sparse global stiffness matrix (e.g. from assemble).
+  Usage - [kbc, forces] = applyBCsSparse(k, bcs, xnode, ynode, thickness, type2D, index)
+          [kff, forces, bcMap] = applyBCsSparse(k, bcs, xnode, ynode, thickness, type2D, index, method='reduce')
+          [kbc, forces] = applyBCsSparse(k, mesh, thickness, type2D)
+  Same result as applyBCs (including method), but the matrix stays in CSR format throughout.
+  """
+  from scipy.sparse import coo_matrix, csr_matrix
+  
+  [rows, cols, vals, forces, fixedDOF, fixedValue] = boundaryTerms(bcs, xnode, ynode, thickness, type2D, index)
+  kbc = csr_matrix(k) + coo_matrix((vals, (rows, cols)), shape=k.shape).tocsr()
+  
+  # Apply temperature constraints
+  return constrainDOFs(kbc, forces, fixedDOF, fixedValue, method, 'applyBCsSparse')
@@ -0,0 +1,323 @@
+from .helpers import meshInput
+
+def elemDOFs(conn, nDOF=1):
+  """
+  Find the global degrees of freedom of every element.
+  Usage - dofs = elemDOFs(conn, nDOF)
+  ---------
+    Input
+  ---------
+  conn - (list of lists or array) connectivity of elements
+  nDOF - (int) degrees of freedom per node
+  ----------
+    Output
+  ----------
+  dofs - (nElem x nNodeElem*nDOF array) zero-indexed global DOFs, ordered
+         [node1 DOF1, node1 DOF2, node2 DOF1, ...] to match the element matrices
+  """
+  from numpy import arange
+  from .helpers import connArray
+
+  connArr, index = connArray(conn)
+  nElem, nNodeElem = connArr.shape
+  dofs = connArr[:, :, None]*nDOF + arange(nDOF)
+  return dofs.reshape(nElem, nNodeElem*nDOF)
+
+def assemble(kElem, conn, nNode=None, nDOF=1, format='csr'):
+  """
+  Assemble a stack of element matrices into a sparse global matrix.
+  Usage - kg = assemble(kElem, conn, nNode, nDOF)
+  Duplicate entries (from nodes shared between elements) are summed.
+  ---------
+    Input
+  ---------
+  kElem - (nElem x n x n array) element matrices, in the order of conn
+  conn - (list of lists or array) connectivity of elements
+  nNode - (int) total number of nodes - defaults to the largest node in conn
+  nDOF - (int) degrees of freedom per node
+  format - (string) 'csr' or 'coo' for the returned SciPy sparse matrix
+  ----------
+    Output
+  ----------
+  kg - (sparse matrix) global matrix, nNode*nDOF x nNode*nDOF
+  """
+  from numpy import asarray, broadcast_to
+  from scipy.sparse import coo_matrix
+
+  dofs = elemDOFs(conn, nDOF)
+  nElem, n = dofs.shape
+  if (nNode == None):
+    nNode = dofs.max()//nDOF + 1
+  kElem = asarray(kElem, dtype=float)
+  if (kElem.shape != (nElem, n, n)):
+    raise Exception('Error in assemble: kElem should be nElem x ' + str(n) + ' x ' + str(n) + ', was ' + str(kElem.shape))
+
+  rows = broadcast_to(dofs[:, :, None], (nElem, n, n)).ravel()
+  cols = broadcast_to(dofs[:, None, :], (nElem, n, n)).ravel()
+  kg = coo_matrix((kElem.ravel(), (rows, cols)), shape=(nNode*nDOF, nNode*nDOF))
+  if (format == 'coo'):
+    kg.sum_duplicates()
+    return kg
+  elif (format == 'csr'):
+    return kg.tocsr()
+  else:
+    raise Exception('Error in assemble: format must be "csr" or "coo".')
+
+class assemblyPlan:
+  """
+  Sparsity pattern and scatter map for repeated assembly on a fixed mesh.
+  Usage - plan = assemblyPlan(conn, nDOF, nNode)
+          kg = plan.assemble(kElem)
+  The CSR pattern and the map from every element matrix entry to its position in
+  the CSR data array are found once.  Each later assembly is a single bincount
+  into the preallocated data array, with no pattern search or reallocation.
+  
+  Contains the following attributes:
+    shape - (tuple) shape of the global matrix
+    nnz - (int) number of stored entries
+    indices, indptr - (arrays) CSR column indices and row pointers
+    scatter - (array) position in the data array of every entry of kElem (raveled)
+    data - (array) preallocated data array
+  """
+  def __init__(self, conn, nDOF=1, nNode=None):
+    from numpy import broadcast_to, unique, zeros, bincount, cumsum, int64
+    
+    dofs = elemDOFs(conn, nDOF)
+    nElem, n = dofs.shape
+    if (nNode == None):
+      nNode = dofs.max()//nDOF + 1
+    N = nNode*nDOF
+    
+    rows = broadcast_to(dofs[:, :, None], (nElem, n, n)).ravel().astype(int64)
+    cols = broadcast_to(dofs[:, None, :], (nElem, n, n)).ravel().astype(int64)
+    [keys, self.scatter] = unique(rows*N + cols, return_inverse=True)
+    
+    self.shape = (N, N)
+    self.nnz = len(keys)
+    self.nElem = nElem
+    self.n = n
+    self.indices = (keys % N).astype(dofs.dtype)
+    self.indptr = zeros(N + 1, dtype=dofs.dtype)
+    self.indptr[1:] = cumsum(bincount(keys // N, minlength=N))
+    self.data = zeros(self.nnz)
+
+  def assemble(self, kElem, copy=True):
+    """
+    Assemble a stack of element matrices (nElem x n x n, in the order of conn).
+    With copy=False, the returned matrix shares the plan's data array, so it
+    is overwritten by the next call.
+    """
+    from numpy import asarray, bincount
+    from scipy.sparse import csr_matrix
+    
+    kElem = asarray(kElem, dtype=float)
+    if (kElem.shape != (self.nElem, self.n, self.n)):
+      raise Exception('Error in assemblyPlan: kElem should be ' + str((self.nElem, self.n, self.n)) + ', was ' + str(kElem.shape))
+    self.data[:] = bincount(self.scatter, weights=kElem.ravel(), minlength=self.nnz)
+    if (copy):
+      data = self.data.copy()
+    else:
+      data = self.data
+    kg = csr_matrix((data, self.indices, self.indptr), shape=self.shape)
+    kg.has_sorted_indices = True
+    return kg
+
+@meshInput
+def elementStiffness(xnode, ynode, conn, D, thickness=None, type2D='planeStress', gaussPoints=None):
+  """
+  Calculate the stiffness matrices of all elements, choosing the element type
+  from the number of nodes per element.
+  Usage - kElem = elementStiffness(xnode, ynode, conn, D, thickness, type2D, gaussPoints)
+  Returns an nElem x n x n array, in the order of conn.
+  """
+  from numpy import shape
+  from ..LST.LST_stiffnessBatch import LST_stiffnessBatch
+  from ..CST.CST_batch import CST_stiffnessBatch
+  from ..Q4.Q4_stiffnessBatch import Q4_stiffnessBatch
+  
+  nNodeElem = shape(conn)[1]
+  if (nNodeElem == 6):
+    return LST_stiffnessBatch(xnode, ynode, conn, D, thickness, type2D, gaussPoints)
+  elif (nNodeElem == 3):
+    # Constant strain - no quadrature needed
+    return CST_stiffnessBatch(xnode, ynode, conn, D, thickness, type2D)
+  elif (nNodeElem == 4):
+    return Q4_stiffnessBatch(xnode, ynode, conn, D, thickness, type2D, gaussPoints)
+  else:
+    raise Exception('Error in elementStiffness: elements with ' + str(nNodeElem) + ' nodes are not supported.')
+
+def stiffnessChunk(shared, start, stop, D, thickness, type2D, gaussPoints):
+  # Worker for assembleStiffness: integrate elements start:stop of the mesh in shared memory
+  # and write them into the shared output array
+  from numpy import arange, ndarray
+  from multiprocessing.shared_memory import SharedMemory
+  
+  blocks = {}
+  arrays = {}
+  for name, (shmName, shape, dtype) in shared.items():
+    blocks[name] = SharedMemory(name=shmName)
+    arrays[name] = ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+  try:
+    # Gather the nodes of this chunk and number them locally
+    connChunk = arrays['conn'][start:stop]
+    xElem = arrays['xnode'][connChunk].ravel()
+    yElem = arrays['ynode'][connChunk].ravel()
+    localConn = arange(connChunk.size).reshape(connChunk.shape)
+    arrays['kElem'][start:stop] = elementStiffness(xElem, yElem, localConn, D, thickness, type2D, gaussPoints)
+  finally:
+    arrays = None
+    for block in blocks.values():
+      block.close()
+
+@meshInput
+def assembleStiffness(xnode, ynode, conn, D, thickness=None, type2D='planeStress', gaussPoints=None, 
+                      nNode=None, plan=None, workers=None, chunkSize=None, cache=None):
+  """
+  Integrate all element stiffness matrices and assemble them into a sparse global matrix.
+  Usage - kg = assembleStiffness(xnode, ynode, conn, D, thickness, type2D, gaussPoints)
+  ---------
+    Input
+  ---------
+  xnode - (list or array) x locations of nodes
+  ynode - (list or array) y locations of nodes
+  conn - (list of lists or array) connectivity of elements
+  D - (array) constituitive matrix (or nElem x D for per-element properties)
+  thickness - (float or nElem array) thickness of elements in third dimension
+  type2D - (string) "planeStress", "planeStrain", "axisymmetric", or "diffusion"
+  gaussPoints - (quadPoints) quadrature used for integration - defaults depend on element type
+  nNode - (int) total number of nodes - defaults to len(xnode)
+  plan - (assemblyPlan) reuse the sparsity pattern of an earlier assembly on this mesh
+  workers - (int) number of processes used to integrate the elements.  The mesh is
+            placed in shared memory and split into chunks, one batch per task.  The
+            result is bit-identical to the serial (workers=None) assembly.
+  chunkSize - (int) elements per task - defaults to an even split over 4 tasks per worker
+  cache - (stiffnessCache) integrate each distinct element shape once, and reuse the
+          matrices stored by earlier calls (workers is ignored)
+  ----------
+    Output
+  ----------
+  kg - (CSR matrix) global stiffness matrix
+  """
+  from numpy import asarray, ascontiguousarray, ndarray, shape
+  from multiprocessing.shared_memory import SharedMemory
+  from concurrent.futures import ProcessPoolExecutor
+  from .helpers import connArray
+  from .nDOF import nDOF as numDOF
+  
+  nDOF = numDOF(type2D)
+  if (nNode == None):
+    nNode = len(xnode)
+  
+  if (cache != None):
+    kElem = cache.stiffness(xnode, ynode, conn, D, thickness, type2D, gaussPoints)
+  elif (workers == None or workers <= 1):
+    kElem = elementStiffness(xnode, ynode, conn, D, thickness, type2D, gaussPoints)
+  else:
+    connArr, index = connArray(conn)
+    nElem, nNodeElem = connArr.shape
+    if (chunkSize == None):
+      chunkSize = max(-(-nElem // (4*workers)), 1)
+    # Per-element properties are split along with the elements
+    D = asarray(D, dtype=float)
+    thickness = asarray(thickness, dtype=float) if thickness is not None else None
+    splitD = D.ndim == 3
+    splitT = thickness is not None and thickness.ndim == 1
+    
+    n = nNodeElem*nDOF
+    sources = {'xnode': asarray(xnode, dtype=float), 
+               'ynode': asarray(ynode, dtype=float), 
+               'conn': ascontiguousarray(connArr)}
+    blocks = {}
+    shared = {}
+    try:
+      for name, arr in sources.items():
+        blocks[name] = SharedMemory(create=True, size=max(arr.nbytes, 1))
+        ndarray(arr.shape, dtype=arr.dtype, buffer=blocks[name].buf)[...] = arr
+        shared[name] = (blocks[name].name, arr.shape, arr.dtype)
+      blocks['kElem'] = SharedMemory(create=True, size=max(nElem*n*n*8, 1))
+      shared['kElem'] = (blocks['kElem'].name, (nElem, n, n), 'float64')
+      
+      with ProcessPoolExecutor(max_workers=workers) as pool:
+        tasks = []
+        for start in range(0, nElem, chunkSize):
+          stop = min(start + chunkSize, nElem)
+          tasks.append(pool.submit(stiffnessChunk, shared, start, stop, 
+                                   D[start:stop] if splitD else D, 
+                                   thickness[start:stop] if splitT else thickness, 
+                                   type2D, gaussPoints))
+        for task in tasks:
+          task.result()
+      kElem = ndarray((nElem, n, n), dtype='float64', buffer=blocks['kElem'].buf).copy()
+    finally:
+      for block in blocks.values():
+        block.close()
+        block.unlink()
+  
+  if (plan != None):
+    return plan.assemble(kElem)
+  return assemble(kElem, conn, nNode, nDOF)
+
+@meshInput
+def elementMass(xnode, ynode, conn, rhoc=1.0, thickness=1.0, lumped=False, gaussPoints=None):
+  """
+  Calculate the mass (capacitance) matrices of all elements, choosing the element type
+  from the number of nodes per element.
+  Usage - mElem = elementMass(xnode, ynode, conn, rhoc, thickness, lumped, gaussPoints)
+  Returns an nElem x n x n array (one DOF per node), in the order of conn.
+  """
+  from numpy import asarray, shape
+  from .helpers import connArray
+  from .quadPoints import quadPoints
+  from .elementQuadrature import massQuadrature
+  from ..LST.LST_massBatch import LST_massBatch
+
+  nNodeElem = shape(conn)[1]
+  if (nNodeElem == 6):
+    return LST_massBatch(xnode, ynode, conn, rhoc, thickness, lumped, gaussPoints)
+  elif (nNodeElem == 3):
+    family = 'CST'
+    if (gaussPoints == None):
+      gaussPoints = quadPoints('triangle', 2)
+  elif (nNodeElem == 4):
+    family = 'Q4'
+    if (gaussPoints == None):
+      gaussPoints = quadPoints('quad', 3)
+  else:
+    raise Exception('Error in elementMass: elements with ' + str(nNodeElem) + ' nodes are not supported.')
+  connArr, index = connArray(conn)
+  xElem = asarray(xnode, dtype=float)[connArr]
+  yElem = asarray(ynode, dtype=float)[connArr]
+  return massQuadrature(xElem, yElem, rhoc, thickness, gaussPoints, family, lumped)
+
+@meshInput
+def assembleMass(xnode, ynode, conn, rhoc=1.0, thickness=1.0, lumped=False, gaussPoints=None, nNode=None, plan=None):
+  """
+  Integrate all element mass (capacitance) matrices and assemble them into a sparse global matrix.
+  Usage - mg = assembleMass(xnode, ynode, conn, rhoc, thickness, lumped)
+  ---------
+    Input
+  ---------
+  xnode - (list or array) x locations of nodes
+  ynode - (list or array) y locations of nodes
+  conn - (list of lists or array) connectivity of elements
+  rhoc - (float or nElem array) density times specific heat
+  thickness - (float or nElem array) thickness of elements in third dimension
+  lumped - (logical) if True, the global matrix is diagonal
+  gaussPoints - (quadPoints) quadrature used for integration - defaults depend on element type
+  nNode - (int) total number of nodes - defaults to len(xnode)
+  plan - (assemblyPlan) reuse the sparsity pattern of the stiffness matrix on this mesh
+  ----------
+    Output
+  ----------
+  mg - (CSR matrix) global mass matrix, one DOF per node
+  """
+  if (nNode == None):
+    nNode = len(xnode)
+  mElem = elementMass(xnode, ynode, conn, rhoc, thickness, lumped, gaussPoints)
+  if (plan != None):
+    mg = plan.assemble(mElem)
+  else:
+    mg = assemble(mElem, conn, nNode)
+  if (lumped):
+    mg.eliminate_zeros()
+  return mg
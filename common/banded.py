@@ -0,0 +1,75 @@
+def bandStats(k):
+  """
+  Bandwidth and fill statistics of a symmetric matrix.
+  Usage - stats = bandStats(k)
+  k - (sparse matrix or array) symmetric matrix
+  Returns a dict with:
+    'N' - number of rows
+    'nnz' - nonzeros in the lower triangle (with the diagonal)
+    'bandwidth' - half bandwidth, max(i - j) over the nonzeros
+    'profile' - entries in the skyline (envelope) of the lower triangle
+    'bandStorage' - entries stored by a banded factorization, N*(bandwidth + 1)
+    'fill' - entries of the band that are zero in k (filled in by the factorization)
+  """
+  from numpy import arange, minimum
+  from scipy.sparse import coo_matrix, tril
+
+  lower = tril(coo_matrix(k)).tocoo()
+  # An un-summed COO matrix can hold an entry more than once
+  lower.sum_duplicates()
+  lower.eliminate_zeros()
+  N = k.shape[0]
+  bandwidth = int((lower.row - lower.col).max()) if lower.nnz > 0 else 0
+  # Skyline: from the first nonzero of each row to the diagonal
+  first = arange(N)
+  minimum.at(first, lower.row, lower.col)
+  profile = int((arange(N) - first + 1).sum())
+  bandEntries = N*(bandwidth + 1) - bandwidth*(bandwidth + 1)//2
+  return {'N': N, 'nnz': int(lower.nnz), 'bandwidth': bandwidth, 'profile': profile,
+          'bandStorage': N*(bandwidth + 1), 'fill': bandEntries - int(lower.nnz)}
+
+# ---------------------------------------------------------------------------
+
+class bandedCholesky:
+  """
+  Banded Cholesky factorization of a symmetric positive definite matrix.
+  Usage - kFactor = bandedCholesky(kbc)
+          T = kFactor.solve(forces)
+          print(kFactor.stats)
+  Only the lower band of k is stored, so memory is N*(bandwidth + 1) instead of N^2.
+  Renumber the nodes first (renumberNodes) to make the band narrow.  The matrix must
+  be symmetric, so apply temperature BCs with method='symmetric' or 'reduce'.
+  ---------
+    Input
+  ---------
+  k - (sparse matrix or array) SPD matrix
+
+  Contains the following attributes:
+    stats - (dict) bandwidth and fill statistics (see bandStats)
+    factor - (array) (bandwidth + 1) x N lower band of the Cholesky factor
+  """
+  def __init__(self, k):
+    from numpy import zeros
+    from scipy.linalg import cholesky_banded
+    from scipy.sparse import coo_matrix, tril
+
+    self.stats = bandStats(k)
+    lower = tril(coo_matrix(k)).tocoo()
+    # Sum repeated entries first, as the assignment below would keep only one of them
+    lower.sum_duplicates()
+    ab = zeros((self.stats['bandwidth'] + 1, k.shape[0]))
+    # Lower band storage: ab[i - j, j] = k[i, j]
+    ab[lower.row - lower.col, lower.col] = lower.data
+    try:
+      self.factor = cholesky_banded(ab, lower=True, overwrite_ab=True, check_finite=False)
+    except Exception:
+      raise Exception('Error in bandedCholesky: the matrix is not positive definite (were the BCs applied with method="symmetric"?).')
+
+  def solve(self, b):
+    """
+    Solve k x = b.  b can be a vector or an N x nCases array of right hand sides.
+    """
+    from numpy import asarray
+    from scipy.linalg import cho_solve_banded
+
+    return cho_solve_banded((self.factor, True), asarray(b, dtype=float), check_finite=False)
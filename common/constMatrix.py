@@ -10,11 +10,12 @@ def constMatrix(E=None, nu=None, type2D='planeStress', k=None):
   type2D: (string) - assumption for 2D solid
           'planeStress' - stress in z direction is zero (thin plates)
           'planeStrain' - strain in z direction is zero (thick bodies)
-  k: (float) - thermal diffusivity of material
+  k: (float) - thermal diffusivity of material, or a function k(T) of temperature
+     that works on arrays (for newtonDiffusion)
   ----------
     Output
   ----------
-  D: (array) - constituitve matrix
+  D: (array) - constituitve matrix (a function D(T) if k is a function)
   """
   from numpy import array, eye
   if (type2D == 'planeStress'):
@@ -37,7 +38,14 @@ def constMatrix(E=None, nu=None, type2D='planeStress', k=None):
                              [0, 0, 0, (1-2*nu)/2]
                             ])
   elif (type2D == 'diffusion'):
-    D = k * eye(2)
+    if (callable(k)):
+      # Temperature-dependent conductivity: D(T) for an array of temperatures
+      # (e.g. at all Gauss points) gives an array of 2x2 matrices
+      def D(T):
+        from numpy import asarray
+        return asarray(k(T), dtype=float)[..., None, None] * eye(2)
+    else:
+      D = k * eye(2)
   else:
     print('type2D must be "planeStress", "planeStrain", "axisymmetric", or "diffusion".  Was instead: ', type2D)
     raise Exception
@@ -0,0 +1,140 @@
+# Batched element integration at Gauss points, shared by the LST and Q4 element kernels.
+# Arrays are indexed [element, Gauss point, ...] throughout.
+
+def mapElements(xElem, yElem, gaussPoints, family):
+  """
+  Map the reference element onto every element at the Gauss points.
+  Usage - [psi, detJ, dpsidxy] = mapElements(xElem, yElem, gaussPoints, family)
+  ---------
+    Input
+  ---------
+  xElem, yElem - (nElem x nNodeElem arrays) node locations of each element
+  gaussPoints - (quadPoints) quadrature on the reference element
+  family - (string) 'LST', 'CST', or 'Q4'
+  ----------
+    Output
+  ----------
+  psi - (nGauss x nNodeElem array) shape functions at the Gauss points
+  detJ - (nElem x nGauss array) determinant of the Jacobian
+  dpsidxy - (nElem x nGauss x 2 x nNodeElem array) shape function derivatives in x and y
+  """
+  from numpy import einsum, linalg, zeros
+
+  psi = gaussPoints.shapeFunctions(family)
+  dpsi = gaussPoints.shapeDerivatives(family)
+
+  # J = [[dx/dxi,  dy/dxi ],
+  #      [dx/deta, dy/deta]]
+  J = zeros((len(xElem), len(gaussPoints.weights), 2, 2))
+  J[:, :, :, 0] = einsum('gak,ek->ega', dpsi, xElem)
+  J[:, :, :, 1] = einsum('gak,ek->ega', dpsi, yElem)
+  return [psi, linalg.det(J), linalg.inv(J) @ dpsi]
+
+def BMatrices(psi, dpsidxy, xElem, type2D):
+  """
+  B matrix of every element at every Gauss point.
+  Usage - B = BMatrices(psi, dpsidxy, xElem, type2D)
+  Same layout as LST_B and Q4_B: nElem x nGauss x nStrain x nNodeElem*nDOF
+  """
+  from numpy import einsum, zeros
+
+  nElem, nGauss, two, nNodeElem = dpsidxy.shape
+  if (type2D == 'axisymmetric'):
+    r = einsum('gk,ek->eg', psi, xElem)
+    B = zeros((nElem, nGauss, 4, 2*nNodeElem))
+    B[:, :, 0, 0::2] = dpsidxy[:, :, 0]
+    B[:, :, 1, 1::2] = dpsidxy[:, :, 1]
+    B[:, :, 2, 0::2] = psi / r[:, :, None]
+    B[:, :, 3, 0::2] = dpsidxy[:, :, 1]
+    B[:, :, 3, 1::2] = dpsidxy[:, :, 0]
+  elif (type2D == 'diffusion'):
+    B = dpsidxy
+  else:
+    B = zeros((nElem, nGauss, 3, 2*nNodeElem))
+    B[:, :, 0, 0::2] = dpsidxy[:, :, 0]
+    B[:, :, 1, 1::2] = dpsidxy[:, :, 1]
+    B[:, :, 2, 0::2] = dpsidxy[:, :, 1]
+    B[:, :, 2, 1::2] = dpsidxy[:, :, 0]
+  return B
+
+def areaScale(gaussPoints):
+  # Triangle weights sum to 1 on a reference area of 1/2, quad weights sum to 4 on an area of 4
+  if (gaussPoints.geom == 'triangle'):
+    return 1/2
+  return 1.0
+
+def stiffnessQuadrature(xElem, yElem, D, thickness, type2D, gaussPoints, family):
+  """
+  Integrate the stiffness matrix of every element at the Gauss points.
+  Usage - kElem = stiffnessQuadrature(xElem, yElem, D, thickness, type2D, gaussPoints, family)
+  ---------
+    Input
+  ---------
+  xElem, yElem - (nElem x nNodeElem arrays) node locations of each element
+  D - (array) constituitive matrix, nElem x D for per-element properties, or
+      nElem x nGauss x D for properties that vary within elements
+  thickness - (float or nElem array) thickness of elements (ignored for axisymmetric)
+  type2D - (string) "planeStress", "planeStrain", "axisymmetric", or "diffusion"
+  gaussPoints - (quadPoints) quadrature on the reference element
+  family - (string) 'LST', 'CST', or 'Q4'
+  ----------
+    Output
+  ----------
+  kElem - (nElem x n x n array) element stiffness matrices
+  """
+  from numpy import asarray, einsum, pi
+
+  [psi, detJ, dpsidxy] = mapElements(xElem, yElem, gaussPoints, family)
+  B = BMatrices(psi, dpsidxy, xElem, type2D)
+  nElem, nGauss, nStrain, nCol = B.shape
+
+  if (type2D == 'axisymmetric'):
+    thickness = 2*pi*einsum('gk,ek->eg', psi, xElem)
+  thickness = asarray(thickness, dtype=float)
+  if (thickness.ndim == 1):
+    thickness = thickness[:, None]
+  scale = detJ*areaScale(gaussPoints) * thickness * gaussPoints.weights
+
+  D = asarray(D, dtype=float)
+  if (D.ndim == 3):
+    D = D[:, None]
+  DB = D @ B
+  BT = (B * scale[:, :, None, None]).transpose(0, 3, 1, 2).reshape(nElem, nCol, nGauss*nStrain)
+  return BT @ DB.reshape(nElem, nGauss*nStrain, nCol)
+
+def massQuadrature(xElem, yElem, rhoc, thickness, gaussPoints, family, lumped=False):
+  """
+  Integrate the mass (capacitance) matrix of every element at the Gauss points.
+  Usage - mElem = massQuadrature(xElem, yElem, rhoc, thickness, gaussPoints, family, lumped)
+  M = integral of rho*c*t * psi^T psi over each element, for one DOF per node.
+  ---------
+    Input
+  ---------
+  xElem, yElem - (nElem x nNodeElem arrays) node locations of each element
+  rhoc - (float or nElem array) density times specific heat (capacity per volume)
+  thickness - (float or nElem array) thickness of elements
+  gaussPoints - (quadPoints) quadrature on the reference element - use a precision of
+                at least twice the order of the shape functions
+  family - (string) 'LST', 'CST', or 'Q4'
+  lumped - (logical) if True, diagonal matrices found by scaling the diagonal of the
+           consistent matrix to keep the total mass of each element (HRZ lumping)
+  ----------
+    Output
+  ----------
+  mElem - (nElem x nNodeElem x nNodeElem array) element mass matrices
+  """
+  from numpy import asarray, einsum, zeros, arange
+
+  [psi, detJ, dpsidxy] = mapElements(xElem, yElem, gaussPoints, family)
+  scale = asarray(rhoc, dtype=float)*asarray(thickness, dtype=float)
+  scale = scale.reshape(-1, 1) * detJ*areaScale(gaussPoints) * gaussPoints.weights
+  mElem = einsum('eg,gi,gj->eij', scale, psi, psi)
+  if (lumped):
+    # Row-sum lumping gives zero (or negative) corner masses for LST elements,
+    # so the diagonal is scaled to the total mass instead
+    diag = mElem[:, arange(psi.shape[1]), arange(psi.shape[1])]
+    total = mElem.sum(axis=(1, 2))
+    mLumped = zeros(mElem.shape)
+    mLumped[:, arange(psi.shape[1]), arange(psi.shape[1])] = diag * (total/diag.sum(axis=1))[:, None]
+    return mLumped
+  return mElem
@@ -1,5 +1,12 @@
 def connIndex(conn):
   # Find the minimum index in a list of lists
+  # (arrays are searched in one step, and a Mesh is always zero-indexed)
+  from numpy import ndarray
+  from .mesh import Mesh
+  if (isinstance(conn, Mesh)):
+    return 0
+  if (isinstance(conn, ndarray)):
+    return int(conn.min())
   minVal = conn[0][0]
   for elem in conn:
     minVal = min(minVal, min(elem))
@@ -29,3 +36,60 @@ def whichLine(newLine, lineList, multiple=False):
     return lines
   
   return None
+
+def connArray(conn):
+  # Convert a connectivity list of lists into a zero-indexed integer array
+  # Returns the array and the index that was removed from it
+  from numpy import asarray
+  from .mesh import Mesh
+  if (isinstance(conn, Mesh)):
+    return asarray(conn.conn, dtype=int), 0
+  connArr = asarray(conn, dtype=int)
+  index = int(connArr.min())
+  return connArr - index, index
+
+def meshInput(function):
+  # Let a function of (xnode, ynode, conn, ...) also be called as function(mesh, ...)
+  from functools import wraps
+  @wraps(function)
+  def wrapper(*args, **kwargs):
+    from .mesh import Mesh
+    if (len(args) > 0 and isinstance(args[0], Mesh)):
+      mesh = args[0]
+      args = (mesh.xnode, mesh.ynode, mesh.conn) + tuple(args[1:])
+    return function(*args, **kwargs)
+  return wrapper
+
+def meshBCsInput(function):
+  # Let a function of (k, bcs, xnode, ynode, thickness, type2D, index, ...) also be
+  # called as function(k, mesh, thickness, type2D, ...), with the BCs of the mesh
+  from functools import wraps
+  @wraps(function)
+  def wrapper(*args, **kwargs):
+    from .mesh import Mesh
+    if (len(args) > 1 and isinstance(args[1], Mesh)):
+      mesh = args[1]
+      rest = tuple(args[2:])
+      args = (args[0], mesh.bcs, mesh.xnode, mesh.ynode)
+      if (len(rest) >= 2):
+        # A Mesh is numbered from 0
+        args += rest[:2] + (0,) + rest[2:]
+      else:
+        args += rest
+        kwargs['index'] = 0
+    return function(*args, **kwargs)
+  return wrapper
+
+def plotMeshInput(function):
+  # Let a plot function of (conn, xnode, ynode, ...) or (xnode, ynode, conn, ...) also be
+  # called as function(mesh, ...), with the nodes numbered as the lists the mesh was made from
+  from functools import wraps
+  connFirst = function.__code__.co_varnames[0] == 'conn'
+  @wraps(function)
+  def wrapper(*args, **kwargs):
+    from .mesh import Mesh
+    if (len(args) > 0 and isinstance(args[0], Mesh)):
+      [xnode, ynode, conn, bcs] = args[0].lists()
+      args = ((conn, xnode, ynode) if connFirst else (xnode, ynode, conn)) + tuple(args[1:])
+    return function(*args, **kwargs)
+  return wrapper
@@ -0,0 +1,113 @@
+class loadCaseSolver:
+  """
+  Factor a constrained stiffness matrix once and solve it for many load cases.
+  Usage - solver = loadCaseSolver(kg, bcs, xnode, ynode, thickness, type2D, index)
+          T = solver.solveCases([bcs1, bcs2, bcs3])           # nDOF x 3
+          T = solver.solve(forces, fixedValue)               # stacked nDOF x nCases
+  The BCs of every case must constrain the same nodes and have the same convection
+  coefficients (these are part of the matrix); everything that only changes the
+  right hand side can differ - ambient temperatures, fluxes, flows, and the values
+  of temperature BCs.  The free DOF system (as applyBCs(..., method='reduce')) is
+  factored once, and all cases are solved together by the triangular solves.
+  ---------
+    Input
+  ---------
+  k - (sparse matrix or array) global stiffness matrix, before BCs
+  bcs - (list) boundary conditions of any one of the cases (BC)
+  xnode, ynode - (lists) node locations
+  thickness - (float) element thickness
+  type2D - (string) type of problem (only "diffusion" BCs are implemented)
+  index - (int) index of the first node
+
+  Contains the following attributes:
+    bcMap - (dofMap) free and constrained DOFs
+    boundary - (sparse matrix) convection terms added to k
+  """
+  def __init__(self, k, bcs, xnode, ynode, thickness, type2D, index):
+    from numpy import ix_
+    from scipy.sparse import coo_matrix, csr_matrix, issparse
+    from scipy.sparse.linalg import splu
+    from scipy.linalg import cho_factor, cho_solve
+    from .applyBCs import boundaryTerms, dofMap
+
+    self.xnode = xnode
+    self.ynode = ynode
+    self.thickness = thickness
+    self.type2D = type2D
+    self.index = index
+    N = k.shape[0]
+
+    [rows, cols, vals, forces, fixedDOF, fixedValue] = boundaryTerms(bcs, xnode, ynode, thickness, type2D, index)
+    self.boundary = coo_matrix((vals, (rows, cols)), shape=k.shape).tocsr()
+    self.bcMap = dofMap(N, fixedDOF, fixedValue)
+    free = self.bcMap.free
+    fixed = self.bcMap.fixed
+    if (issparse(k)):
+      kbc = csr_matrix(k) + self.boundary
+      kfree = kbc[free]
+      self.kfc = kfree[:, fixed]
+      self.factor = splu(kfree[:, free].tocsc()).solve
+    else:
+      kbc = k + self.boundary.toarray()
+      self.kfc = kbc[ix_(free, fixed)]
+      cho = cho_factor(kbc[ix_(free, free)])
+      self.factor = lambda b: cho_solve(cho, b)
+
+  def caseTerms(self, bcs):
+    """
+    Force vector and constrained values of one load case.
+    Usage - [forces, fixedValue] = solver.caseTerms(bcs)
+    fixedValue is in the order of solver.bcMap.fixed.
+    """
+    from numpy import zeros
+    from scipy.sparse import coo_matrix
+    from .applyBCs import boundaryTerms
+
+    [rows, cols, vals, forces, fixedDOF, fixedValue] = boundaryTerms(bcs, self.xnode, self.ynode, self.thickness, self.type2D, self.index)
+    boundary = coo_matrix((vals, (rows, cols)), shape=self.boundary.shape).tocsr()
+    scale = max(abs(self.boundary).max(), 1e-300)
+    if (abs(boundary - self.boundary).max() > 1e-12*scale):
+      raise Exception('Error in loadCaseSolver: convection coefficients must be the same in every load case.')
+    values = zeros(self.bcMap.nDOF)
+    isFixed = zeros(self.bcMap.nDOF, dtype=bool)
+    values[fixedDOF] = fixedValue
+    isFixed[fixedDOF] = True
+    if (isFixed.sum() != len(self.bcMap.fixed) or not isFixed[self.bcMap.fixed].all()):
+      raise Exception('Error in loadCaseSolver: temperature BCs must be on the same nodes in every load case.')
+    return [forces, values[self.bcMap.fixed]]
+
+  def solve(self, forces, fixedValue=None):
+    """
+    Solve for one load case or a stack of them.
+    Usage - u = solver.solve(forces, fixedValue)
+    forces - (array) nDOF, or nDOF x nCases, forces from the non-constraint BCs
+             (entries at constrained DOFs are ignored)
+    fixedValue - (array) values at solver.bcMap.fixed, nFixed or nFixed x nCases -
+                 defaults to those of the bcs given when the solver was made
+    Returns u with the same shape as forces.
+    """
+    from numpy import asarray
+
+    forces = asarray(forces, dtype=float)
+    if (fixedValue is None):
+      fixedValue = self.bcMap.fixedValue
+    fixedValue = asarray(fixedValue, dtype=float)
+    if (forces.ndim == 2 and fixedValue.ndim == 1):
+      fixedValue = fixedValue[:, None].repeat(forces.shape[1], axis=1)
+    uFree = self.factor(forces[self.bcMap.free] - self.kfc @ fixedValue)
+    u = self.bcMap.expand(uFree)
+    u[self.bcMap.fixed] = fixedValue
+    return u
+
+  def solveCases(self, bcsList):
+    """
+    Solve every load case in a list of BC lists at once.
+    Usage - u = solver.solveCases([bcs1, bcs2, ...])
+    Returns an nDOF x nCases array.
+    """
+    from numpy import stack
+
+    terms = [self.caseTerms(bcs) for bcs in bcsList]
+    forces = stack([term[0] for term in terms], axis=1)
+    fixedValue = stack([term[1] for term in terms], axis=1)
+    return self.solve(forces, fixedValue)
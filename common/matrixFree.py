@@ -0,0 +1,163 @@
+from scipy.sparse.linalg import LinearOperator
+
+class stiffnessOperator(LinearOperator):
+  """
+  Global stiffness matrix applied element by element, without ever assembling it.
+  Usage - K = stiffnessOperator(xnode, ynode, conn, D, thickness, type2D)
+          [Kbc, forces] = K.applyBCs(bcs, index)
+          [T, info] = pcg(Kbc, forces, precond='jacobi')
+  K @ u gathers the DOFs of every element, multiplies by the element matrices in
+  a batch, and scatter-adds the results.  With cacheElements=True the element
+  matrices are stored (nElem x n x n); with cacheElements=False they are recomputed
+  from the node locations chunk by chunk on every product, so only the mesh is
+  stored.  Either way memory grows with nElem rather than with the nonzeros of K.
+  Works with pcg and the SciPy iterative solvers (cg, minres, ...).
+  ---------
+    Input
+  ---------
+  xnode - (list or array) x locations of nodes
+  ynode - (list or array) y locations of nodes
+  conn - (list of lists or array) connectivity of elements
+  D - (array) constituitive matrix (or nElem x D for per-element properties)
+  thickness - (float or nElem array) thickness of elements in third dimension
+  type2D - (string) "planeStress", "planeStrain", "axisymmetric", or "diffusion"
+  gaussPoints - (quadPoints) quadrature used for integration - defaults depend on element type
+  cacheElements - (logical) store the element matrices instead of recomputing them
+  chunkSize - (int) elements handled per batch - limits temporary memory
+
+  Contains the following attributes (besides those of LinearOperator):
+    kElem - (array) cached element matrices, or None
+    dofs - (nElem x n array) zero-indexed global DOFs of every element
+    boundary - (sparse matrix) convection terms added by applyBCs, or None
+    fixed - (array) constrained DOFs (identity rows and columns), or None
+  """
+  def __init__(self, xnode, ynode, conn, D, thickness=None, type2D='planeStress', gaussPoints=None,
+               cacheElements=True, chunkSize=65536):
+    from numpy import asarray
+    from .assemble import elemDOFs, elementStiffness
+    from .helpers import connArray
+    from .nDOF import nDOF as numDOF
+
+    self.connArr, self.index = connArray(conn)
+    self.xnode = asarray(xnode, dtype=float)
+    self.ynode = asarray(ynode, dtype=float)
+    self.D = asarray(D, dtype=float)
+    self.thickness = thickness
+    self.type2D = type2D
+    self.gaussPoints = gaussPoints
+    self.chunkSize = chunkSize
+    self.dofs = elemDOFs(self.connArr, numDOF(type2D))
+    N = len(self.xnode)*numDOF(type2D)
+    super().__init__(dtype=float, shape=(N, N))
+
+    self.boundary = None
+    self.fixed = None
+    self.freeMask = None
+    if (cacheElements):
+      self.kElem = elementStiffness(self.xnode, self.ynode, self.connArr, self.D, thickness, type2D, gaussPoints)
+    else:
+      self.kElem = None
+
+  def elementMatrices(self, start, stop):
+    # Element matrices of elements start:stop, from the cache or integrated now
+    from numpy import arange, asarray
+    from .assemble import elementStiffness
+
+    if (self.kElem is not None):
+      return self.kElem[start:stop]
+    connChunk = self.connArr[start:stop]
+    localConn = arange(connChunk.size).reshape(connChunk.shape)
+    D = self.D[start:stop] if self.D.ndim == 3 else self.D
+    thickness = self.thickness
+    if (thickness is not None and asarray(thickness).ndim == 1):
+      thickness = asarray(thickness)[start:stop]
+    return elementStiffness(self.xnode[connChunk].ravel(), self.ynode[connChunk].ravel(), localConn,
+                            D, thickness, self.type2D, self.gaussPoints)
+
+  def elementProduct(self, u):
+    # Sum of the element matrices times u, one chunk of elements at a time
+    from numpy import bincount, zeros
+
+    N = self.shape[0]
+    nElem = len(self.dofs)
+    y = zeros(N)
+    for start in range(0, nElem, self.chunkSize):
+      stop = min(start + self.chunkSize, nElem)
+      dofs = self.dofs[start:stop]
+      yElem = self.elementMatrices(start, stop) @ u[dofs][:, :, None]
+      y += bincount(dofs.ravel(), weights=yElem.ravel(), minlength=N)
+    return y
+
+  def _matvec(self, u):
+    from numpy import asarray
+
+    u = asarray(u, dtype=float).ravel()
+    if (self.freeMask is None):
+      y = self.elementProduct(u)
+      if (self.boundary is not None):
+        y += self.boundary @ u
+      return y
+    # Constrained DOFs: zero rows and columns with a 1 on the diagonal
+    uFree = self.freeMask*u
+    y = self.elementProduct(uFree)
+    if (self.boundary is not None):
+      y += self.boundary @ uFree
+    return self.freeMask*y + (1 - self.freeMask)*u
+
+  def _adjoint(self):
+    # Stiffness matrices are symmetric
+    return self
+
+  def diagonal(self):
+    """
+    Diagonal of the operator (for Jacobi preconditioning).
+    """
+    from numpy import bincount, diagonal
+
+    N = self.shape[0]
+    nElem = len(self.dofs)
+    d = 0
+    for start in range(0, nElem, self.chunkSize):
+      stop = min(start + self.chunkSize, nElem)
+      kDiag = diagonal(self.elementMatrices(start, stop), axis1=1, axis2=2)
+      d = d + bincount(self.dofs[start:stop].ravel(), weights=kDiag.ravel(), minlength=N)
+    if (self.boundary is not None):
+      d = d + self.boundary.diagonal()
+    if (self.freeMask is not None):
+      d = self.freeMask*d + (1 - self.freeMask)
+    return d
+
+  def applyBCs(self, bcs, index=None):
+    """
+    Apply boundary conditions, as applyBCs(..., method='symmetric') does for a matrix.
+    Usage - [kbc, forces] = K.applyBCs(bcs, index)
+    Returns a new operator (sharing the element matrices of this one) with the
+    convection terms added and the temperature constraints imposed symmetrically,
+    and the matching force vector.
+    bcs - (list) boundary conditions (BC)
+    index - (int) index of the first node in bcs - defaults to that of conn
+    """
+    from copy import copy
+    from numpy import ones, zeros
+    from scipy.sparse import coo_matrix
+    from .applyBCs import boundaryTerms
+
+    if (index == None):
+      index = self.index
+    [rows, cols, vals, forces, fixedDOF, fixedValue] = boundaryTerms(bcs, self.xnode, self.ynode, self.thickness, self.type2D, index)
+    kbc = copy(self)
+    kbc.boundary = coo_matrix((vals, (rows, cols)), shape=self.shape).tocsr()
+    if (self.boundary is not None):
+      kbc.boundary = kbc.boundary + self.boundary
+    kbc.freeMask = None
+
+    # Move the known values to the right hand side
+    lift = zeros(self.shape[0])
+    lift[fixedDOF] = fixedValue
+    forces = forces - kbc @ lift
+    forces[fixedDOF] = fixedValue
+
+    kbc.freeMask = ones(self.shape[0])
+    kbc.freeMask[fixedDOF] = 0
+    kbc.fixed = fixedDOF
+    return [kbc, forces]
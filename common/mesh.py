@@ -0,0 +1,188 @@
+class Mesh:
+  """
+  A mesh held in arrays, with derived data computed when first needed.
+  Usage - mesh = Mesh(xnode, ynode, conn, bcs)
+          kg = FE.assembleStiffness(mesh, D, thickness, type2D)
+          [kbc, forces] = FE.applyBCsSparse(kg, mesh, thickness, type2D)
+          mesh = FE.meshRefine(mesh)
+          [xnode, ynode, conn, bcs] = mesh.lists()
+  Nodes are numbered from 0 inside the mesh, whatever the index of the lists it was
+  made from, so nothing has to search the connectivity for the index again.  The
+  BCs are renumbered to match.  The mesh arrays are read-only: change them by
+  assigning new ones (mesh.xnode = ...), which clears the derived data that
+  depends on them.
+
+  Functions that take (xnode, ynode, conn, ...) also take (mesh, ...), applyBCs and
+  applyBCsSparse take (k, mesh, thickness, type2D), and the plot functions take
+  (mesh, u, ...).  For the others, use mesh.xnode, mesh.ynode, mesh.conn, mesh.bcs,
+  and index = 0.
+  ---------
+    Input
+  ---------
+  xnode, ynode - (lists or arrays) node locations
+  conn - (list of lists or array) connectivity of elements (CST, LST, or Q4)
+  bcs - (list) boundary conditions (BC), numbered as conn
+  conn2line, line2node - (optional) lines from meshRefine or LST_mesh, used as the
+                         edge table instead of building it
+  index - (int) index of the first node in conn and bcs - defaults to the smallest node in conn
+
+  Contains the following attributes:
+    xnode, ynode - (float64 arrays) node locations
+    conn - (int32 nElem x nNodeElem array) zero-indexed connectivity
+    bcs - (list) boundary conditions, zero-indexed
+    index - (int) index of the lists the mesh was made from (used by lists())
+    nNode, nElem, nCorner - (ints) numbers of nodes, elements, and corners per element
+  and the derived data (computed on first use and kept until the mesh changes):
+    areas - (array) area of every element (straight sides)
+    conn2line - (int32 nElem x nCorner array) lines of each element, as edgeTable
+    line2node - (int32 nLine x 2 array) end nodes of each line
+    adjacency - (CSR matrix) nodes that share an element (see nodeGraph)
+    boundaryEdges - (array) lines that belong to only one element
+  """
+  def __init__(self, xnode, ynode, conn, bcs=[], conn2line=None, line2node=None, index=None):
+    from numpy import asarray
+
+    conn = asarray(conn)
+    if (index == None):
+      index = int(conn.min())
+    self.index = index
+    self.xnode = xnode
+    self.ynode = ynode
+    self.conn = conn - index
+    self.bcs = []
+    for bc in bcs:
+      bcNew = bc.copy()
+      bcNew.nodes = [int(node) - index for node in bc.nodes]
+      self.bcs.append(bcNew)
+    if (conn2line is not None and line2node is not None and len(conn2line) > 0):
+      self.setEdges(conn2line, asarray(line2node)[:, [0, -1]] - index)
+
+  # Mesh arrays - assigning one clears the derived data that depends on it
+  @property
+  def xnode(self):
+    return self._xnode
+
+  @xnode.setter
+  def xnode(self, xnode):
+    self._xnode = self.readOnly(xnode, 'float64')
+    self.clear(['areas'])
+
+  @property
+  def ynode(self):
+    return self._ynode
+
+  @ynode.setter
+  def ynode(self, ynode):
+    self._ynode = self.readOnly(ynode, 'float64')
+    self.clear(['areas'])
+
+  @property
+  def conn(self):
+    return self._conn
+
+  @conn.setter
+  def conn(self, conn):
+    conn = self.readOnly(conn, 'int32')
+    if (conn.ndim != 2 or conn.shape[1] not in [3, 4, 6]):
+      raise Exception('Error in Mesh: conn must have 3 (CST), 4 (Q4), or 6 (LST) nodes per element.')
+    if (conn.size > 0 and conn.min() < 0):
+      raise Exception('Error in Mesh: conn has nodes below the index.')
+    self._conn = conn
+    self.clear()
+
+  @staticmethod
+  def readOnly(values, dtype):
+    # Contiguous copy that can not be changed in place (so the derived data stays valid)
+    from numpy import array
+    values = array(values, dtype=dtype, order='C')
+    values.flags.writeable = False
+    return values
+
+  def clear(self, names=None):
+    # Forget derived data (all of it if names is None)
+    if (not hasattr(self, 'cache')):
+      self.cache = {}
+    if (names == None):
+      self.cache = {}
+    for name in (names or []):
+      self.cache.pop(name, None)
+
+  def setEdges(self, conn2line, line2node):
+    # Use an edge table found elsewhere (e.g. by refinement), zero-indexed
+    self.cache['edges'] = [self.readOnly(conn2line, 'int32'), self.readOnly(line2node, 'int32')]
+
+  @property
+  def nNode(self):
+    return len(self._xnode)
+
+  @property
+  def nElem(self):
+    return len(self._conn)
+
+  @property
+  def nCorner(self):
+    return 4 if self._conn.shape[1] == 4 else 3
+
+  def __str__(self):
+    return f"Mesh with {self.nNode} nodes, {self.nElem} {self._conn.shape[1]}-node elements, and {len(self.bcs)} BCs."
+
+  # Derived data
+  @property
+  def areas(self):
+    if ('areas' not in self.cache):
+      # Shoelace formula over the corners
+      xc = self._xnode[self._conn[:, :self.nCorner]]
+      yc = self._ynode[self._conn[:, :self.nCorner]]
+      areas = 0.5*(xc*yc[:, list(range(1, self.nCorner)) + [0]] - xc[:, list(range(1, self.nCorner)) + [0]]*yc).sum(axis=1)
+      areas.flags.writeable = False
+      self.cache['areas'] = areas
+    return self.cache['areas']
+
+  def edges(self):
+    # [conn2line, line2node] of the corner lines
+    from .meshRefine import edgeTable
+
+    if ('edges' not in self.cache):
+      self.setEdges(*edgeTable(self._conn[:, :self.nCorner]))
+    return self.cache['edges']
+
+  @property
+  def conn2line(self):
+    return self.edges()[0]
+
+  @property
+  def line2node(self):
+    return self.edges()[1]
+
+  @property
+  def adjacency(self):
+    from .renumber import nodeGraph
+
+    if ('adjacency' not in self.cache):
+      self.cache['adjacency'] = nodeGraph(self._conn, self.nNode)
+    return self.cache['adjacency']
+
+  @property
+  def boundaryEdges(self):
+    from numpy import bincount, flatnonzero
+
+    if ('boundaryEdges' not in self.cache):
+      [conn2line, line2node] = self.edges()
+      boundary = flatnonzero(bincount(conn2line.ravel(), minlength=len(line2node)) == 1)
+      boundary.flags.writeable = False
+      self.cache['boundaryEdges'] = boundary
+    return self.cache['boundaryEdges']
+
+  def lists(self, index=None):
+    """
+    The mesh as lists, numbered from index (defaults to the index the mesh was made from).
+    Usage - [xnode, ynode, conn, bcs] = mesh.lists()
+    """
+    if (index == None):
+      index = self.index
+    bcs = []
+    for bc in self.bcs:
+      bcNew = bc.copy()
+      bcNew.nodes = [node + index for node in bc.nodes]
+      bcs.append(bcNew)
+    return [self._xnode.tolist(), self._ynode.tolist(), (self._conn + index).tolist(), bcs]
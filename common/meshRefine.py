@@ -20,12 +20,33 @@ def cellExists(conn, c2n):
 
 # ----------------------------------------------------------------
 
+def lineKey(l2n):
+  # Key of a line that does not depend on its direction (the two end nodes)
+  return (min(l2n[0], l2n[-1]), max(l2n[0], l2n[-1]))
+
+def lineLookup(line2node):
+  # Dictionary from lineKey to line number - replaces lineExists scans
+  # (the first of any repeated lines is found, as in lineExists)
+  lookup = {}
+  for i, l2n in enumerate(line2node):
+    lookup.setdefault(lineKey(l2n), i)
+  return lookup
+
+def cellLookup(conn):
+  # Dictionary from the sorted nodes of each cell to its number - replaces cellExists scans
+  lookup = {}
+  for i, c2n in enumerate(conn):
+    lookup.setdefault(tuple(sorted(c2n)), i)
+  return lookup
+
+# ----------------------------------------------------------------
+
 def buildc2lAndl2n(conn):
   # lines are always 0 indexed, as they will be internal
   # nodes are indexed as defined by user
   conn2line = []
   line2node = []
-  lineCount = 0
+  lookup = {}
   
   for elem in conn:
     l2n=[0, 0, 0]
@@ -34,17 +55,49 @@ def buildc2lAndl2n(conn):
     l2n[2] = [elem[2], elem[0]]
     c2l = []
     for l2ni in l2n:
-      lineNum = lineExists(line2node, l2ni)
-      if lineNum == -1:
+      # New lines are numbered in the order they are found
+      lineNum = lookup.setdefault(lineKey(l2ni), len(line2node))
+      if lineNum == len(line2node):
         line2node.append(l2ni)
-        c2l.append(lineCount)
-        lineCount += 1
-      else:
-        c2l.append(lineNum)
+      c2l.append(lineNum)
     conn2line.append(c2l)
     
   return conn2line, line2node
         
+def edgeTable(conn):
+  """
+  Lines of a mesh from a connectivity array, as buildc2lAndl2n does for lists.
+  Usage - [conn2line, line2node] = edgeTable(conn)
+  The edges [0, 1], [1, 2], ... [n-1, 0] of every element (n corners) are keyed on
+  their sorted end nodes and made unique with np.unique.  Lines are numbered in the
+  order they are first found and keep the direction they had in that element, so
+  for triangles the result is the same as that of buildc2lAndl2n.
+  ---------
+    Input
+  ---------
+  conn - (nElem x n array) corner nodes of each element (3 for triangles, 4 for quads)
+  ----------
+    Output
+  ----------
+  conn2line - (nElem x n array) zero-indexed lines of each element
+  line2node - (nLine x 2 array) end nodes of each line (indexed as conn)
+  """
+  from numpy import argsort, arange, asarray, empty, int64, maximum, minimum, stack, unique
+
+  conn = asarray(conn)
+  nCorner = conn.shape[1]
+  edges = conn[:, stack((arange(nCorner), (arange(nCorner) + 1) % nCorner), axis=1).ravel()].reshape(-1, 2)
+  low = minimum(edges[:, 0], edges[:, 1]).astype(int64)
+  high = maximum(edges[:, 0], edges[:, 1]).astype(int64)
+  [keys, first, inverse] = unique(low*(int(high.max()) + 1) + high, return_index=True, return_inverse=True)
+  # Renumber the unique lines in order of first appearance
+  order = argsort(first, kind='stable')
+  lineNum = empty(len(keys), dtype=conn.dtype)
+  lineNum[order] = arange(len(keys))
+  conn2line = lineNum[inverse.ravel()].reshape(-1, nCorner)
+  line2node = edges[first[order]]
+  return [conn2line, line2node]
+
 # -----------------------------------------------
 def split_poly(p):
   coefs = p.coef
@@ -57,7 +110,257 @@ def split_poly(p):
     pd = polynomial.Polynomial(polynomial.polyder(pd.coef))
   return polynomial.Polynomial(p1coefs), polynomial.Polynomial(p2coefs)
 
-def meshRefine(xnode, ynode, conn, bcs, conn2line=[], line2node=[]):
+def subdivide_poly(p, nPieces):
+  # Polynomials on [0, 1] for each of nPieces equal pieces of [0, 1]:
+  # piece j is p((j + s)/nPieces)
+  if (nPieces == 2):
+    return list(split_poly(p))
+  return [p(polynomial.Polynomial([j/nPieces, 1/nPieces])) for j in range(nPieces)]
+
+def refineBCs(bcs, line2node, line2nodeNew, connNew, findLine, findCell, levels=1):
+  # Apply the BCs of a mesh to its refined children (shared by meshRefine and meshRefineArrays)
+  # After one level, old line l is split into new lines 2l and 2l + 1, and old
+  # element e into new elements 4e to 4e + 3.  After n levels these are lines
+  # 2^n l to 2^n l + 2^n - 1 (in order along the old line) and elements 4^n e to
+  # 4^n e + 4^n - 1, so the BCs are split once for any number of levels.
+  # findLine(nodes) and findCell(nodes) give the number of the old line or
+  # element with those nodes, or -1.
+  
+  # Sample BCs:
+  """
+  bcs.append({geom:'point', nodes:1, kind:'temperature', value: 0})
+  bcs.append({geom:'line', nodes:[3, 4], kind:'convection', value:50, coefficient:2.5})
+  bcs.append({geom:'face', nodes:[1, 2, 3], kind:'heat flow', value:100})
+  """
+  nLines = 2**levels
+  nFaces = 4**levels
+  bcsNew = []
+  for bc in bcs:
+    if bc.geom == 'point':
+      # No change required for point boundary conditions - point names do not change
+      bcsNew.append(bc)
+    elif bc.geom == 'line':
+      # Line boundary conditions should be applied to new child lines
+      lineNum = findLine(bc.nodes)
+      if lineNum == -1:
+        raise Exception('You done goofed in bc "nodes": line does not exist in conn')
+      else:
+        children = [bc.copy() for j in range(nLines)]
+        
+        # Create new lines and swap order if necessary
+        newLineNums = range(nLines*lineNum, nLines*(lineNum + 1))
+        if line2node[lineNum][0] == bc.nodes[0]:   # order is same as in line2node
+          for child, newLineNum in zip(children, newLineNums):
+            child.nodes = [int(node) for node in line2nodeNew[newLineNum]]
+        else:                          # order is flipped from line2node
+          for child, newLineNum in zip(children, reversed(newLineNums)):
+            child.nodes = [int(line2nodeNew[newLineNum][1]), int(line2nodeNew[newLineNum][0])]
+        
+        if bc.VarType('value') == 'poly':
+          # const and func variations do not need changes from splitting
+          for child, poly in zip(children, subdivide_poly(bc.value, nLines)):
+            child.value = poly
+        if bc.VarType('coefficient') == 'poly':
+          # const and func variations do not need changes from splitting
+          for child, poly in zip(children, subdivide_poly(bc.coefficient, nLines)):
+            child.coefficient = poly
+          
+        # Flow kind of BC must be split  
+        if bc.kind == 'flow':
+          for child in children:
+            child.value = bc.value/nLines
+          
+        bcsNew.extend(children)
+    elif bc.geom == 'face':
+      # Face boundary conditions should be applied to new child faces
+      elemNum = findCell(bc.nodes)
+      if elemNum == -1:
+        raise Exception('You done goofed in bc "nodes": cell does not exist in conn')
+      else:
+        children = [bc.copy() for j in range(nFaces)]
+        
+        for child, newElem in zip(children, range(nFaces*elemNum, nFaces*(elemNum + 1))):
+          child.nodes = [int(node) for node in connNew[newElem]]
+        
+          # Flow kind of BC must be split  
+          if bc.kind == 'flow':
+            child.value = bc.value/nFaces
+        
+        bcsNew.extend(children)
+        if bc.VarType('value') == 'poly':
+          raise Exception('You done goofed in bc "value": face value cannot be a 1D polynomial')
+        if bc.VarType('coefficient') == 'poly':
+          raise Exception('You done goofed in bc "coefficient": face value cannot be a 1D polynomial')
+    else:
+      raise Exception('You done goofed in bc "geom": Geometry type should be "point", "line", or "face"')
+  return bcsNew
+
+# -----------------------------------------------
+
+def midpointProlongation(nNode, line2node, index):
+  """
+  Interpolation from a mesh to the mesh with a new node at the middle of every line.
+  Usage - P = midpointProlongation(nNode, line2node, index)
+  The new nodes must be numbered after the old ones, in the order of line2node, as
+  in meshRefine and LST_mesh.  Old nodes keep their values and each new node takes
+  the average of the two ends of its line, so P is exact for the linear (CST)
+  fields of the old mesh.  P^T restricts residuals back to the old mesh.
+  ---------
+    Input
+  ---------
+  nNode - (int) number of nodes in the old mesh
+  line2node - (list of lists) lines of the old mesh (only the two ends are used)
+  index - (int) index of the first node
+  ----------
+    Output
+  ----------
+  P - (CSR matrix) (nNode + nLine) x nNode, for one DOF per node
+  """
+  from numpy import arange, asarray, concatenate, full, ndarray, ones
+  from scipy.sparse import csr_matrix
+
+  if (isinstance(line2node, ndarray)):
+    ends = line2node[:, [0, -1]].astype(int) - index
+  else:
+    ends = asarray([[line[0], line[-1]] for line in line2node], dtype=int).reshape(-1, 2) - index
+  nLine = len(ends)
+  rows = concatenate((arange(nNode), nNode + arange(nLine), nNode + arange(nLine)))
+  cols = concatenate((arange(nNode), ends[:, 0], ends[:, 1]))
+  vals = concatenate((ones(nNode), full(2*nLine, 0.5)))
+  return csr_matrix((vals, (rows, cols)), shape=(nNode + nLine, nNode))
+
+# -----------------------------------------------
+
+def nodeKeys(rows, M):
+  # Integer key of each row of nodes, whatever the order of the nodes in the row
+  # M - one more than the largest node number
+  from numpy import asarray, int64, sort
+
+  rows = sort(asarray(rows, dtype=int64), axis=1)
+  key = rows[:, 0]
+  for j in range(1, rows.shape[1]):
+    key = key*M + rows[:, j]
+  return key
+
+def bcFinders(bcs, conn, line2node):
+  # Functions that give the line or cell of the nodes of a BC (or -1), for meshes in arrays
+  # The lines and faces of all BCs are found with one sorted search
+  from numpy import argsort, minimum, searchsorted, where
+
+  M = int(max(conn.max(), line2node.max())) + 1
+  def finder(rows, targets):
+    # Dictionary from the key of each target to its row in rows (or -1)
+    if (len(targets) == 0):
+      return {}
+    rowKeys = nodeKeys(rows, M)
+    targetKeys = nodeKeys(targets, M)
+    order = argsort(rowKeys)
+    pos = minimum(searchsorted(rowKeys[order], targetKeys), len(order) - 1)
+    found = where(rowKeys[order][pos] == targetKeys, order[pos], -1)
+    return dict(zip(targetKeys.tolist(), found.tolist()))
+
+  lines = finder(line2node[:, [0, -1]], [[bc.nodes[0], bc.nodes[-1]] for bc in bcs if bc.geom == 'line'])
+  findLine = lambda nodes: lines.get(int(nodeKeys([[nodes[0], nodes[-1]]], M)[0]), -1)
+  if (M**3 < 2**62):
+    cells = finder(conn, [bc.nodes for bc in bcs if bc.geom == 'face' and len(bc.nodes) == 3])
+    findCell = lambda nodes: cells.get(int(nodeKeys([nodes], M)[0]), -1) if len(nodes) == 3 else -1
+  else:
+    # Keys of three nodes would overflow
+    cells = cellLookup(conn.tolist())
+    findCell = lambda nodes: cells.get(tuple(sorted(nodes)), -1)
+  return [findLine, findCell]
+
+# -----------------------------------------------
+
+def meshRefineArrays(xnode, ynode, conn, bcs, conn2line=[], line2node=[], prolongation=False, levels=1):
+  """
+  Vectorized meshRefine for a mesh held in arrays (called by meshRefine when conn is an array).
+  Usage - [xnode, ynode, conn, bcs, conn2line, line2node] = meshRefineArrays(xnode, ynode, conn, bcs, conn2line, line2node)
+  The lines come from edgeTable (np.unique on the sorted edge pairs), all midpoints
+  are found at once, and the four children of every element and their lines are
+  taken from a table of the six nodes of each element by fancy indexing.  Nodes,
+  lines, and elements are numbered exactly as by meshRefine:
+   - the midpoint of line l is node nNode + l
+   - line l is split into lines 2l and 2l + 1, and the interior lines of element e
+     are 2 nLine + 3e to 2 nLine + 3e + 2
+   - element e is split into elements 4e to 4e + 3
+  With levels=n the mesh is refined n times, giving the same mesh as n calls.  The
+  BCs are only split once, into 2^n lines or 4^n faces (see refineBCs), and P
+  (with prolongation=True) interpolates from the first mesh to the last.
+  The outputs are arrays: float64 node locations, and conn, conn2line, and line2node
+  with the integer type of conn.  BCs are lists of BC, as for meshRefine.
+  """
+  from numpy import arange, asarray, concatenate, empty, stack, where
+
+  conn = asarray(conn)
+  if len(xnode) != len(ynode):
+    raise Exception('You done goofed in node definition: xnode and ynode must have same number of nodes!')
+  if (levels < 1):
+    raise Exception('Error in meshRefine: levels must be at least 1.')
+  if (len(conn2line) == 0):
+    [conn2line, line2node] = edgeTable(conn)
+  conn2line = asarray(conn2line, dtype=conn.dtype)
+  line2node = asarray(line2node, dtype=conn.dtype)
+  index = int(conn.min())
+  xnode = asarray(xnode, dtype=float)
+  ynode = asarray(ynode, dtype=float)
+  [findLine, findCell] = bcFinders(bcs, conn, line2node)
+  conn0 = conn
+  line2node0 = line2node
+  P = None
+
+  for level in range(levels):
+    nNode = len(xnode)
+    nLine = len(line2node)
+    nElem = len(conn)
+
+    # Midpoint of every line
+    ends = line2node - index
+    xnodeNew = concatenate((xnode, (xnode[ends[:, 0]] + xnode[ends[:, 1]])/2))
+    ynodeNew = concatenate((ynode, (ynode[ends[:, 0]] + ynode[ends[:, 1]])/2))
+    mid = (arange(nLine) + nNode + index).astype(conn.dtype)
+
+    # Nodes 0 to 5 of every element, numbered as in the diagram of meshRefine
+    node = empty((nElem, 6), dtype=conn.dtype)
+    node[:, 0::2] = conn
+    node[:, 1::2] = mid[conn2line]
+    connNew = node[:, [0, 1, 5, 2, 3, 1, 4, 5, 3, 1, 3, 5]].reshape(-1, 3)
+
+    # Split lines, then the interior lines of every element
+    line2nodeNew = empty((2*nLine + 3*nElem, 2), dtype=conn.dtype)
+    line2nodeNew[0:2*nLine:2, 0] = line2node[:, 0]
+    line2nodeNew[0:2*nLine:2, 1] = mid
+    line2nodeNew[1:2*nLine:2, 0] = mid
+    line2nodeNew[1:2*nLine:2, 1] = line2node[:, 1]
+    line2nodeNew[2*nLine:] = stack((node[:, [1, 3, 5]], node[:, [3, 5, 1]]), axis=2).reshape(-1, 2)
+
+    # newline1, 3, 5 start at corners 0, 2, 4 - the first half of the old line if it
+    # has the same direction in the element, otherwise the second
+    sameDirection = line2node[conn2line, 0] == conn
+    first = where(sameDirection, 2*conn2line, 2*conn2line + 1)
+    second = where(sameDirection, 2*conn2line + 1, 2*conn2line)
+    interior = (2*nLine + 3*arange(nElem)[:, None] + arange(3)).astype(conn.dtype)
+    [newline1, newline3, newline5] = first.T
+    [newline2, newline4, newline6] = second.T
+    [newline7, newline8, newline9] = interior.T
+    conn2lineNew = stack((newline1, newline9, newline6, newline3, newline7, newline2,
+                          newline5, newline8, newline4, newline7, newline8, newline9), axis=1).reshape(-1, 3)
+
+    if (prolongation):
+      Plevel = midpointProlongation(nNode, line2node, index)
+      P = Plevel if P is None else Plevel @ P
+
+    [xnode, ynode, conn, conn2line, line2node] = [xnodeNew, ynodeNew, connNew, conn2lineNew, line2nodeNew]
+
+  bcsNew = refineBCs(bcs, line2node0, line2node, conn, findLine, findCell, levels)
+
+  if (prolongation):
+    return [xnode, ynode, conn, bcsNew, conn2line, line2node, P.tocsr()]
+  return [xnode, ynode, conn, bcsNew, conn2line, line2node]
+
+# -----------------------------------------------
+
+def meshRefine(xnode, ynode=None, conn=None, bcs=None, conn2line=[], line2node=[], prolongation=False, levels=1):
   """
   For a triangle, we generate new midpoints, and split each element into four as shown below:
   4
@@ -70,8 +373,41 @@ def meshRefine(xnode, ynode, conn, bcs, conn2line=[], line2node=[]):
   newline1-6: exterior, CCW from 0 (0-1, 1-2, etc.)
   newline7-9: interior, CCW from 1 (1-3, 3-5, 5-1)
   new elements: [0, 1, 5], [2, 3, 1], [4, 5, 3], [1, 3, 5]
+
+  Usage - [xnode, ynode, conn, bcs, conn2line, line2node] = meshRefine(xnode, ynode, conn, bcs, conn2line, line2node)
+  With prolongation=True, the interpolation from the old mesh to the new one
+  (see midpointProlongation) is returned as a seventh output, for multigrid.
+  If conn is an (nElem x 3) array, the mesh is refined by meshRefineArrays, which
+  numbers everything the same way but returns arrays.
+  A Mesh can be given instead of the lists - mesh = meshRefine(mesh) returns the
+  refined Mesh (and P with prolongation=True), with its edge table already set.
+  With levels=n the mesh is refined n times in one call, with the same result as n
+  calls, but the BCs are split (and polynomial BCs re-parameterized) only once.
+  P then interpolates from the given mesh to the final one.
   """
+  from numpy import ndarray
   from .helpers import connIndex
+  from .mesh import Mesh
+
+  if (isinstance(xnode, Mesh)):
+    mesh = xnode
+    if (mesh.conn.shape[1] != 3):
+      raise Exception('Error in meshRefine: only 3 node (CST) meshes can be refined.')
+    [conn2line, line2node] = mesh.edges()
+    refined = meshRefineArrays(mesh.xnode, mesh.ynode, mesh.conn, mesh.bcs, conn2line, line2node, prolongation, levels)
+    meshNew = Mesh(refined[0], refined[1], refined[2], refined[3], refined[4], refined[5], index=0)
+    meshNew.index = mesh.index
+    if (prolongation):
+      return [meshNew, refined[6]]
+    return meshNew
+  if (isinstance(conn, ndarray)):
+    return meshRefineArrays(xnode, ynode, conn, bcs, conn2line, line2node, prolongation, levels)
+  if (levels != 1):
+    # Refine the lists as arrays, and give back lists
+    refined = meshRefineArrays(xnode, ynode, conn, bcs, conn2line, line2node, prolongation, levels)
+    for i in [0, 1, 2, 4, 5]:
+      refined[i] = refined[i].tolist()
+    return refined
 
   connNew = []
   if (len(conn2line) == 0):
@@ -185,91 +521,21 @@ def meshRefine(xnode, ynode, conn, bcs, conn2line=[], line2node=[]):
     elemCount = elemCount + 4
 
     
-  # Sample BCs:
-  """
-  bcs.append({geom:'point', nodes:1, kind:'temperature', value: 0})
-  bcs.append({geom:'line', nodes:[3, 4], kind:'convection', value:50, coefficient:2.5})
-  bcs.append({geom:'face', nodes:[1, 2, 3], kind:'heat flow', value:100})
-  """
-  bcsNew = []
-  for bc in bcs:
-    if bc.geom == 'point':
-      # No change required for point boundary conditions - point names do not change
-      bcsNew.append(bc)
-    elif bc.geom == 'line':
-      # Line boundary conditions should be applied to new child lines
-      lineNum = lineExists(line2node, bc.nodes)
-      if lineNum == -1:
-        raise Exception('You done goofed in bc "nodes": line does not exist in conn')
-      else:
-        bc1 = bc.copy()
-        bc2 = bc.copy()
-        
-        # Create new lines and swap order if necessary
-        if line2node[lineNum][0] == bc.nodes[0]:   # order is same as in line2node
-          newLineNum1 = lineUpdateList[lineNum][0]
-          newLineNum2 = lineUpdateList[lineNum][1]
-        else:                          # order is flipped from line2node
-          templineNum1 = lineUpdateList[lineNum][1]
-          newline1 = [line2nodeNew[templineNum1][1], line2nodeNew[templineNum1][0]]
-          templineNum2 = lineUpdateList[lineNum][0]
-          newline2 = [line2nodeNew[templineNum2][1], line2nodeNew[templineNum2][0]]
-        
-        bc1.nodes=newline1
-        bc2.nodes=newline2
-        
-        if bc.VarType('value') == 'poly':
-          # const and func variations do not need changes from splitting
-          [poly1, poly2] = split_poly(bc.value)
-          bc1.value = poly1
-          bc2.value = poly2
-        if bc.VarType('coefficient') == 'poly':
-          # const and func variations do not need changes from splitting
-          [poly1, poly2] = split_poly(bc.coefficient)
-          bc1.coefficient = poly1
-          bc2.coefficient = poly2
-          
-        # Flow kind of BC must be split  
-        if bc.kind == 'flow':
-          bc1.value = bc.value/2
-          bc2.value = bc.value/2
-          
-        bcsNew.append(bc1)
-        bcsNew.append(bc2)
-    elif bc.geom == 'face':
-      # Face boundary conditions should be applied to new child faces
-      elemNum = cellExists(conn, bc.nodes)
-      if lineNum == -1:
-        raise Exception('You done goofed in bc "nodes": cell does not exist in conn')
-      else:
-        bc1 = bc.copy()
-        bc2 = bc.copy()
-        bc3 = bc.copy()
-        bc4 = bc.copy()
-        
-        newElems = connUpdateList[elemNum]
-        bc1.nodes = connNew[newElems[0]]
-        bc2.nodes = connNew[newElems[1]]
-        bc3.nodes = connNew[newElems[2]]
-        bc4.nodes = connNew[newElems[3]]
-        
-        # Flow kind of BC must be split  
-        if bc.kind == 'flow':
-          bc1.value = bc.value/4
-          bc2.value = bc.value/4
-          bc3.value = bc.value/4
-          bc4.value = bc.value/4
-        
-        bcsNew.append(bc1)
-        bcsNew.append(bc2)
-        bcsNew.append(bc3)
-        bcsNew.append(bc4)
-        if bc.VarType('value') == 'poly':
-          raise Exception('You done goofed in bc "value": face value cannot be a 1D polynomial')
-        if bc.VarType('coefficient') == 'poly':
-          raise Exception('You done goofed in bc "coefficient": face value cannot be a 1D polynomial')
-    else:
-      raise Exception('You done goofed in bc "geom": Geometry type should be "point", "line", or "face"')
-  
+  lines = None
+  cells = None
+  def findLine(nodes):
+    nonlocal lines
+    if (lines == None):
+      lines = lineLookup(line2node)
+    return lines.get(lineKey(nodes), -1)
+  def findCell(nodes):
+    nonlocal cells
+    if (cells == None):
+      cells = cellLookup(conn)
+    return cells.get(tuple(sorted(nodes)), -1)
+  bcsNew = refineBCs(bcs, line2node, line2nodeNew, connNew, findLine, findCell)
   
+  if (prolongation):
+    P = midpointProlongation(len(xnode), line2node, index)
+    return [xnodeNew, ynodeNew, connNew, bcsNew, conn2lineNew, line2nodeNew, P]
   return [xnodeNew, ynodeNew, connNew, bcsNew, conn2lineNew, line2nodeNew]
@@ -0,0 +1,125 @@
+def gaussSeidel(A):
+  # Forward and backward Gauss-Seidel sweeps, using fill-free factors of the triangles of A
+  from scipy.sparse import tril, triu
+  from scipy.sparse.linalg import splu
+
+  lower = splu(tril(A).tocsc(), permc_spec='NATURAL', diag_pivot_thresh=0.0)
+  upper = splu(triu(A).tocsc(), permc_spec='NATURAL', diag_pivot_thresh=0.0)
+  return [lower.solve, upper.solve]
+
+class multigrid:
+  """
+  Geometric multigrid for a mesh made by repeated meshRefine (and LST_mesh).
+  Usage - mg = multigrid(kbc, prolongations)
+          [T, info] = mg.solve(forces)
+          [T, info] = pcg(kbc, forces, precond=mg.precondition)
+  The prolongations are the P outputs of meshRefine(..., prolongation=True) for
+  each refinement, then of LST_mesh(..., prolongation=True) if LST elements are
+  used, in the order they were made (coarsest first).  The coarse matrices are
+  found from the fine one as P^T A P, so only the finest mesh is assembled.
+  Each cycle uses Gauss-Seidel smoothing (forward sweeps going down, backward
+  sweeps coming up, so the cycle is symmetric and can precondition pcg) and a
+  direct solve on the coarsest mesh.  The work per cycle grows linearly with
+  the number of DOFs.
+  ---------
+    Input
+  ---------
+  A - (sparse matrix) SPD matrix on the finest mesh, e.g. from
+      applyBCsSparse(..., method='symmetric') or method='reduce'
+  prolongations - (list of sparse matrices) interpolation between levels, coarsest first
+  nDOF - (int) degrees of freedom per node
+  bcMap - (dofMap) the dofMap from method='reduce', if A only holds the free DOFs
+  cycle - (string) 'V' or 'W'
+  smoothing - (int) Gauss-Seidel sweeps before and after each coarse correction
+
+  Contains the following attributes:
+    levels - (list) matrices from finest to coarsest
+    P - (list) prolongation from each level to the next finer one (P[k]: level k+1 -> k)
+  """
+  def __init__(self, A, prolongations, nDOF=1, bcMap=None, cycle='V', smoothing=1):
+    from scipy.sparse import csr_matrix, identity, kron
+    from scipy.sparse.linalg import splu
+
+    if (cycle != 'V' and cycle != 'W'):
+      raise Exception('Error in multigrid: cycle must be "V" or "W".')
+    self.cycleType = cycle
+    self.smoothing = smoothing
+
+    # Prolongations from finest to coarsest, expanded to all DOFs of each node
+    self.P = []
+    for P in reversed(prolongations):
+      if (nDOF > 1):
+        P = kron(P, identity(nDOF))
+      self.P.append(csr_matrix(P))
+    if (bcMap != None):
+      self.P[0] = self.P[0][bcMap.free]
+
+    A = csr_matrix(A)
+    if (A.shape[0] != self.P[0].shape[0]):
+      raise Exception('Error in multigrid: A is ' + str(A.shape) + ' but the finest prolongation has ' + str(self.P[0].shape[0]) + ' rows.')
+    self.levels = [A]
+    self.smoothers = []
+    for P in self.P:
+      self.smoothers.append(gaussSeidel(self.levels[-1]))
+      self.levels.append((P.T @ self.levels[-1] @ P).tocsr())
+    self.coarseSolve = splu(self.levels[-1].tocsc()).solve
+
+  def cycle(self, b, x=None, level=0):
+    """
+    Apply one multigrid cycle to A x = b on the given level, starting from x (or zero).
+    """
+    from numpy import zeros
+
+    A = self.levels[level]
+    if (level == len(self.levels) - 1):
+      return self.coarseSolve(b)
+    if (x is None):
+      x = zeros(len(b))
+    else:
+      x = x.copy()
+    [forward, backward] = self.smoothers[level]
+    P = self.P[level]
+
+    for i in range(self.smoothing):
+      x += forward(b - A @ x)
+    visits = 1 if self.cycleType == 'V' else 2
+    for i in range(visits):
+      rCoarse = P.T @ (b - A @ x)
+      e = self.cycle(rCoarse, None, level + 1)
+      x += P @ e
+    for i in range(self.smoothing):
+      x += backward(b - A @ x)
+    return x
+
+  def precondition(self, r):
+    """
+    One cycle from a zero guess - pass as pcg(..., precond=mg.precondition).
+    """
+    return self.cycle(r)
+
+  def solve(self, b, x0=None, tol=1e-8, maxiter=100):
+    """
+    Solve A x = b by repeated cycles.
+    Usage - [x, info] = mg.solve(b, x0, tol, maxiter)
+    Stops when ||b - A x|| <= tol*||b||.  info is as returned by pcg.
+    """
+    from numpy import asarray, zeros
+    from numpy.linalg import norm
+
+    b = asarray(b, dtype=float)
+    A = self.levels[0]
+    if (x0 is None):
+      x = zeros(len(b))
+    else:
+      x = asarray(x0, dtype=float).copy()
+    bNorm = norm(b)
+    if (bNorm == 0):
+      bNorm = 1.0
+    residuals = [norm(b - A @ x)/bNorm]
+    iterations = 0
+    while (residuals[-1] > tol and iterations < maxiter):
+      x = self.cycle(b, x)
+      iterations += 1
+      residuals.append(norm(b - A @ x)/bNorm)
+    info = {'iterations': iterations, 'converged': residuals[-1] <= tol, 'residuals': residuals}
+    return [x, info]
@@ -0,0 +1,143 @@
+from .helpers import meshInput
+
+@meshInput
+def newtonDiffusion(xnode, ynode, conn, D, bcs, thickness, index=None, T0=0.0, tol=1e-8, maxiter=50,
+                    modified=True, reuseRatio=0.25, gaussPoints=None):
+  """
+  Solve steady diffusion with a temperature-dependent conductivity by Newton's method.
+  Usage - D = constMatrix(k=lambda T: 10 + 0.02*T, type2D='diffusion')
+          [T, stats] = newtonDiffusion(xnode, ynode, conn, D, bcs, thickness, index)
+  The residual R(T) = K(T) T - F is found with D(T) evaluated in one batch at all
+  Gauss points of all elements, and the mapping of the elements is only found once.
+  The tangent dR/dT includes the derivative of D (by finite differences).  With
+  modified=True the factorization of the tangent is reused while the residual keeps
+  dropping by at least a factor of reuseRatio each iteration, and refactored when
+  convergence slows - most iterations then cost one assembly of R and a pair of
+  triangular solves.  Temperature BCs are eliminated (as method='reduce').
+  ---------
+    Input
+  ---------
+  xnode, ynode - (lists) node locations
+  conn - (list of lists or array) connectivity of elements (LST, CST, or Q4)
+  D - (function) D(T), array of temperatures -> array of 2x2 matrices, e.g. from
+      constMatrix(k=kFunction, type2D='diffusion') - or a constant 2x2 matrix
+  bcs - (list) boundary conditions (BC)
+  thickness - (float or nElem array) thickness of elements in third dimension - must
+              be a float when there are flux or convection BCs
+  index - (int) index of the first node - defaults to that of conn
+  T0 - (float or array) starting temperatures
+  tol - (float) stop when ||R|| <= tol * ||R(T0)||
+  maxiter - (int) maximum number of iterations
+  modified - (logical) reuse the tangent factorization when convergence allows
+  reuseRatio - (float) refactor when ||R_new|| > reuseRatio * ||R_old||
+  gaussPoints - (quadPoints) quadrature - defaults depend on element type
+  ----------
+    Output
+  ----------
+  T - (array) temperature of every node
+  stats - (dict) 'iterations', 'factorizations', 'converged', 'residuals' (||R|| at
+          each iteration), and the time spent in 'assemblyTime', 'factorTime', 'solveTime'
+  """
+  from time import perf_counter
+  from numpy import asarray, bincount, einsum, full, shape, sqrt, dot, abs as npabs
+  from scipy.sparse import coo_matrix
+  from scipy.sparse.linalg import splu
+  from .applyBCs import boundaryTerms, dofMap
+  from .assemble import assemblyPlan
+  from .elementQuadrature import mapElements, areaScale
+  from .helpers import connArray
+  from .quadPoints import quadPoints
+
+  connArr, connIdx = connArray(conn)
+  if (index == None):
+    index = connIdx
+  nNodeElem = shape(connArr)[1]
+  families = {6: ('triangle', 3, 'LST'), 3: ('triangle', 1, 'CST'), 4: ('quad', 3, 'Q4')}
+  if (nNodeElem not in families):
+    raise Exception('Error in newtonDiffusion: elements with ' + str(nNodeElem) + ' nodes are not supported.')
+  [geom, precision, family] = families[nNodeElem]
+  if (gaussPoints == None):
+    gaussPoints = quadPoints(geom, precision)
+  if (not callable(D)):
+    Dconst = asarray(D, dtype=float)
+    D = lambda T: Dconst + 0*T[..., None, None]
+
+  # Element mapping and assembly pattern, found once
+  start = perf_counter()
+  xElem = asarray(xnode, dtype=float)[connArr]
+  yElem = asarray(ynode, dtype=float)[connArr]
+  [psi, detJ, dpsidxy] = mapElements(xElem, yElem, gaussPoints, family)
+  thickness = asarray(thickness, dtype=float)
+  if (thickness.ndim == 1):
+    if (len(thickness) != len(connArr)):
+      raise Exception('Error in newtonDiffusion: thickness must be a float or have one entry per element.')
+    if (any(bc.kind in ['flux', 'convection'] for bc in bcs)):
+      raise Exception('Error in newtonDiffusion: thickness must be a float for flux and convection BCs.')
+    # Same thickness at every Gauss point of an element
+    thicknessElem = thickness[:, None]
+  elif (thickness.ndim == 0):
+    thicknessElem = thickness
+    thickness = float(thickness)
+  else:
+    raise Exception('Error in newtonDiffusion: thickness must be a float or have one entry per element.')
+  scale = detJ*areaScale(gaussPoints)*thicknessElem*gaussPoints.weights
+  plan = assemblyPlan(connArr, 1, len(xnode))
+
+  [rows, cols, vals, forces, fixedDOF, fixedValue] = boundaryTerms(bcs, xnode, ynode, thickness, 'diffusion', index)
+  boundary = coo_matrix((vals, (rows, cols)), shape=plan.shape).tocsr()
+  bcMap = dofMap(plan.shape[0], fixedDOF, fixedValue)
+  free = bcMap.free
+
+  T = full(plan.shape[0], 0.0)
+  T[:] = asarray(T0, dtype=float)
+  T[bcMap.fixed] = bcMap.fixedValue
+  stats = {'iterations': 0, 'factorizations': 0, 'converged': False, 'residuals': [],
+           'assemblyTime': perf_counter() - start, 'factorTime': 0.0, 'solveTime': 0.0}
+
+  def residual(T):
+    # Residual on all DOFs, and the values at the Gauss points needed for the tangent
+    TElem = T[connArr]
+    Tg = TElem @ psi.T                                    # nElem x nGauss
+    Dg = D(Tg)
+    gradT = einsum('egci,ei->egc', dpsidxy, TElem)        # nElem x nGauss x 2
+    flux = einsum('egcd,egd->egc', Dg, gradT)
+    rElem = einsum('eg,egci,egc->ei', scale, dpsidxy, flux)
+    R = bincount(connArr.ravel(), weights=rElem.ravel(), minlength=plan.shape[0]) + boundary @ T - forces
+    return [R, Tg, Dg, gradT]
+
+  def tangent(Tg, Dg, gradT):
+    # dR/dT on the free DOFs: K(T) plus the term from the derivative of D
+    kElem = einsum('eg,egci,egcd,egdj->eij', scale, dpsidxy, Dg, dpsidxy)
+    h = 1e-7*(1 + npabs(Tg))
+    dD = (D(Tg + h) - Dg) / h[..., None, None]
+    dflux = einsum('egcd,egd->egc', dD, gradT)
+    kElem += einsum('eg,egci,egc,gj->eij', scale, dpsidxy, dflux, psi)
+    return (plan.assemble(kElem) + boundary)[free][:, free].tocsc()
+
+  solve = None
+  for iteration in range(maxiter + 1):
+    t = perf_counter()
+    [R, Tg, Dg, gradT] = residual(T)
+    R = R[free]
+    stats['assemblyTime'] += perf_counter() - t
+    norm = sqrt(dot(R, R))
+    stats['residuals'].append(norm)
+    if (norm <= tol*stats['residuals'][0] or norm == 0):
+      stats['converged'] = True
+      break
+    if (iteration == maxiter):
+      break
+    # Refactor on the first iteration, for full Newton, or when convergence slows
+    if (solve is None or not modified or norm > reuseRatio*stats['residuals'][-2]):
+      t = perf_counter()
+      J = tangent(Tg, Dg, gradT)
+      stats['assemblyTime'] += perf_counter() - t
+      t = perf_counter()
+      solve = splu(J).solve
+      stats['factorizations'] += 1
+      stats['factorTime'] += perf_counter() - t
+    t = perf_counter()
+    T[free] -= solve(R)
+    stats['solveTime'] += perf_counter() - t
+    stats['iterations'] += 1
+  return [T, stats]
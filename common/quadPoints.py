@@ -1,19 +1,32 @@
 from math import sqrt
+from numpy import array
+
 class quadPoints:
+  # Shape function tables, shared by every instance with the same geom and precision
+  tableCache = {}
 
   def __init__(self, geom='triangle', precision=2):
     '''
     Creates and stores the quadrature points and weights for a given quadrature.
     Contains the following attributes:
-      points - list of lists: 
+      points - (array) nPoints x 2 for triangles and quads, nPoints for lines: 
         [[x1, y1],
          [x2, y2],
          ...,
          [xN, yN]]
-      weights - list:
+      weights - (array):
          [w1, w2, ... wN]
       order - number of points in the list (integer)
       precision - accuracy of method (integer)
+      geom - 'triangle', 'quad', or 'line'
+    
+    Triangle and line weights sum to 1 (the reference triangle has an area of 1/2 and
+    the reference line runs from 0 to 1).  Quad points are on the Q4 reference square,
+    -1 to 1 in xi and eta, and the weights sum to 4.
+    
+    Shape function values and derivatives at the points are available through
+    shapeFunctions(family) and shapeDerivatives(family).  They are calculated the
+    first time they are requested and cached for every quadPoints of the same type.
       
     Triangle References:
 
@@ -155,7 +168,15 @@ class quadPoints:
       else:
         raise Exception('Error in quadPoints: precision not supported for triangle geometry.')
     elif geom == 'quad':
-      raise Exception('Error in quadPoints: precision not supported for quad geometry.')
+      # Tensor product of Gauss-Legendre points, n points are exact for degree 2n-1
+      if precision in [1, 3, 5, 7, 9]:
+        from numpy.polynomial.legendre import leggauss
+        [xi, w] = leggauss((precision + 1)//2)
+        self.points = [[a, b] for b in xi for a in xi]
+        self.weights = [wa*wb for wb in w for wa in w]
+        self.order = len(self.weights)
+      else:
+        raise Exception('Error in quadPoints: precision not supported for quad geometry (only odd).')
     elif geom == 'line':
       if precision == 1:
         self.points = [0.5]
@@ -190,4 +211,69 @@ class quadPoints:
         self.points = [0.5 - b, 0.5 - a, 0.5, 0.5 + a, 0.5 + b]
         self.weights = [u, v, w, v, u]
       else:
-        raise Exception('Error in quadPoints: precision not supported for line geometry (only odd).')
\ No newline at end of file
+        raise Exception('Error in quadPoints: precision not supported for line geometry (only odd).')
+    else:
+      raise Exception('Error in quadPoints: geom must be "triangle", "quad", or "line".')
+    
+    self.points = array(self.points, dtype=float)
+    self.weights = array(self.weights, dtype=float)
+    self.order = len(self.weights)
+    self.geom = geom
+    self.precision = precision
+
+  def shapeFunctions(self, family='LST'):
+    '''
+    Shape function values at every quadrature point.
+    Usage - psi = gaussPoints.shapeFunctions(family)
+    family - 'LST', 'CST', or 'Q4'
+    Returns an nPoints x nNode array (read-only).  For lines, the nodes are the
+    nodes along the line, in order: 3 for LST, 2 for CST and Q4.
+    '''
+    return self.tables(family)[0]
+
+  def shapeDerivatives(self, family='LST'):
+    '''
+    Shape function derivatives at every quadrature point.
+    Usage - dpsi = gaussPoints.shapeDerivatives(family)
+    family - 'LST', 'CST', or 'Q4'
+    Returns an nPoints x 2 x nNode array (read-only), with dpsi[:, 0] the
+    derivatives with respect to xi and dpsi[:, 1] with respect to eta.
+    For lines, returns nPoints x nNode derivatives with respect to xi.
+    '''
+    return self.tables(family)[1]
+
+  def tables(self, family):
+    # Look up (or build and store) the shape function tables for this quadrature
+    key = (self.geom, self.precision, family)
+    if key not in quadPoints.tableCache:
+      psi, dpsi = shapeTables(self.geom, family, self.points)
+      psi.flags.writeable = False
+      dpsi.flags.writeable = False
+      quadPoints.tableCache[key] = (psi, dpsi)
+    return quadPoints.tableCache[key]
+
+def shapeTables(geom, family, points):
+  # Evaluate the shape functions and derivatives of an element family at the points
+  from ..LST.LST_shapeFunctions import LST_shapeFunctions, LST_shapeDerivatives
+  from ..CST.CST_shapeFunctions import CST_shapeFunctions, CST_shapeDerivatives
+  from ..Q4.Q4_shapeFunctions import Q4_shapeFunctions, Q4_shapeDerivatives
+  
+  if geom == 'triangle' and family == 'LST':
+    psi = [LST_shapeFunctions(xi, eta) for [xi, eta] in points]
+    dpsi = [LST_shapeDerivatives(xi, eta) for [xi, eta] in points]
+  elif geom == 'triangle' and family == 'CST':
+    psi = [CST_shapeFunctions(xi, eta) for [xi, eta] in points]
+    dpsi = [CST_shapeDerivatives(xi, eta) for [xi, eta] in points]
+  elif geom == 'quad' and family == 'Q4':
+    psi = [Q4_shapeFunctions(xi, eta) for [xi, eta] in points]
+    dpsi = [Q4_shapeDerivatives(xi, eta) for [xi, eta] in points]
+  elif geom == 'line' and family == 'LST':
+    # Edge 1-2 of the LST element (eta = 0): corner, midpoint, corner
+    psi = [[LST_shapeFunctions(xi, 0)[i] for i in [0, 5, 1]] for xi in points]
+    dpsi = [[LST_shapeDerivatives(xi, 0)[0][i] for i in [0, 5, 1]] for xi in points]
+  elif geom == 'line' and (family == 'CST' or family == 'Q4'):
+    psi = [[1 - xi, xi] for xi in points]
+    dpsi = [[-1, 1] for xi in points]
+  else:
+    raise Exception('Error in quadPoints: no ' + str(family) + ' shape functions for ' + str(geom) + ' geometry.')
+  return array(psi, dtype=float), array(dpsi, dtype=float)
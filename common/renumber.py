@@ -0,0 +1,136 @@
+from .helpers import meshInput
+
+def nodeGraph(conn, nNode=None):
+  """
+  Node adjacency of a mesh: nodes are connected if they share an element.
+  Usage - G = nodeGraph(conn, nNode)
+  Returns an nNode x nNode CSR matrix (zero-indexed) with the same pattern as a
+  stiffness matrix with one DOF per node.
+  """
+  from numpy import broadcast_to, ones
+  from scipy.sparse import coo_matrix
+  from .helpers import connArray
+
+  connArr, index = connArray(conn)
+  nElem, nNodeElem = connArr.shape
+  if (nNode == None):
+    nNode = connArr.max() + 1
+  rows = broadcast_to(connArr[:, :, None], (nElem, nNodeElem, nNodeElem)).ravel()
+  cols = broadcast_to(connArr[:, None, :], (nElem, nNodeElem, nNodeElem)).ravel()
+  G = coo_matrix((ones(len(rows)), (rows, cols)), shape=(nNode, nNode)).tocsr()
+  G.data[:] = 1
+  return G
+
+# ---------------------------------------------------------------------------
+
+class renumbering:
+  """
+  A permutation of the nodes of a mesh, as made by renumberNodes.
+  Usage - T = numbering.toOriginal(Tnew)
+
+  Contains the following attributes:
+    perm - (array) zero-indexed original node of each new node
+    newNode - (array) zero-indexed new node of each original node (inverse of perm)
+  """
+  def __init__(self, perm):
+    from numpy import asarray, empty, arange
+
+    self.perm = asarray(perm, dtype=int)
+    self.newNode = empty(len(self.perm), dtype=int)
+    self.newNode[self.perm] = arange(len(self.perm))
+
+  def dofPermutation(self, nDOF=1):
+    # Original DOF of each new DOF
+    from numpy import arange
+    return (self.perm[:, None]*nDOF + arange(nDOF)).ravel()
+
+  def toOriginal(self, u, nDOF=1):
+    """
+    Put a solution (nNode*nDOF, or nNode*nDOF x nCases) found on the renumbered mesh
+    back into the original node order.
+    """
+    from numpy import asarray, empty_like
+
+    u = asarray(u)
+    uOriginal = empty_like(u)
+    uOriginal[self.dofPermutation(nDOF)] = u
+    return uOriginal
+
+  def toNew(self, u, nDOF=1):
+    """
+    Put a vector in the original node order into the renumbered order.
+    """
+    from numpy import asarray
+    return asarray(u)[self.dofPermutation(nDOF)]
+
+# ---------------------------------------------------------------------------
+
+def rcmPermutation(conn, nNode=None):
+  """
+  Reverse Cuthill-McKee ordering of the nodes of a mesh.
+  Usage - perm = rcmPermutation(conn, nNode)
+  Returns the zero-indexed original node of each new node.
+  """
+  from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+  return reverse_cuthill_mckee(nodeGraph(conn, nNode), symmetric_mode=True)
+
+# ---------------------------------------------------------------------------
+
+@meshInput
+def renumberNodes(xnode, ynode, conn, bcs=[], line2node=[], perm=None):
+  """
+  Renumber the nodes of a mesh to reduce the bandwidth (profile) of the stiffness matrix.
+  Usage - [xnode, ynode, conn, bcs, line2node, numbering] = renumberNodes(xnode, ynode, conn, bcs, line2node)
+  meshRefine and LST_mesh number new nodes in line order, which spreads the nonzeros
+  of the stiffness matrix far from the diagonal.  Reverse Cuthill-McKee numbering
+  keeps connected nodes close together, which helps banded solvers and the cache
+  behaviour of assembly.  Lines and elements keep their numbers, so conn2line is
+  unchanged.  The index (0 or 1) of the mesh is kept.
+  ---------
+    Input
+  ---------
+  xnode - (list or array) x locations of nodes
+  ynode - (list or array) y locations of nodes
+  conn - (list of lists or array) connectivity of elements
+  bcs - (list) boundary conditions (BC)
+  line2node - (list of lists) nodes of each line, from meshRefine or LST_mesh
+  perm - (array) zero-indexed original node of each new node - defaults to rcmPermutation
+  ----------
+    Output
+  ----------
+  xnode, ynode, conn, bcs, line2node - the renumbered mesh, of the same types as the inputs
+  numbering - (renumbering) permutation used, with toOriginal(u) to put solutions
+              back in the original node order
+  """
+  from numpy import asarray, ndarray
+  from .helpers import connArray
+
+  connArr, index = connArray(conn)
+  nNode = len(xnode)
+  if (perm is None):
+    perm = rcmPermutation(connArr, nNode)
+  numbering = renumbering(perm)
+  if (len(numbering.perm) != nNode):
+    raise Exception('Error in renumberNodes: perm must have one entry per node.')
+  newNode = numbering.newNode + index
+
+  def remap(nodes):
+    # Same container type as given, with the new node numbers
+    if (isinstance(nodes, ndarray)):
+      return newNode[nodes - index]
+    return [remap(node) if isinstance(node, (list, ndarray)) else int(newNode[node - index]) for node in nodes]
+
+  xnodeNew = asarray(xnode, dtype=float)[numbering.perm]
+  ynodeNew = asarray(ynode, dtype=float)[numbering.perm]
+  if (not isinstance(xnode, ndarray)):
+    xnodeNew = xnodeNew.tolist()
+    ynodeNew = ynodeNew.tolist()
+
+  bcsNew = []
+  for bc in bcs:
+    bcNew = bc.copy()
+    bcNew.nodes = remap(bc.nodes)
+    bcsNew.append(bcNew)
+
+  return [xnodeNew, ynodeNew, remap(conn), bcsNew, remap(line2node), numbering]
@@ -0,0 +1,168 @@
+def jacobiPreconditioner(A):
+  """
+  Jacobi (diagonal) preconditioner.
+  Usage - M = jacobiPreconditioner(A)
+  A - (sparse matrix, array, or operator with a diagonal() method) SPD matrix
+  Returns a function that applies M^-1 to a residual.
+  """
+  from numpy import asarray
+
+  d = asarray(A.diagonal(), dtype=float)
+  if ((d <= 0).any()):
+    raise Exception('Error in jacobiPreconditioner: the diagonal must be positive.')
+  dinv = 1/d
+  def apply(r):
+    return dinv*r
+  return apply
+
+def ssorPreconditioner(A, omega=1.0):
+  """
+  Symmetric successive over-relaxation (SSOR) preconditioner.
+  Usage - M = ssorPreconditioner(A, omega)
+    M = omega/(2-omega) * (D/omega + L) (D/omega)^-1 (D/omega + L^T)
+  A - (sparse matrix or array) SPD matrix, with lower triangle L and diagonal D
+  omega - (float) relaxation factor, 0 < omega < 2 (1 gives symmetric Gauss-Seidel)
+  Returns a function that applies M^-1 to a residual.
+  """
+  from scipy.sparse import csr_matrix, diags, tril, triu
+  from scipy.sparse.linalg import splu
+
+  if (omega <= 0 or omega >= 2):
+    raise Exception('Error in ssorPreconditioner: omega must be between 0 and 2.')
+  A = csr_matrix(A)
+  d = A.diagonal()
+  # Factoring a triangular matrix without reordering or pivoting creates no fill,
+  # and gives compiled forward and back substitution
+  lower = splu((tril(A, k=-1) + diags(d/omega)).tocsc(), permc_spec='NATURAL', diag_pivot_thresh=0.0)
+  upper = splu((triu(A, k=1) + diags(d/omega)).tocsc(), permc_spec='NATURAL', diag_pivot_thresh=0.0)
+  scale = (2 - omega)/omega
+  def apply(r):
+    z = lower.solve(r)
+    return upper.solve(scale*d/omega*z)
+  return apply
+
+def icPreconditioner(A, dropTol=1e-2, fillFactor=10):
+  """
+  Incomplete Cholesky (L D L^T) preconditioner.
+  Usage - M = icPreconditioner(A, dropTol, fillFactor)
+  The incomplete factor L comes from the incomplete LU factorization of SuperLU
+  (scipy spilu) with the natural ordering and no pivoting.  Only L and the diagonal
+  of U are kept, so M = L D L^T is symmetric as conjugate gradients requires.
+  A - (sparse matrix or array) SPD matrix
+  dropTol - (float) drop tolerance for entries of the factors
+  fillFactor - (float) limit on the fill relative to the nonzeros of A
+  Returns a function that applies M^-1 to a residual.
+  """
+  from numpy import arange, array_equal
+  from scipy.sparse import csc_matrix
+  from scipy.sparse.linalg import spilu, splu
+
+  A = csc_matrix(A)
+  ilu = spilu(A, drop_tol=dropTol, fill_factor=fillFactor,
+              permc_spec='NATURAL', diag_pivot_thresh=0.0)
+  N = A.shape[0]
+  if (not array_equal(ilu.perm_r, arange(N)) or not array_equal(ilu.perm_c, arange(N))):
+    raise Exception('Error in icPreconditioner: the incomplete factorization was reordered.')
+  d = ilu.U.diagonal()
+  if ((d <= 0).any()):
+    raise Exception('Error in icPreconditioner: the incomplete factorization broke down (A not SPD?).')
+  # Triangular factors without reordering or pivoting have no fill
+  lower = splu(ilu.L.tocsc(), permc_spec='NATURAL', diag_pivot_thresh=0.0)
+  upper = splu(ilu.L.T.tocsc(), permc_spec='NATURAL', diag_pivot_thresh=0.0)
+  def apply(r):
+    return upper.solve(lower.solve(r)/d)
+  return apply
+
+def preconditioner(A, precond='jacobi', omega=1.0):
+  """
+  Build a preconditioner by name.
+  Usage - M = preconditioner(A, precond, omega)
+  precond - None, 'jacobi', 'ssor', or 'ic', or a function (or LinearOperator,
+            such as a multigrid cycle) that applies M^-1 to a residual
+  """
+  if (precond == None):
+    return lambda r: r
+  elif (callable(precond)):
+    return precond
+  elif (hasattr(precond, 'matvec')):
+    return precond.matvec
+  elif (precond == 'jacobi'):
+    return jacobiPreconditioner(A)
+  elif (precond == 'ssor'):
+    return ssorPreconditioner(A, omega)
+  elif (precond == 'ic'):
+    return icPreconditioner(A)
+  else:
+    raise Exception('Error in preconditioner: precond must be None, "jacobi", "ssor", "ic", or a function.')
+
+def pcg(A, b, x0=None, tol=1e-8, maxiter=None, precond='jacobi', omega=1.0):
+  """
+  Solve a symmetric positive definite system with the preconditioned conjugate gradient method.
+  Usage - [x, info] = pcg(A, b, x0, tol, maxiter, precond)
+  The matrix must be symmetric: apply temperature constraints with
+  applyBCs(..., method='symmetric') or method='reduce', not the default 'row'.
+  ---------
+    Input
+  ---------
+  A - (sparse matrix, array, or LinearOperator) SPD matrix, N x N
+  b - (list or array) right hand side, length N
+  x0 - (list or array) starting guess (warm start), e.g. the previous solution - defaults to zeros
+  tol - (float) stop when ||b - A x|| <= tol*||b||
+  maxiter - (int) maximum number of iterations - defaults to 10*N
+  precond - None, 'jacobi', 'ssor', 'ic', or a function that applies M^-1 to a residual
+            (see preconditioner).  Named preconditioners need A as a matrix
+            ('jacobi' only needs A.diagonal()).
+  omega - (float) relaxation factor for 'ssor'
+  ----------
+    Output
+  ----------
+  x - (array) solution
+  info - (dict) 'iterations' - number of iterations
+                'converged' - (bool) whether tol was reached
+                'residuals' - (list) ||r||/||b|| at the start and after each iteration
+  """
+  from numpy import asarray, zeros, sqrt, dot
+
+  b = asarray(b, dtype=float)
+  N = len(b)
+  if (maxiter == None):
+    maxiter = 10*N
+  applyM = preconditioner(A, precond, omega)
+  if (x0 is None):
+    x = zeros(N)
+    r = b.copy()
+  else:
+    x = asarray(x0, dtype=float).copy()
+    r = b - A @ x
+
+  bNorm = sqrt(dot(b, b))
+  if (bNorm == 0):
+    bNorm = 1.0
+  residuals = [sqrt(dot(r, r))/bNorm]
+  converged = residuals[-1] <= tol
+  iterations = 0
+  if (not converged):
+    z = applyM(r)
+    p = z.copy()
+    rz = dot(r, z)
+    while (iterations < maxiter):
+      Ap = A @ p
+      pAp = dot(p, Ap)
+      if (pAp <= 0):
+        raise Exception('Error in pcg: the matrix is not positive definite.')
+      alpha = rz/pAp
+      x += alpha*p
+      r -= alpha*Ap
+      iterations += 1
+      residuals.append(sqrt(dot(r, r))/bNorm)
+      if (residuals[-1] <= tol):
+        converged = True
+        break
+      z = applyM(r)
+      rzNew = dot(r, z)
+      p *= rzNew/rz
+      p += z
+      rz = rzNew
+
+  info = {'iterations': iterations, 'converged': converged, 'residuals': residuals}
+  return [x, info]
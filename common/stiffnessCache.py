@@ -0,0 +1,100 @@
+class stiffnessCache:
+  """
+  Cache of element stiffness matrices keyed by the shape of the element.
+  Usage - cache = stiffnessCache()
+          kElem = cache.stiffness(xnode, ynode, conn, D, thickness, type2D)
+          print(cache)
+
+  Uniform refinement (meshRefine) produces many congruent elements, and congruent
+  elements have identical stiffness matrices.  Each element is given a signature
+  made of its node locations relative to its first node, rounded to tol.  Only one
+  element of each signature is integrated, and the result is stored for later calls.
+  For axisymmetric elements the stiffness depends on the radius, so the absolute
+  x (radius) values are used in the signature instead.
+
+  Contains the following attributes:
+    tol - (float) length used to round signatures - defaults to 1e-9 times the size
+          of the first mesh given
+    hits - (int) elements whose matrix was found in the cache
+    misses - (int) elements that had to be integrated
+    classes - (int) number of distinct element matrices stored
+    hitRate - (float) hits / (hits + misses)
+  """
+  def __init__(self, tol=None):
+    self.tol = tol
+    self.store = {}
+    self.hits = 0
+    self.misses = 0
+
+  @property
+  def classes(self):
+    return sum([len(group) for group in self.store.values()])
+
+  @property
+  def hitRate(self):
+    if (self.hits + self.misses == 0):
+      return 0.0
+    return self.hits / (self.hits + self.misses)
+
+  def __str__(self):
+    return f"stiffnessCache with {self.classes} element classes: {self.hits} hits, {self.misses} misses (hit rate {100*self.hitRate:.1f}%)."
+
+  def clear(self):
+    self.store = {}
+    self.hits = 0
+    self.misses = 0
+
+  def stiffness(self, xnode, ynode, conn, D, thickness=None, type2D='planeStress', gaussPoints=None):
+    """
+    Element stiffness matrices for every element, computing each distinct shape once.
+    Same arguments and output as elementStiffness, but D and thickness must be the
+    same for every element.
+    """
+    from numpy import asarray, arange, concatenate, hypot, rint, unique, zeros
+    from .assemble import elementStiffness
+    from .helpers import connArray
+
+    D = asarray(D, dtype=float)
+    if (D.ndim != 2 or (thickness is not None and asarray(thickness).ndim != 0)):
+      raise Exception('Error in stiffnessCache: D and thickness must be the same for all elements.')
+
+    connArr, index = connArray(conn)
+    nElem, nNodeElem = connArr.shape
+    xElem = asarray(xnode, dtype=float)[connArr]
+    yElem = asarray(ynode, dtype=float)[connArr]
+    if (self.tol == None):
+      self.tol = 1e-9 * hypot(xElem.max() - xElem.min(), yElem.max() - yElem.min())
+
+    # Signatures: node locations relative to the first node, in units of tol
+    if (type2D == 'axisymmetric'):
+      dx = xElem
+    else:
+      dx = xElem - xElem[:, :1]
+    dy = yElem - yElem[:, :1]
+    signatures = rint(concatenate((dx, dy), axis=1) / self.tol).astype('int64')
+    [classes, first, inverse] = unique(signatures, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+
+    # Matrices are only shared between elements with the same properties
+    if (gaussPoints == None):
+      precision = None
+    else:
+      precision = (gaussPoints.geom, gaussPoints.precision)
+    group = self.store.setdefault((type2D, D.shape, D.tobytes(), None if thickness is None else float(thickness), nNodeElem, precision), {})
+
+    keys = [signature.tobytes() for signature in classes]
+    new = [i for i, key in enumerate(keys) if key not in group]
+    if (len(new) > 0):
+      # Integrate one representative of every new class in a single batch
+      rep = first[new]
+      localConn = arange(len(rep)*nNodeElem).reshape(len(rep), nNodeElem)
+      kNew = elementStiffness(xElem[rep].ravel(), yElem[rep].ravel(), localConn, D, thickness, type2D, gaussPoints)
+      for i, k in zip(new, kNew):
+        group[keys[i]] = k
+
+    kClasses = zeros((len(keys),) + group[keys[0]].shape)
+    for i, key in enumerate(keys):
+      kClasses[i] = group[key]
+    self.misses += len(new)
+    self.hits += nElem - len(new)
+    return kClasses[inverse]
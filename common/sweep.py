@@ -0,0 +1,157 @@
+from .helpers import meshInput
+
+def sweepGroup(A, free, fixed, rhs, fixedValue):
+  # Worker for parameterSweep: factor one matrix (on the free DOFs) and solve all
+  # of the cases that share it.  rhs is nDOF x nCases, fixedValue is nFixed x nCases.
+  from scipy.sparse.linalg import splu
+
+  A = A.tocsr()
+  Afree = A[free]
+  return splu(Afree[:, free].tocsc()).solve(rhs[free] - Afree[:, fixed] @ fixedValue)
+
+# ---------------------------------------------------------------------------
+
+@meshInput
+def parameterSweep(xnode, ynode, conn, bcs, k, thickness, bcValues=None, bcCoefficients=None,
+                   index=None, gaussPoints=None, workers=None):
+  """
+  Solve steady diffusion on one mesh for many combinations of the conductivity,
+  thickness, and BC values and coefficients.
+  Usage - T = parameterSweep(xnode, ynode, conn, bcs, k=[10, 20, 40], thickness=0.1,
+                             bcValues={1: [5, 10, 15]}, bcCoefficients={2: [50, 50, 100]})
+  The parameters are arrays with one entry per case (or single values, used for every
+  case).  Nothing is integrated more than once:
+   - the stiffness matrix is linear in k*thickness, so it is assembled once for k = 1
+     and thickness = 1 and only scaled
+   - the terms of each BC are linear in its value and coefficient, so they are found
+     once (with the swept value or coefficient set to 1) and scaled for every case
+  Dividing each case by k*thickness leaves a matrix that only depends on the ratios
+  of the convection coefficients to k (to k*thickness for convection on faces, which
+  is integrated over the face area rather than the edge area).  Cases with the same ratios (all cases, if no
+  convection coefficient is swept) share one factorization, and their right hand
+  sides are solved together.
+  ---------
+    Input
+  ---------
+  xnode, ynode - (lists) node locations
+  conn - (list of lists or array) connectivity of elements
+  bcs - (list) boundary conditions (BC) - type2D is "diffusion"
+  k - (float or array) thermal conductivity of each case
+  thickness - (float or array) element thickness of each case
+  bcValues - (dict) {position of the BC in bcs: array of constant values, one per case}
+             a tuple of positions as the key gives several BCs the same values
+  bcCoefficients - (dict) {position of a convection BC in bcs: array of coefficients}
+  index - (int) index of the first node - defaults to that of conn
+  gaussPoints - (quadPoints) quadrature - defaults depend on element type
+  workers - (int) number of processes used to factor and solve the groups of cases
+            that need their own factorization
+  ----------
+    Output
+  ----------
+  T - (array) nCases x nNode temperatures
+  """
+  from numpy import asarray, atleast_1d, broadcast_arrays, eye, outer, unique, zeros, where
+  from scipy.sparse import coo_matrix
+  from concurrent.futures import ProcessPoolExecutor
+  from .applyBCs import boundaryTerms, dofMap
+  from .assemble import assembleStiffness
+  from .helpers import connIndex
+
+  if (index == None):
+    index = connIndex(conn)
+  if (bcValues == None):
+    bcValues = {}
+  if (bcCoefficients == None):
+    bcCoefficients = {}
+
+  # One entry per case for every parameter
+  params = broadcast_arrays(*[atleast_1d(asarray(p, dtype=float)) for p in
+                              [k, thickness] + list(bcValues.values()) + list(bcCoefficients.values())])
+  if (params[0].ndim != 1):
+    raise Exception('Error in parameterSweep: parameters must be single values or 1D arrays.')
+  k = params[0]
+  thickness = params[1]
+  nCases = len(k)
+  nNode = len(xnode)
+
+  # Swept value and coefficient of each BC (a key can be a tuple of BCs, e.g. the
+  # pieces of one line after meshRefine, that share the parameter)
+  values = {}
+  coefficients = {}
+  sweeps = [[bcValues, values, 'value', params[2:2 + len(bcValues)]], 
+            [bcCoefficients, coefficients, 'coefficient', params[2 + len(bcValues):]]]
+  for [sweep, scales, name, sweepParams] in sweeps:
+    for key, param in zip(sweep, sweepParams):
+      for i in (key if isinstance(key, tuple) else (key,)):
+        if (i < 0 or i >= len(bcs)):
+          raise Exception('Error in parameterSweep: there is no BC number ' + str(i) + '.')
+        if (name == 'coefficient' and bcs[i].kind != 'convection'):
+          raise Exception('Error in parameterSweep: only convection BCs have a coefficient (BC number ' + str(i) + ' is ' + bcs[i].kind + ').')
+        scales[i] = param
+
+  # Unit stiffness (k = 1, thickness = 1)
+  kUnit = assembleStiffness(xnode, ynode, conn, eye(2), 1.0, 'diffusion', gaussPoints, nNode=nNode)
+
+  # Terms of each BC, with swept values and coefficients set to 1 and thickness 1
+  rhs = zeros((nNode, nCases))
+  convection = []
+  ratios = []
+  fixedDOF = []
+  fixedValue = zeros((nNode, nCases))
+  for i, bc in enumerate(bcs):
+    unitBC = bc.copy()
+    scaleV = values[i] if i in values else 1.0
+    scaleC = coefficients[i] if i in coefficients else 1.0
+    if (i in values):
+      unitBC.value = 1.0
+    if (i in coefficients):
+      unitBC.coefficient = 1.0
+    [rows, cols, vals, forces, bcDOF, bcValue] = boundaryTerms([unitBC], xnode, ynode, 1.0, 'diffusion', index)
+    # Line terms are integrated over lineLength*thickness, face terms over the area alone
+    area = thickness if bc.geom == 'line' else 1.0
+    if (bc.kind == 'convection'):
+      convection.append(coo_matrix((vals, (rows, cols)), shape=kUnit.shape).tocsr())
+      ratios.append(scaleC/k if bc.geom == 'line' else scaleC/(k*thickness))
+      rhs += outer(forces, area*scaleC*scaleV)
+    elif (bc.kind == 'flux'):
+      rhs += outer(forces, area*scaleV)
+    elif (bc.kind == 'flow'):
+      rhs += outer(forces, scaleV)
+    elif (bc.kind == 'temperature'):
+      # A node shared by two temperature BCs takes the value of the last one
+      fixedDOF.extend(bcDOF)
+      fixedValue[bcDOF] = outer(bcValue, scaleV)
+  bcMap = dofMap(nNode, fixedDOF, zeros(len(fixedDOF)))
+  free = bcMap.free
+  fixed = bcMap.fixed
+
+  # Each case is (K_1 + sum(h/k K_conv)) T = rhs/(k*thickness) (h/(k*thickness) for
+  # convection on faces) - group the cases by these ratios
+  rhs /= k*thickness
+  if (len(ratios) > 0):
+    ratios = asarray(ratios).T
+    [groupRatios, group] = unique(ratios, axis=0, return_inverse=True)
+    group = group.ravel()
+  else:
+    groupRatios = zeros((1, 0))
+    group = zeros(nCases, dtype=int)
+
+  tasks = []
+  for g, ratio in enumerate(groupRatios):
+    cases = where(group == g)[0]
+    A = kUnit.copy()
+    for r, kConv in zip(ratio, convection):
+      A = A + r*kConv
+    tasks.append([cases, [A, free, fixed, rhs[:, cases], fixedValue[fixed][:, cases]]])
+
+  T = zeros((nCases, nNode))
+  T[:, fixed] = fixedValue[fixed].T
+  if (workers == None or workers <= 1 or len(tasks) == 1):
+    for cases, args in tasks:
+      T[cases[:, None], free] = sweepGroup(*args).T
+  else:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+      futures = [[cases, pool.submit(sweepGroup, *args)] for cases, args in tasks]
+      for cases, future in futures:
+        T[cases[:, None], free] = future.result().T
+  return T
@@ -0,0 +1,223 @@
+class thetaStepper:
+  """
+  Time steps of transient diffusion, M dT/dt + K T = F, by the theta method.
+  Usage - stepper = thetaStepper(kg, mg, bcs, xnode, ynode, thickness, type2D, index, theta)
+          T = stepper.step(T, dt)
+  theta = 1 is backward Euler, theta = 1/2 is Crank-Nicolson.  The BCs (convection
+  terms, forces, and temperature constraints) are applied once.  Each step solves
+      (M + theta dt K) T_new = (M - (1 - theta) dt K) T + dt F
+  on the free DOFs.  The matrix on the left is factored the first time a step size is
+  used and kept in a least-recently-used cache of cacheSize factorizations, so steps
+  of a size that was used recently cost only two triangular solves.
+  ---------
+    Input
+  ---------
+  k - (sparse matrix or array) global stiffness (conductance) matrix, before BCs
+  m - (sparse matrix or array) global mass (capacitance) matrix, e.g. from assembleMass
+  bcs - (list) boundary conditions (BC), constant in time
+  xnode, ynode - (lists) node locations
+  thickness - (float) element thickness
+  type2D - (string) "diffusion"
+  index - (int) index of the first node
+  theta - (float) 0 to 1 - use at least 1/2 for unconditional stability
+  cacheSize - (int) number of factorizations kept (None for no limit)
+
+  Contains the following attributes:
+    bcMap - (dofMap) free and constrained DOFs
+    factors - (OrderedDict) factorizations of M + theta dt K, keyed by dt, oldest first
+    factorizations - (int) number of factorizations computed
+    cacheHits - (int) number of steps that reused a factorization
+    order - (int) order of accuracy in time: 2 for Crank-Nicolson, 1 otherwise
+    stats - (dict) 'accepted' and 'rejected' steps of size control (see doublingStep)
+  """
+  def __init__(self, k, m, bcs, xnode, ynode, thickness, type2D, index, theta=1.0, cacheSize=8):
+    from collections import OrderedDict
+    from scipy.sparse import coo_matrix, csr_matrix
+    from .applyBCs import boundaryTerms, dofMap
+
+    if (theta < 0 or theta > 1):
+      raise Exception('Error in thetaStepper: theta must be between 0 and 1.')
+    self.theta = theta
+    [rows, cols, vals, forces, fixedDOF, fixedValue] = boundaryTerms(bcs, xnode, ynode, thickness, type2D, index)
+    kbc = csr_matrix(k) + coo_matrix((vals, (rows, cols)), shape=k.shape).tocsr()
+    m = csr_matrix(m)
+    self.bcMap = dofMap(k.shape[0], fixedDOF, fixedValue)
+    free = self.bcMap.free
+    fixed = self.bcMap.fixed
+
+    self.kff = kbc[free][:, free].tocsc()
+    self.mff = m[free][:, free].tocsc()
+    # Constant load on the free DOFs, including the constrained temperatures
+    # (their time derivative is zero, so M_fc does not appear)
+    self.load = forces[free] - kbc[free][:, fixed] @ self.bcMap.fixedValue
+    self.cacheSize = cacheSize
+    self.factors = OrderedDict()
+    self.factorizations = 0
+    self.cacheHits = 0
+    self.order = 2 if theta == 0.5 else 1
+    self.stats = {'accepted': 0, 'rejected': 0}
+
+  def factor(self, dt):
+    """
+    Factorization of M + theta dt K (on the free DOFs) for a step size, from the cache if possible.
+    Returns a function that solves with it.
+    """
+    from scipy.sparse.linalg import splu
+
+    # Step sizes that differ only by round-off share a factorization
+    key = float('%.12g' % dt)
+    if (key in self.factors):
+      self.factors.move_to_end(key)
+      self.cacheHits += 1
+    else:
+      self.factors[key] = splu((self.mff + self.theta*dt*self.kff).tocsc()).solve
+      self.factorizations += 1
+      if (self.cacheSize != None and len(self.factors) > self.cacheSize):
+        self.factors.popitem(last=False)
+    return self.factors[key]
+
+  def initial(self, T0):
+    """
+    Full initial temperature vector, with the constrained temperatures imposed.
+    T0 - (float or array) initial temperature of every node
+    """
+    from numpy import full, asarray
+
+    T = full(self.bcMap.nDOF, 0.0)
+    T[:] = asarray(T0, dtype=float)
+    T[self.bcMap.fixed] = self.bcMap.fixedValue
+    return T
+
+  def step(self, T, dt):
+    """
+    Advance the full temperature vector T by one step of size dt.
+    """
+    free = self.bcMap.free
+    Tfree = T[free]
+    rhs = self.mff @ Tfree + dt*(self.load - (1 - self.theta)*(self.kff @ Tfree))
+    return self.bcMap.expand(self.factor(dt)(rhs))
+
+  def doublingStep(self, T, dt, rtol=1e-3, atol=1e-6):
+    """
+    Advance T by dt, with the error estimated by step doubling.
+    Usage - [Tnew, err] = stepper.doublingStep(T, dt, rtol, atol)
+    The step is taken once with dt and again as two steps of dt/2, and
+        err = max |T_half - T_full| / (atol + rtol*|T_half|) / (2^order - 1)
+    Tnew is the more accurate T_half.  The step is counted in stats as accepted
+    if err <= 1 and as rejected otherwise.
+    """
+    from numpy import abs as npabs
+
+    Tfull = self.step(T, dt)
+    Thalf = self.step(self.step(T, dt/2), dt/2)
+    err = (npabs(Thalf - Tfull) / (atol + rtol*npabs(Thalf))).max() / (2**self.order - 1)
+    if (err > 1):
+      self.stats['rejected'] += 1
+    else:
+      self.stats['accepted'] += 1
+    return [Thalf, err]
+
+# ---------------------------------------------------------------------------
+
+def thetaMethod(k, m, bcs, xnode, ynode, thickness, type2D, index, T0, dt, nSteps,
+                theta=1.0, outputEvery=1):
+  """
+  Integrate transient diffusion in time, yielding snapshots as it goes.
+  Usage - for [t, T] in thetaMethod(kg, mg, bcs, xnode, ynode, thickness, type2D, index, T0, dt, nSteps):
+            ...
+  Only the current temperatures are held in memory - keep the snapshots you need.
+  M + theta dt K is factored once for the whole run (see thetaStepper).
+  ---------
+    Input
+  ---------
+  k - (sparse matrix or array) global stiffness (conductance) matrix, before BCs
+  m - (sparse matrix or array) global mass (capacitance) matrix, e.g. from assembleMass
+  bcs - (list) boundary conditions (BC), constant in time
+  xnode, ynode - (lists) node locations
+  thickness - (float) element thickness
+  type2D - (string) "diffusion"
+  index - (int) index of the first node
+  T0 - (float or array) initial temperatures
+  dt - (float) time step
+  nSteps - (int) number of time steps
+  theta - (float) 1 for backward Euler, 1/2 for Crank-Nicolson
+  outputEvery - (int) yield a snapshot every outputEvery steps (and after the last step)
+  ----------
+    Output
+  ----------
+  yields [t, T] - (float, array) time and temperature of every node, starting with t = 0
+  """
+  stepper = thetaStepper(k, m, bcs, xnode, ynode, thickness, type2D, index, theta)
+  T = stepper.initial(T0)
+  yield [0.0, T.copy()]
+  for n in range(1, nSteps + 1):
+    T = stepper.step(T, dt)
+    if (n % outputEvery == 0 or n == nSteps):
+      yield [n*dt, T.copy()]
+
+# ---------------------------------------------------------------------------
+
+def adaptiveThetaMethod(k, m, bcs, xnode, ynode, thickness, type2D, index, T0, tEnd, dt0,
+                        theta=1.0, rtol=1e-3, atol=1e-6, dtMin=None, dtMax=None, 
+                        outputEvery=1, cacheSize=8, stepper=None):
+  """
+  Integrate transient diffusion with step sizes chosen to control the error.
+  Usage - for [t, T] in adaptiveThetaMethod(kg, mg, bcs, xnode, ynode, thickness, type2D, index, T0, tEnd, dt0):
+            ...
+  Each step is taken once with dt and again as two steps of dt/2 (step doubling).
+  The difference between the two estimates the error of the step:
+      err = max |T_half - T_full| / (atol + rtol*|T_half|) / (2^p - 1)
+  with p = 2 for Crank-Nicolson and 1 otherwise.  If err <= 1 the step is kept
+  (with the more accurate T_half), otherwise it is repeated with dt/2.  After a step
+  with a small error (err < 2^-(p+1)) dt is doubled.  The step sizes therefore stay on
+  the ladder dt0 * 2^n, so the factorizations of M + theta dt K in the stepper's
+  LRU cache are reused instead of refactoring at every change of dt.
+  ---------
+    Input
+  ---------
+  k, m, bcs, xnode, ynode, thickness, type2D, index, theta - as for thetaMethod
+  T0 - (float or array) initial temperatures
+  tEnd - (float) final time
+  dt0 - (float) first step size
+  rtol, atol - (floats) relative and absolute error tolerance per step
+  dtMin, dtMax - (floats) limits on the step size - default to dt0/2^20 and tEnd
+  outputEvery - (int) yield a snapshot every outputEvery accepted steps (and at tEnd)
+  cacheSize - (int) number of factorizations kept by the stepper
+  stepper - (thetaStepper) use (and keep the statistics in) an existing stepper
+  ----------
+    Output
+  ----------
+  yields [t, T] - (float, array) time and temperature of every node, starting with t = 0
+  The stepper's stats dict counts 'accepted' and 'rejected' steps, and its
+  factorizations and cacheHits attributes count the factorization reuse (all of
+  them add up over the runs that share a stepper).
+  """
+  if (stepper == None):
+    stepper = thetaStepper(k, m, bcs, xnode, ynode, thickness, type2D, index, theta, cacheSize)
+  if (dtMin == None):
+    dtMin = dt0/2**20
+  if (dtMax == None):
+    dtMax = tEnd
+  p = stepper.order
+
+  T = stepper.initial(T0)
+  t = 0.0
+  dt = dt0
+  accepted = 0
+  yield [t, T.copy()]
+  while (t < tEnd*(1 - 1e-12)):
+    # The last step is shortened to end at tEnd
+    dtStep = min(dt, tEnd - t)
+    [Tnew, err] = stepper.doublingStep(T, dtStep, rtol, atol)
+    if (err > 1):
+      dt = dtStep/2
+      if (dt < dtMin):
+        raise Exception('Error in adaptiveThetaMethod: step size fell below dtMin at t = ' + str(t))
+      continue
+    t += dtStep
+    T = Tnew
+    accepted += 1
+    if (accepted % outputEvery == 0 or t >= tEnd*(1 - 1e-12)):
+      yield [t, T.copy()]
+    if (err < 2.0**-(p + 1) and 2*dt <= dtMax):
+      dt = 2*dt
@@ -7,7 +7,7 @@ setup(
     description='Simple Finite Element Solver',
     url='https://github.com/robertbrown2/FiniteElement',
     python_requires='>=3.8',
-    install_requires=['numpy'],
+    install_requires=['numpy', 'scipy'],
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License'
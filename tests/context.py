@@ -0,0 +1,62 @@
+# Shared setup for the tests: import the package (whatever its folder is called,
+# e.g. FiniteElement when cloned) and build small meshes.
+import importlib
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if (os.path.dirname(root) not in sys.path):
+  sys.path.insert(0, os.path.dirname(root))
+FiniteElement = importlib.import_module(os.path.basename(root))
+FE = FiniteElement.common
+LST = FiniteElement.LST
+CST = FiniteElement.CST
+Q4 = FiniteElement.Q4
+
+def squareMesh(flux=True):
+  # Unit square of four CST elements, with a temperature on the left side and
+  # a flux (or convection) on the right side
+  xnode = [0, 1, 1, 0, 0.5]
+  ynode = [0, 0, 1, 1, 0.5]
+  conn = [[1, 2, 5], [2, 3, 5], [3, 4, 5], [4, 1, 5]]
+  bcs = [FE.BC(geom='line', nodes=[1, 4], kind='temperature', value=0)]
+  if (flux):
+    bcs.append(FE.BC(geom='line', nodes=[3, 2], kind='flux', value=10.))
+  else:
+    bcs.append(FE.BC(geom='line', nodes=[3, 2], kind='convection', value=20., coefficient=5.))
+  return [xnode, ynode, conn, bcs]
+
+def refinedMesh(nRefine=2, flux=True, lst=True):
+  # squareMesh refined nRefine times, and converted to LST elements
+  [xnode, ynode, conn, bcs] = squareMesh(flux)
+  c2l = []
+  l2n = []
+  for i in range(nRefine):
+    [xnode, ynode, conn, bcs, c2l, l2n] = FE.meshRefine(xnode, ynode, conn, bcs, c2l, l2n)
+  if (lst):
+    [xnode, ynode, conn, l2n, bcs] = LST.LST_mesh(xnode, ynode, conn, c2l, l2n, bcs)
+  return [xnode, ynode, conn, bcs]
+
+def gridMesh(n):
+  # n x n squares on the unit square, each split into two CST elements (1-indexed lists)
+  xnode = []
+  ynode = []
+  for j in range(n + 1):
+    for i in range(n + 1):
+      xnode.append(i/n)
+      ynode.append(j/n)
+  node = lambda i, j: j*(n + 1) + i + 1
+  conn = []
+  for j in range(n):
+    for i in range(n):
+      conn.append([node(i, j), node(i + 1, j), node(i + 1, j + 1)])
+      conn.append([node(i, j), node(i + 1, j + 1), node(i, j + 1)])
+  return [xnode, ynode, conn, node]
+
+def diffusionSystem(nRefine=2, method='symmetric', flux=False, k=3., thickness=0.1):
+  # Sparse diffusion system on refinedMesh, with the BCs applied by applyBCsSparse
+  [xnode, ynode, conn, bcs] = refinedMesh(nRefine, flux)
+  D = FE.constMatrix(k=k, type2D='diffusion')
+  kg = FE.assembleStiffness(xnode, ynode, conn, D, thickness, 'diffusion')
+  system = FE.applyBCsSparse(kg, bcs, xnode, ynode, thickness, 'diffusion', FE.connIndex(conn), method)
+  return [xnode, ynode, conn, bcs, kg] + list(system)
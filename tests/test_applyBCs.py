@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+from context import FE, LST, refinedMesh
+
+def diffusionStiffness(xnode, ynode, conn, k, thickness):
+  D = FE.constMatrix(k=k, type2D='diffusion')
+  kElem = LST.LST_stiffnessBatch(xnode, ynode, conn, D, thickness, 'diffusion')
+  return FE.assemble(kElem, conn, len(xnode))
+
+class testApplyBCs(unittest.TestCase):
+  def setUp(self):
+    [self.xnode, self.ynode, self.conn, self.bcs] = refinedMesh(2, flux=False)
+    self.bcs.append(FE.BC(geom='face', nodes=self.conn[0], kind='flux', value=3.))
+    self.kg = diffusionStiffness(self.xnode, self.ynode, self.conn, 3., 0.1)
+    self.index = FE.connIndex(self.conn)
+
+  def applyBoth(self, method):
+    args = [self.bcs, self.xnode, self.ynode, 0.1, 'diffusion', self.index, method]
+    dense = FE.applyBCs(self.kg.toarray(), *args)
+    sparse = FE.applyBCsSparse(self.kg, *args)
+    return [dense, sparse]
+
+  def testSparseMatchesDense(self):
+    for method in ['row', 'symmetric', 'reduce']:
+      [dense, sparse] = self.applyBoth(method)
+      np.testing.assert_allclose(sparse[0].toarray(), dense[0], rtol=1e-12, atol=1e-12)
+      np.testing.assert_allclose(np.asarray(sparse[1]), np.asarray(dense[1]), rtol=1e-12, atol=1e-12)
+
+  def testMethodsSameSolution(self):
+    [kbc, forces] = self.applyBoth('row')[0]
+    T = np.linalg.solve(kbc, forces)
+    [kbc, forces] = self.applyBoth('symmetric')[0]
+    np.testing.assert_allclose(kbc, kbc.T, atol=1e-12)
+    np.testing.assert_allclose(np.linalg.solve(kbc, forces), T, rtol=1e-10, atol=1e-10)
+    [kff, forces, bcMap] = self.applyBoth('reduce')[0]
+    np.testing.assert_allclose(bcMap.expand(np.linalg.solve(kff, forces)), T, rtol=1e-10, atol=1e-10)
+
+  def testUniformFlux(self):
+    # Temperature 0 on the left and flux q on the right: T = q*x/k, exact for LST
+    [xnode, ynode, conn, bcs] = refinedMesh(1)
+    kg = diffusionStiffness(xnode, ynode, conn, 3., 0.1)
+    [kbc, forces] = FE.applyBCsSparse(kg, bcs, xnode, ynode, 0.1, 'diffusion', FE.connIndex(conn))
+    T = np.linalg.solve(kbc.toarray(), forces)
+    np.testing.assert_allclose(T, 10*np.asarray(xnode)/3., atol=1e-10)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+from context import FE, LST, refinedMesh
+
+class testAssembly(unittest.TestCase):
+  def setUp(self):
+    [self.xnode, self.ynode, self.conn, bcs] = refinedMesh(2)
+    self.D = FE.constMatrix(E=200., nu=0.3, type2D='planeStress')
+    self.kElem = LST.LST_stiffnessBatch(self.xnode, self.ynode, self.conn, self.D, 0.1, 'planeStress')
+
+  def testAssemble(self):
+    # Sparse assembly matches adding the element matrices into a dense matrix
+    nNode = len(self.xnode)
+    kg = FE.assemble(self.kElem, self.conn, nNode, 2)
+    kDense = np.zeros((2*nNode, 2*nNode))
+    for elem, k in zip(self.conn, self.kElem):
+      dofs = [2*(node - 1) + i for node in elem for i in range(2)]
+      kDense[np.ix_(dofs, dofs)] += k
+    np.testing.assert_allclose(kg.toarray(), kDense, rtol=1e-12, atol=1e-12*abs(kDense).max())
+
+  def testAssemblyPlan(self):
+    nNode = len(self.xnode)
+    kg = FE.assemble(self.kElem, self.conn, nNode, 2)
+    plan = FE.assemblyPlan(self.conn, 2, nNode)
+    kPlan = plan.assemble(self.kElem)
+    self.assertEqual(kPlan.shape, kg.shape)
+    self.assertEqual(kPlan.nnz, plan.nnz)
+    np.testing.assert_allclose(kPlan.toarray(), kg.toarray(), rtol=1e-12, atol=1e-12*abs(self.kElem).max())
+    # Reusing the plan gives the same matrix, and copy=False shares the plan's data
+    np.testing.assert_array_equal(plan.assemble(self.kElem).toarray(), kPlan.toarray())
+    shared = plan.assemble(2*self.kElem, copy=False)
+    self.assertTrue(np.shares_memory(shared.data, plan.data))
+    np.testing.assert_array_equal(shared.toarray(), 2*kPlan.toarray())
+
+  def testAssembleStiffness(self):
+    kg = FE.assemble(self.kElem, self.conn, len(self.xnode), 2)
+    kStiff = FE.assembleStiffness(self.xnode, self.ynode, self.conn, self.D, 0.1, 'planeStress')
+    np.testing.assert_array_equal(kStiff.toarray(), kg.toarray())
+    plan = FE.assemblyPlan(self.conn, 2, len(self.xnode))
+    kPlan = FE.assembleStiffness(self.xnode, self.ynode, self.conn, self.D, 0.1, 'planeStress', plan=plan)
+    np.testing.assert_array_equal(kPlan.toarray(), plan.assemble(self.kElem).toarray())
+
+  def testWorkers(self):
+    # Parallel integration is bit-identical to the serial assembly
+    serial = FE.assembleStiffness(self.xnode, self.ynode, self.conn, self.D, 0.1, 'planeStress')
+    parallel = FE.assembleStiffness(self.xnode, self.ynode, self.conn, self.D, 0.1, 'planeStress',
+                                    workers=2, chunkSize=5)
+    np.testing.assert_array_equal(serial.indptr, parallel.indptr)
+    np.testing.assert_array_equal(serial.indices, parallel.indices)
+    np.testing.assert_array_equal(serial.data, parallel.data)
+    # Per-element thickness is split with the chunks
+    thickness = np.linspace(0.1, 0.2, len(self.conn))
+    serial = FE.assembleStiffness(self.xnode, self.ynode, self.conn, self.D, thickness, 'planeStress')
+    parallel = FE.assembleStiffness(self.xnode, self.ynode, self.conn, self.D, thickness, 'planeStress',
+                                    workers=2, chunkSize=7)
+    np.testing.assert_array_equal(serial.data, parallel.data)
+
+if __name__ == '__main__':
+  unittest.main()
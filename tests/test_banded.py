@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+from scipy.sparse import coo_matrix
+from scipy.sparse.linalg import spsolve
+from context import FE, diffusionSystem
+
+class testBanded(unittest.TestCase):
+  def setUp(self):
+    [xnode, ynode, conn, bcs, kg, kbc, forces] = diffusionSystem(2)
+    # Renumber so the band is narrow, and permute the system to match
+    numbering = FE.renumberNodes(xnode, ynode, conn, bcs)[5]
+    self.A = kbc[numbering.perm][:, numbering.perm].tocsr()
+    self.b = np.asarray(forces)[numbering.perm]
+
+  def testSolve(self):
+    kFactor = FE.bandedCholesky(self.A)
+    x = kFactor.solve(self.b)
+    np.testing.assert_allclose(x, spsolve(self.A.tocsc(), self.b), rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(x, cho_solve(cho_factor(self.A.toarray()), self.b), rtol=1e-10, atol=1e-12)
+    # Several right hand sides at once
+    B = np.stack([self.b, 2*self.b + 1], axis=1)
+    np.testing.assert_allclose(kFactor.solve(B), spsolve(self.A.tocsc(), B), rtol=1e-10, atol=1e-12)
+
+  def testStats(self):
+    stats = FE.bandStats(self.A)
+    self.assertEqual(FE.bandedCholesky(self.A).stats, stats)
+    dense = self.A.toarray()
+    [rows, cols] = np.nonzero(np.tril(dense))
+    N = dense.shape[0]
+    bandwidth = int((rows - cols).max())
+    first = [np.flatnonzero(row)[0] for row in dense]
+    self.assertEqual(stats['N'], N)
+    self.assertEqual(stats['nnz'], len(rows))
+    self.assertEqual(stats['bandwidth'], bandwidth)
+    self.assertEqual(stats['profile'], int(sum([i - first[i] + 1 for i in range(N)])))
+    self.assertEqual(stats['bandStorage'], N*(bandwidth + 1))
+    self.assertEqual(stats['fill'], N*(bandwidth + 1) - bandwidth*(bandwidth + 1)//2 - len(rows))
+    self.assertEqual(FE.bandStats(dense), stats)
+
+  def testDuplicates(self):
+    # Every entry given twice, as halves, in an un-summed COO matrix
+    A = coo_matrix(self.A)
+    twice = coo_matrix((np.concatenate([A.data, A.data])/2, (np.concatenate([A.row, A.row]), 
+                        np.concatenate([A.col, A.col]))), shape=A.shape)
+    np.testing.assert_allclose(FE.bandedCholesky(twice).solve(self.b), FE.bandedCholesky(self.A).solve(self.b), rtol=1e-12)
+    self.assertEqual(FE.bandStats(twice), FE.bandStats(self.A))
+
+  def testNotPositiveDefinite(self):
+    with self.assertRaises(Exception):
+      FE.bandedCholesky(-self.A)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+from scipy.sparse.linalg import spsolve
+from context import FE, refinedMesh
+
+class testLoadCaseSolver(unittest.TestCase):
+  def setUp(self):
+    [self.xnode, self.ynode, self.conn, bcs] = refinedMesh(2, flux=False)
+    D = FE.constMatrix(k=3., type2D='diffusion')
+    self.kg = FE.assembleStiffness(self.xnode, self.ynode, self.conn, D, 0.1, 'diffusion')
+    self.index = FE.connIndex(self.conn)
+    # Cases with other temperatures, ambient temperatures, and an added flow
+    self.cases = []
+    for [T0, Tinf, flow] in [[0., 20., 0.], [5., 20., 0.], [-2., 50., 3.]]:
+      case = [bc.copy() for bc in bcs]
+      for bc in case:
+        bc.value = T0 if bc.kind == 'temperature' else Tinf
+      if (flow != 0):
+        case.append(FE.BC(geom='face', nodes=self.conn[3], kind='flow', value=flow))
+      self.cases.append(case)
+
+  def separate(self, sparse):
+    # Each case on its own, with applyBCs and a direct solve
+    T = []
+    for bcs in self.cases:
+      if (sparse):
+        [kbc, forces] = FE.applyBCsSparse(self.kg, bcs, self.xnode, self.ynode, 0.1, 'diffusion', self.index)
+        T.append(spsolve(kbc.tocsc(), forces))
+      else:
+        [kbc, forces] = FE.applyBCs(self.kg.toarray(), bcs, self.xnode, self.ynode, 0.1, 'diffusion', self.index)
+        T.append(np.linalg.solve(kbc, forces))
+    return np.stack(T, axis=1)
+
+  def testCases(self):
+    for kg in [self.kg, self.kg.toarray()]:
+      sparse = not isinstance(kg, np.ndarray)
+      expected = self.separate(sparse)
+      solver = FE.loadCaseSolver(kg, self.cases[0], self.xnode, self.ynode, 0.1, 'diffusion', self.index)
+      T = solver.solveCases(self.cases)
+      self.assertEqual(T.shape, expected.shape)
+      np.testing.assert_allclose(T, expected, rtol=1e-10, atol=1e-10)
+      # The same cases stacked by hand
+      terms = [solver.caseTerms(bcs) for bcs in self.cases]
+      forces = np.stack([term[0] for term in terms], axis=1)
+      fixedValue = np.stack([term[1] for term in terms], axis=1)
+      np.testing.assert_allclose(solver.solve(forces, fixedValue), expected, rtol=1e-10, atol=1e-10)
+      # One case, with the temperatures of the bcs the solver was made with
+      np.testing.assert_allclose(solver.solve(terms[0][0]), expected[:, 0], rtol=1e-10, atol=1e-10)
+
+  def testChangedMatrix(self):
+    solver = FE.loadCaseSolver(self.kg, self.cases[0], self.xnode, self.ynode, 0.1, 'diffusion', self.index)
+    case = [bc.copy() for bc in self.cases[0]]
+    for bc in case:
+      if (bc.kind == 'convection'):
+        bc.coefficient = 2*bc.coefficient
+    with self.assertRaises(Exception):
+      solver.solveCases([case])
+    with self.assertRaises(Exception):
+      solver.solveCases([[bc for bc in self.cases[0] if bc.kind != 'temperature']])
+
+if __name__ == '__main__':
+  unittest.main()
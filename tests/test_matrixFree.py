@@ -0,0 +1,39 @@
+import unittest
+import numpy as np
+from context import FE, refinedMesh
+
+class testStiffnessOperator(unittest.TestCase):
+  def setUp(self):
+    [self.xnode, self.ynode, self.conn, self.bcs] = refinedMesh(2, flux=False)
+    self.u = np.random.default_rng(3).standard_normal(2*len(self.xnode))
+
+  def testProduct(self):
+    D = FE.constMatrix(E=200., nu=0.3, type2D='planeStress')
+    for thickness in [0.1, np.linspace(0.1, 0.2, len(self.conn))]:
+      kg = FE.assembleStiffness(self.xnode, self.ynode, self.conn, D, thickness, 'planeStress')
+      for cacheElements in [True, False]:
+        K = FE.stiffnessOperator(self.xnode, self.ynode, self.conn, D, thickness, 'planeStress',
+                                 cacheElements=cacheElements, chunkSize=7)
+        self.assertEqual(K.kElem is None, not cacheElements)
+        np.testing.assert_allclose(K @ self.u, kg @ self.u, rtol=1e-12, atol=1e-12*abs(kg @ self.u).max())
+        np.testing.assert_allclose(K.diagonal(), kg.diagonal(), rtol=1e-12)
+
+  def testApplyBCs(self):
+    # Same system as applyBCs(..., method='symmetric'), column by column
+    D = FE.constMatrix(k=3., type2D='diffusion')
+    kg = FE.assembleStiffness(self.xnode, self.ynode, self.conn, D, 0.1, 'diffusion')
+    index = FE.connIndex(self.conn)
+    [kbc, forces] = FE.applyBCs(kg.toarray(), self.bcs, self.xnode, self.ynode, 0.1, 'diffusion', index, 'symmetric')
+    for cacheElements in [True, False]:
+      K = FE.stiffnessOperator(self.xnode, self.ynode, self.conn, D, 0.1, 'diffusion', cacheElements=cacheElements)
+      [Kbc, forcesOp] = K.applyBCs(self.bcs)
+      np.testing.assert_allclose(Kbc @ np.eye(K.shape[0]), kbc, rtol=1e-12, atol=1e-12)
+      np.testing.assert_allclose(forcesOp, forces, rtol=1e-12, atol=1e-12)
+      np.testing.assert_allclose(Kbc.diagonal(), kbc.diagonal(), rtol=1e-12)
+      # The operator without BCs is unchanged
+      np.testing.assert_allclose(K @ np.ones(K.shape[0]), kg @ np.ones(K.shape[0]), atol=1e-12)
+      [T, info] = FE.pcg(Kbc, forcesOp, tol=1e-12)
+      np.testing.assert_allclose(T, np.linalg.solve(kbc, forces), rtol=1e-9, atol=1e-9)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+from context import FE, LST, squareMesh, refinedMesh
+
+class testMesh(unittest.TestCase):
+  def setUp(self):
+    [self.xnode, self.ynode, self.conn, self.bcs] = squareMesh()
+    self.mesh = FE.Mesh(self.xnode, self.ynode, self.conn, self.bcs)
+
+  def testLists(self):
+    # Zero-indexed inside, back to the index of the lists on the way out
+    self.assertEqual(self.mesh.conn.min(), 0)
+    self.assertEqual(self.mesh.bcs[0].nodes, [0, 3])
+    [xnode, ynode, conn, bcs] = self.mesh.lists()
+    self.assertEqual([xnode, ynode, conn], [self.xnode, self.ynode, self.conn])
+    self.assertEqual([bc.nodes for bc in bcs], [bc.nodes for bc in self.bcs])
+
+  def testDerivedData(self):
+    np.testing.assert_allclose(self.mesh.areas, 0.25)
+    self.assertEqual(len(self.mesh.line2node), 8)
+    self.assertEqual(len(self.mesh.boundaryEdges), 4)
+    self.assertEqual(self.mesh.adjacency.shape, (5, 5))
+    with self.assertRaises(ValueError):
+      self.mesh.xnode[0] = 1
+    # Assigning new node locations clears the areas
+    self.mesh.xnode = 2*self.mesh.xnode
+    np.testing.assert_allclose(self.mesh.areas, 0.5)
+
+  def testMeshInput(self):
+    # Functions that take xnode, ynode, conn also take a Mesh
+    [xnode, ynode, conn, bcs] = refinedMesh(1)
+    D = FE.constMatrix(k=3., type2D='diffusion')
+    kLists = FE.assembleStiffness(xnode, ynode, conn, D, 0.1, 'diffusion')
+    kMesh = FE.assembleStiffness(FE.Mesh(xnode, ynode, conn, bcs), D, 0.1, 'diffusion')
+    np.testing.assert_array_equal(kMesh.toarray(), kLists.toarray())
+
+  def testApplyBCs(self):
+    # applyBCs and applyBCsSparse take the BCs and nodes from a Mesh, numbered from 0
+    [xnode, ynode, conn, bcs] = refinedMesh(1, flux=False)
+    mesh = FE.Mesh(xnode, ynode, conn, bcs)
+    D = FE.constMatrix(k=3., type2D='diffusion')
+    kg = FE.assembleStiffness(mesh, D, 0.1, 'diffusion')
+    for method in ['row', 'symmetric']:
+      [kLists, fLists] = FE.applyBCsSparse(kg, bcs, xnode, ynode, 0.1, 'diffusion', 1, method=method)
+      for [kbc, forces] in [FE.applyBCsSparse(kg, mesh, 0.1, 'diffusion', method=method),
+                            FE.applyBCsSparse(kg, mesh, thickness=0.1, type2D='diffusion', method=method),
+                            FE.applyBCs(kg.toarray(), mesh, 0.1, 'diffusion', method)]:
+        np.testing.assert_array_equal(kbc.toarray() if hasattr(kbc, 'toarray') else kbc, kLists.toarray())
+        np.testing.assert_array_equal(forces, fLists)
+    [kff, forces, bcMap] = FE.applyBCsSparse(kg, mesh, 0.1, 'diffusion', method='reduce')
+    [kLists, fLists, mapLists] = FE.applyBCsSparse(kg, bcs, xnode, ynode, 0.1, 'diffusion', 1, method='reduce')
+    np.testing.assert_array_equal(bcMap.fixed, mapLists.fixed)
+    np.testing.assert_array_equal(kff.toarray(), kLists.toarray())
+
+  def testPlotInput(self):
+    # The plot functions get the lists back, numbered as the mesh was made from
+    plotMeshInput = FE.helpers.plotMeshInput
+    connFirst = plotMeshInput(lambda conn, xnode, ynode, u=None: [conn, xnode, ynode, u])
+    nodesFirst = plotMeshInput(lambda xList, yList, conn, u: [conn, xList, yList, u])
+    expected = [self.conn, self.xnode, self.ynode, 'u']
+    self.assertEqual(connFirst(self.mesh, 'u'), expected)
+    self.assertEqual(nodesFirst(self.mesh, 'u'), expected)
+    # Lists are passed through unchanged
+    self.assertEqual(connFirst(self.conn, self.xnode, self.ynode, 'u'), expected)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import numpy as np
+from numpy.polynomial import polynomial
+from context import FE, LST, squareMesh
+
+def sampleMesh():
+  # squareMesh with BCs of every geometry, in both directions along the mesh lines
+  # ([1, 4] and [3, 2] run against them, [3, 4] with them), a polynomial value,
+  # and a flow (which is split between the children)
+  [xnode, ynode, conn, bcs] = squareMesh(flux=False)
+  bcs[1].value = polynomial.Polynomial([20., 5., -3.])
+  bcs.append(FE.BC(geom='point', nodes=[5], kind='flow', value=2.))
+  bcs.append(FE.BC(geom='line', nodes=[3, 4], kind='flux', value=4.))
+  bcs.append(FE.BC(geom='face', nodes=[2, 3, 5], kind='flow', value=8.))
+  return [xnode, ynode, conn, bcs]
+
+class testMeshRefine(unittest.TestCase):
+  def assertSameBCs(self, bcs1, bcs2):
+    self.assertEqual(len(bcs1), len(bcs2))
+    for bc1, bc2 in zip(bcs1, bcs2):
+      self.assertEqual([bc1.geom, bc1.kind, list(bc1.nodes)], [bc2.geom, bc2.kind, list(bc2.nodes)])
+      for name in ['value', 'coefficient']:
+        if (bc1.VarType(name) == 'poly'):
+          np.testing.assert_allclose(getattr(bc1, name).coef, getattr(bc2, name).coef, rtol=1e-12)
+        else:
+          self.assertEqual(getattr(bc1, name), getattr(bc2, name))
+
+  def assertSameMesh(self, mesh1, mesh2):
+    # [xnode, ynode, conn, bcs, conn2line, line2node, (P)] from lists or arrays
+    for i in [0, 1, 2, 4, 5]:
+      np.testing.assert_array_equal(np.asarray(mesh1[i]), np.asarray(mesh2[i]))
+    self.assertSameBCs(mesh1[3], mesh2[3])
+    if (len(mesh1) > 6):
+      np.testing.assert_array_equal(mesh1[6].toarray(), mesh2[6].toarray())
+
+  def refineLists(self, nRefine, prolongation=False):
+    [xnode, ynode, conn, bcs] = sampleMesh()
+    refined = [xnode, ynode, conn, bcs, [], []]
+    for i in range(nRefine):
+      refined = FE.meshRefine(*refined[:6], prolongation=prolongation)
+    return refined
+
+  def testBCs(self):
+    # The children of each BC cover it in order, from its first node to its last
+    [xnode, ynode, conn, bcs] = sampleMesh()
+    nRefine = 2
+    [xnew, ynew, connNew, bcsNew, c2l, l2n] = self.refineLists(nRefine)
+    cells = [sorted(elem) for elem in connNew]
+    position = 0
+    for bc in bcs:
+      if (bc.geom == 'point'):
+        children = bcsNew[position:position + 1]
+        self.assertEqual(children[0].nodes, bc.nodes)
+      elif (bc.geom == 'line'):
+        children = bcsNew[position:position + 2**nRefine]
+        [x0, y0, x1, y1] = [xnode[bc.nodes[0] - 1], ynode[bc.nodes[0] - 1], xnode[bc.nodes[1] - 1], ynode[bc.nodes[1] - 1]]
+        for j, child in enumerate(children):
+          s = [j/len(children), (j + 1)/len(children)]
+          for node, sNode in zip(child.nodes, s):
+            self.assertAlmostEqual(xnew[node - 1], x0 + sNode*(x1 - x0))
+            self.assertAlmostEqual(ynew[node - 1], y0 + sNode*(y1 - y0))
+          if (bc.VarType('value') == 'poly'):
+            np.testing.assert_allclose(child.value([0, 1]), bc.value(s), rtol=1e-12)
+          else:
+            self.assertEqual(child.value, bc.value)
+      else:
+        children = bcsNew[position:position + 4**nRefine]
+        for child in children:
+          self.assertIn(sorted(child.nodes), cells)
+        self.assertAlmostEqual(sum([child.value for child in children]), bc.value)
+      self.assertTrue(all([child.kind == bc.kind for child in children]))
+      position += len(children)
+    self.assertEqual(position, len(bcsNew))
+
+  def testListsAndArrays(self):
+    [xnode, ynode, conn, bcs] = sampleMesh()
+    lists = [xnode, ynode, conn, bcs, [], []]
+    arrays = [np.array(xnode), np.array(ynode), np.array(conn), bcs, [], []]
+    for i in range(3):
+      lists = FE.meshRefine(*lists, prolongation=True)
+      arrays = FE.meshRefine(*arrays, prolongation=True)
+      self.assertIsInstance(arrays[2], np.ndarray)
+      self.assertSameMesh(lists, arrays)
+      lists = lists[:6]
+      arrays = arrays[:6]
+
+  def testLSTListsAndArrays(self):
+    [xnode, ynode, conn, bcs, conn2line, line2node] = self.refineLists(2)
+    lists = LST.LST_mesh(xnode, ynode, conn, conn2line, line2node, bcs)
+    arrays = LST.LST_mesh(np.array(xnode), np.array(ynode), np.array(conn), 
+                          np.array(conn2line), np.array(line2node), bcs)
+    for i in [0, 1, 2, 3]:
+      np.testing.assert_array_equal(np.asarray(lists[i]), np.asarray(arrays[i]))
+    self.assertSameBCs(lists[4], arrays[4])
+
+  def testLevels(self):
+    [xnode, ynode, conn, bcs] = sampleMesh()
+    for levels in [1, 2, 3]:
+      steps = self.refineLists(levels)
+      once = FE.meshRefine(xnode, ynode, conn, bcs, levels=levels)
+      self.assertSameMesh(steps, once)
+      # The prolongation of one call is the product of those of each level
+      P = None
+      refined = [xnode, ynode, conn, bcs, [], []]
+      for i in range(levels):
+        refined = FE.meshRefine(*refined[:6], prolongation=True)
+        P = refined[6] if P is None else refined[6] @ P
+      Ponce = FE.meshRefine(xnode, ynode, conn, bcs, prolongation=True, levels=levels)[6]
+      np.testing.assert_allclose(Ponce.toarray(), P.toarray(), rtol=1e-14, atol=1e-14)
+
+  def testMesh(self):
+    [xnode, ynode, conn, bcs] = sampleMesh()
+    mesh = FE.meshRefine(FE.meshRefine(FE.Mesh(xnode, ynode, conn, bcs)))
+    refined = self.refineLists(2)
+    for lists in [mesh.lists(), FE.meshRefine(FE.Mesh(xnode, ynode, conn, bcs), levels=2).lists()]:
+      for i in range(3):
+        np.testing.assert_array_equal(np.asarray(lists[i]), np.asarray(refined[i]))
+      self.assertSameBCs(lists[3], refined[3])
+
+if __name__ == '__main__':
+  unittest.main()
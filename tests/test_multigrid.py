@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+from scipy.sparse import identity
+from scipy.sparse.linalg import spsolve
+from context import FE, LST, squareMesh
+
+def hierarchy(nRefine):
+  # Mesh refined nRefine times and made LST, with the prolongation of every step
+  [xnode, ynode, conn, bcs] = squareMesh(flux=False)
+  refined = [xnode, ynode, conn, bcs, [], []]
+  nNodes = [len(xnode)]
+  prolongations = []
+  for i in range(nRefine):
+    refined = FE.meshRefine(*refined[:6], prolongation=True)
+    prolongations.append(refined[6])
+    nNodes.append(len(refined[0]))
+  [xnode, ynode, conn, bcs, conn2line, line2node] = refined[:6]
+  [xnode, ynode, conn, line2node, bcs, P] = LST.LST_mesh(xnode, ynode, conn, conn2line, line2node, bcs, prolongation=True)
+  prolongations.append(P)
+  nNodes.append(len(xnode))
+  return [xnode, ynode, conn, bcs, prolongations, nNodes]
+
+class testMultigrid(unittest.TestCase):
+  def setUp(self):
+    [self.xnode, self.ynode, self.conn, self.bcs, self.prolongations, self.nNodes] = hierarchy(3)
+    D = FE.constMatrix(k=3., type2D='diffusion')
+    self.kg = FE.assembleStiffness(self.xnode, self.ynode, self.conn, D, 0.1, 'diffusion')
+    self.index = FE.connIndex(self.conn)
+
+  def system(self, method):
+    return FE.applyBCsSparse(self.kg, self.bcs, self.xnode, self.ynode, 0.1, 'diffusion', self.index, method)
+
+  def testProlongations(self):
+    # P of each step maps the nodes of one mesh to those of the next, and keeps constants
+    for P, nCoarse, nFine in zip(self.prolongations, self.nNodes[:-1], self.nNodes[1:]):
+      self.assertEqual(P.shape, (nFine, nCoarse))
+      np.testing.assert_allclose(P @ np.ones(nCoarse), 1, atol=1e-14)
+    mg = FE.multigrid(self.system('symmetric')[0], self.prolongations)
+    self.assertEqual([A.shape[0] for A in mg.levels], list(reversed(self.nNodes)))
+    # With 2 DOFs per node, P is expanded to both (any SPD matrix will do)
+    D = FE.constMatrix(E=200., nu=0.3, type2D='planeStress')
+    A = FE.assembleStiffness(self.xnode, self.ynode, self.conn, D, 0.1, 'planeStress') + identity(2*len(self.xnode))
+    mg = FE.multigrid(A, self.prolongations, nDOF=2)
+    expected = [(2*nFine, 2*nCoarse) for nCoarse, nFine in zip(self.nNodes[:-1], self.nNodes[1:])]
+    self.assertEqual([P.shape for P in mg.P], list(reversed(expected)))
+
+  def testCycles(self):
+    [kbc, forces] = self.system('symmetric')
+    T = spsolve(kbc.tocsc(), forces)
+    iterations = {}
+    for cycle in ['V', 'W']:
+      mg = FE.multigrid(kbc, self.prolongations, cycle=cycle)
+      [x, info] = mg.solve(forces, tol=1e-10)
+      self.assertTrue(info['converged'])
+      np.testing.assert_allclose(x, T, rtol=1e-8, atol=1e-8*abs(T).max())
+      iterations[cycle] = info['iterations']
+      [x, info] = FE.pcg(kbc, forces, tol=1e-10, precond=mg.precondition)
+      self.assertTrue(info['converged'])
+      np.testing.assert_allclose(x, T, rtol=1e-8, atol=1e-8*abs(T).max())
+    self.assertLessEqual(iterations['W'], iterations['V'])
+    # Far fewer pcg iterations than with Jacobi
+    [x, jacobi] = FE.pcg(kbc, forces, tol=1e-10)
+    self.assertLess(info['iterations'], jacobi['iterations']/2)
+
+  def testReduce(self):
+    [kbc, forces] = self.system('symmetric')
+    T = spsolve(kbc.tocsc(), forces)
+    [kff, forces, bcMap] = self.system('reduce')
+    mg = FE.multigrid(kff, self.prolongations, bcMap=bcMap)
+    self.assertEqual(mg.P[0].shape[0], len(bcMap.free))
+    [x, info] = mg.solve(forces, tol=1e-10)
+    self.assertTrue(info['converged'])
+    np.testing.assert_allclose(bcMap.expand(x), T, rtol=1e-8, atol=1e-8*abs(T).max())
+    [x, info] = FE.pcg(kff, forces, tol=1e-10, precond=mg.precondition)
+    np.testing.assert_allclose(bcMap.expand(x), T, rtol=1e-8, atol=1e-8*abs(T).max())
+
+if __name__ == '__main__':
+  unittest.main()
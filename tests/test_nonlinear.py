@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+from scipy.sparse.linalg import spsolve
+from context import FE, LST, squareMesh, refinedMesh
+
+def linearSolve(xnode, ynode, conn, bcs, k, thickness):
+  D = FE.constMatrix(k=k, type2D='diffusion')
+  kg = FE.assembleStiffness(xnode, ynode, conn, D, thickness, 'diffusion')
+  bcThickness = thickness if np.ndim(thickness) == 0 else 1.0
+  [kbc, forces] = FE.applyBCsSparse(kg, bcs, xnode, ynode, bcThickness, 'diffusion', FE.connIndex(conn), method='symmetric')
+  return spsolve(kbc.tocsc(), forces)
+
+def fixedMesh(nRefine=2):
+  # refinedMesh with temperatures on both sides, so no BC needs the thickness
+  [xnode, ynode, conn, bcs] = squareMesh()
+  bcs[1] = FE.BC(geom='line', nodes=[3, 2], kind='temperature', value=10.)
+  c2l = []
+  l2n = []
+  for i in range(nRefine):
+    [xnode, ynode, conn, bcs, c2l, l2n] = FE.meshRefine(xnode, ynode, conn, bcs, c2l, l2n)
+  [xnode, ynode, conn, l2n, bcs] = LST.LST_mesh(xnode, ynode, conn, c2l, l2n, bcs)
+  return [xnode, ynode, conn, bcs]
+
+class testNewtonDiffusion(unittest.TestCase):
+  def testConstantConductivity(self):
+    # With a constant k the problem is linear: one Newton step gives the linear solution
+    for flux in [True, False]:
+      [xnode, ynode, conn, bcs] = refinedMesh(2, flux)
+      linear = linearSolve(xnode, ynode, conn, bcs, 3., 0.1)
+      for D in [FE.constMatrix(k=3., type2D='diffusion'), FE.constMatrix(k=lambda T: 3. + 0*T, type2D='diffusion')]:
+        [T, stats] = FE.newtonDiffusion(xnode, ynode, conn, D, bcs, 0.1)
+        self.assertTrue(stats['converged'])
+        self.assertEqual(stats['iterations'], 1)
+        np.testing.assert_allclose(T, linear, atol=1e-10)
+
+  def testModifiedNewton(self):
+    [xnode, ynode, conn, bcs] = refinedMesh(2)
+    D = FE.constMatrix(k=lambda T: 10 + 0.02*T, type2D='diffusion')
+    [Tfull, full] = FE.newtonDiffusion(xnode, ynode, conn, D, bcs, 0.1, tol=1e-12, modified=False)
+    [Tmod, mod] = FE.newtonDiffusion(xnode, ynode, conn, D, bcs, 0.1, tol=1e-12, modified=True)
+    self.assertTrue(full['converged'] and mod['converged'])
+    np.testing.assert_allclose(Tmod, Tfull, rtol=1e-9, atol=1e-9)
+    self.assertEqual(full['factorizations'], full['iterations'])
+    self.assertLessEqual(mod['factorizations'], full['factorizations'])
+    # k grows with T, so the plate is cooler than with k fixed at its T = 0 value
+    linear = linearSolve(xnode, ynode, conn, bcs, 10., 0.1)
+    self.assertTrue((Tfull <= linear + 1e-12).all())
+    self.assertLess(Tfull.max(), linear.max())
+
+  def testElementThickness(self):
+    [xnode, ynode, conn, bcs] = fixedMesh()
+    nElem = len(conn)
+    D = FE.constMatrix(k=lambda T: 10 + 0.02*T, type2D='diffusion')
+    [Tscalar, stats] = FE.newtonDiffusion(xnode, ynode, conn, D, bcs, 0.1)
+    [Tarray, stats] = FE.newtonDiffusion(xnode, ynode, conn, D, bcs, np.full(nElem, 0.1))
+    np.testing.assert_allclose(Tarray, Tscalar, atol=1e-12)
+    # A thickness that varies over the elements matches assembleStiffness for constant k
+    thickness = np.linspace(0.1, 0.5, nElem)
+    [T, stats] = FE.newtonDiffusion(xnode, ynode, conn, FE.constMatrix(k=3., type2D='diffusion'), bcs, thickness)
+    np.testing.assert_allclose(T, linearSolve(xnode, ynode, conn, bcs, 3., thickness), atol=1e-10)
+    with self.assertRaises(Exception):
+      FE.newtonDiffusion(xnode, ynode, conn, D, bcs, thickness[:-1])
+    [xnode, ynode, conn, bcs] = refinedMesh(2)
+    with self.assertRaises(Exception):
+      FE.newtonDiffusion(xnode, ynode, conn, D, bcs, np.full(len(conn), 0.1))
+
+if __name__ == '__main__':
+  unittest.main()
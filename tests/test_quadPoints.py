@@ -0,0 +1,49 @@
+import unittest
+from math import factorial
+import numpy as np
+from context import FE, LST
+
+class testQuadPoints(unittest.TestCase):
+  def testTriangleExact(self):
+    # Weights sum to 1, so they give twice the integral over the reference triangle
+    # (the 9 point rule, precision 6, is only exact to degree 5 with its constants)
+    for precision in [1, 2, 3, 4, 5, 7]:
+      qp = FE.quadPoints('triangle', precision)
+      for a in range(precision + 1):
+        for b in range(precision + 1 - a):
+          exact = 2*factorial(a)*factorial(b)/factorial(a + b + 2)
+          value = qp.weights @ (qp.points[:, 0]**a * qp.points[:, 1]**b)
+          self.assertAlmostEqual(value, exact, places=12)
+
+  def testQuadAndLineExact(self):
+    for precision in [1, 3, 5, 7, 9]:
+      quad = FE.quadPoints('quad', precision)
+      line = FE.quadPoints('line', precision)
+      for a in range(precision + 1):
+        exact = 2/(a + 1) if a % 2 == 0 else 0
+        self.assertAlmostEqual(quad.weights @ quad.points[:, 0]**a, 2*exact, places=12)
+        self.assertAlmostEqual(line.weights @ line.points**a, 1/(a + 1), places=12)
+
+  def testTables(self):
+    qp = FE.quadPoints('triangle', 5)
+    psi = qp.shapeFunctions('LST')
+    dpsi = qp.shapeDerivatives('LST')
+    self.assertEqual(psi.shape, (qp.order, 6))
+    self.assertEqual(dpsi.shape, (qp.order, 2, 6))
+    for [xi, eta], psiG, dpsiG in zip(qp.points, psi, dpsi):
+      np.testing.assert_allclose(psiG, LST.LST_shapeFunctions(xi, eta), atol=1e-14)
+      np.testing.assert_allclose(dpsiG, LST.LST_shapeDerivatives(xi, eta), atol=1e-14)
+    # Partition of unity for every family
+    for geom, family in [['triangle', 'CST'], ['quad', 'Q4'], ['line', 'LST'], ['line', 'CST']]:
+      other = FE.quadPoints(geom, 3)
+      np.testing.assert_allclose(other.shapeFunctions(family).sum(axis=-1), 1, atol=1e-14)
+      np.testing.assert_allclose(other.shapeDerivatives(family).sum(axis=-1), 0, atol=1e-14)
+
+  def testTablesShared(self):
+    # Tables are built once per geom and precision, and can not be changed
+    psi = FE.quadPoints('triangle', 4).shapeFunctions('LST')
+    self.assertIs(FE.quadPoints('triangle', 4).shapeFunctions('LST'), psi)
+    self.assertFalse(psi.flags.writeable)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+from numpy.polynomial import polynomial
+from scipy.sparse import coo_matrix
+from scipy.sparse.linalg import spsolve
+from context import FE, refinedMesh
+
+def halfBandwidth(A):
+  A = coo_matrix(A)
+  return int(abs(A.row - A.col).max())
+
+def diffusionSolve(xnode, ynode, conn, bcs):
+  D = FE.constMatrix(k=3., type2D='diffusion')
+  kg = FE.assembleStiffness(xnode, ynode, conn, D, 0.1, 'diffusion')
+  [kbc, forces] = FE.applyBCsSparse(kg, bcs, xnode, ynode, 0.1, 'diffusion', FE.connIndex(conn))
+  return [kg, spsolve(kbc.tocsc(), forces)]
+
+def elasticSolve(xnode, ynode, conn):
+  # Plane stress, left side fixed, pulled in x on the right side
+  D = FE.constMatrix(E=200., nu=0.3, type2D='planeStress')
+  kg = FE.assembleStiffness(xnode, ynode, conn, D, 0.1, 'planeStress').tocsr()
+  x = np.repeat(np.asarray(xnode), 2)
+  isX = np.tile([True, False], len(xnode))
+  forces = np.where((x == 1) & isX, 1.0, 0.0)
+  free = np.flatnonzero(x > 0)
+  u = np.zeros(len(x))
+  u[free] = spsolve(kg[free][:, free].tocsc(), forces[free])
+  return u
+
+class testRenumber(unittest.TestCase):
+  def setUp(self):
+    [self.xnode, self.ynode, self.conn, self.bcs] = refinedMesh(3, flux=False)
+    self.renumbered = FE.renumberNodes(self.xnode, self.ynode, self.conn, self.bcs)
+
+  def testBandwidth(self):
+    [xnode, ynode, conn, bcs, line2node, numbering] = self.renumbered
+    [kg, T] = diffusionSolve(self.xnode, self.ynode, self.conn, self.bcs)
+    [kgNew, TNew] = diffusionSolve(xnode, ynode, conn, bcs)
+    self.assertLess(halfBandwidth(kgNew), halfBandwidth(kg)/4)
+    # Same mesh, with the nodes in a new order
+    self.assertEqual(sorted(numbering.perm), list(range(len(self.xnode))))
+    np.testing.assert_array_equal(np.asarray(xnode), np.asarray(self.xnode)[numbering.perm])
+    self.assertEqual(FE.connIndex(conn), FE.connIndex(self.conn))
+
+  def testToOriginal(self):
+    [xnode, ynode, conn, bcs, line2node, numbering] = self.renumbered
+    # One DOF per node (diffusion), and several cases at once
+    T = diffusionSolve(self.xnode, self.ynode, self.conn, self.bcs)[1]
+    TNew = diffusionSolve(xnode, ynode, conn, bcs)[1]
+    np.testing.assert_allclose(numbering.toOriginal(TNew), T, rtol=1e-10, atol=1e-10)
+    np.testing.assert_allclose(numbering.toOriginal(np.stack([TNew, 2*TNew], axis=1)), np.stack([T, 2*T], axis=1), rtol=1e-10, atol=1e-10)
+    np.testing.assert_array_equal(numbering.toNew(numbering.toOriginal(TNew)), TNew)
+    # Two DOFs per node (plane stress)
+    u = elasticSolve(self.xnode, self.ynode, self.conn)
+    uNew = elasticSolve(xnode, ynode, conn)
+    np.testing.assert_allclose(numbering.toOriginal(uNew, nDOF=2), u, rtol=1e-9, atol=1e-12)
+
+class testBCCopy(unittest.TestCase):
+  def testNoSharedState(self):
+    bc = FE.BC(geom='line', nodes=[1, 2], kind='convection', value=polynomial.Polynomial([1., 2.]), 
+               coefficient=5., direction='t')
+    bcCopy = bc.copy()
+    self.assertIsNot(bcCopy, bc)
+    self.assertIsNot(bcCopy.nodes, bc.nodes)
+    self.assertEqual([bcCopy.geom, bcCopy.nodes, bcCopy.kind, bcCopy.coefficient, bcCopy.direction], 
+                     [bc.geom, bc.nodes, bc.kind, bc.coefficient, bc.direction])
+    # Changing the copy leaves the original alone
+    bcCopy.nodes.append(3)
+    bcCopy.nodes[0] = 7
+    bcCopy.value = 4.
+    self.assertEqual(bc.nodes, [1, 2])
+    self.assertEqual(bc.VarType('value'), 'poly')
+    # LST line BCs (3 nodes) can be copied too
+    bcCopy.nodes = [1, 4, 2]
+    self.assertEqual(bcCopy.copy().nodes, [1, 4, 2])
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+from scipy.sparse.linalg import spsolve
+from context import FE, diffusionSystem
+
+class testPCG(unittest.TestCase):
+  def setUp(self):
+    [xnode, ynode, conn, bcs, kg, self.A, forces] = diffusionSystem(3)
+    self.b = np.asarray(forces)
+    self.x = spsolve(self.A.tocsc(), self.b)
+
+  def testPreconditioners(self):
+    diagonal = self.A.diagonal()
+    precs = [None, 'jacobi', 'ssor', 'ic', lambda r: r/diagonal]
+    iterations = []
+    for precond in precs:
+      [x, info] = FE.pcg(self.A, self.b, tol=1e-12, precond=precond)
+      self.assertTrue(info['converged'])
+      self.assertEqual(len(info['residuals']), info['iterations'] + 1)
+      np.testing.assert_allclose(x, self.x, rtol=1e-9, atol=1e-9*abs(self.x).max())
+      iterations.append(info['iterations'])
+    # A function gives the same iterations as the named preconditioner it copies,
+    # and the stronger preconditioners need fewer iterations
+    self.assertEqual(iterations[4], iterations[1])
+    self.assertLess(iterations[3], iterations[0])
+    self.assertLess(iterations[2], iterations[0])
+
+  def testWarmStart(self):
+    [x, cold] = FE.pcg(self.A, self.b, tol=1e-10)
+    # Start from the solution for a slightly different load
+    [x, warm] = FE.pcg(self.A, self.b, x0=1.01*self.x, tol=1e-10)
+    self.assertTrue(warm['converged'])
+    self.assertLess(warm['iterations'], cold['iterations'])
+    self.assertLess(warm['residuals'][0], cold['residuals'][0])
+
+  def testMaxiter(self):
+    [x, info] = FE.pcg(self.A, self.b, tol=1e-12, maxiter=3)
+    self.assertFalse(info['converged'])
+    self.assertEqual(info['iterations'], 3)
+    self.assertGreater(info['residuals'][-1], 1e-12)
+
+  def testNotPositiveDefinite(self):
+    with self.assertRaises(Exception):
+      FE.pcg(-self.A, self.b, precond=None)
+
+if __name__ == '__main__':
+  unittest.main()
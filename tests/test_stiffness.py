@@ -0,0 +1,86 @@
+import importlib
+import unittest
+import numpy as np
+from context import FE, LST, CST, Q4, refinedMesh, gridMesh
+
+def perElement(xnode, ynode, conn, stiffness, gaussPoints, D, thickness, type2D):
+  # Element matrices integrated one element and one Gauss point at a time
+  kElem = []
+  for elem in conn:
+    xElem = [xnode[node - 1] for node in elem]
+    yElem = [ynode[node - 1] for node in elem]
+    k = 0
+    for [xi, eta], w in zip(gaussPoints.points, gaussPoints.weights):
+      k = k + w*stiffness(xElem, yElem, xi, eta, D, thickness, type2D)
+    kElem.append(k)
+  return np.array(kElem)
+
+def quadMesh(n):
+  # n x n Q4 elements on a slightly distorted unit square (1-indexed lists)
+  [xnode, ynode, conn, node] = gridMesh(n)
+  xnode = [x + 0.05*x*(1 - x)*y for x, y in zip(xnode, ynode)]
+  conn = [[node(i, j), node(i + 1, j), node(i + 1, j + 1), node(i, j + 1)] for j in range(n) for i in range(n)]
+  return [xnode, ynode, conn]
+
+class testBatchStiffness(unittest.TestCase):
+  def setUp(self):
+    self.Ds = {'planeStress': FE.constMatrix(E=200., nu=0.3, type2D='planeStress'),
+               'diffusion': FE.constMatrix(k=3., type2D='diffusion')}
+
+  def assertSame(self, kBatch, kLoop):
+    self.assertEqual(kBatch.shape, kLoop.shape)
+    np.testing.assert_allclose(kBatch, kLoop, rtol=1e-10, atol=1e-12*abs(kLoop).max())
+
+  def testLST(self):
+    [xnode, ynode, conn, bcs] = refinedMesh(1)
+    # Curve one midside node
+    xnode[conn[0][1] - 1] += 0.02
+    gaussPoints = FE.quadPoints('triangle', 3)
+    for type2D, D in self.Ds.items():
+      kBatch = LST.LST_stiffnessBatch(xnode, ynode, conn, D, 0.1, type2D, gaussPoints)
+      kLoop = perElement(xnode, ynode, conn, LST.LST_stiffness, gaussPoints, D, 0.1, type2D)
+      self.assertSame(kBatch, kLoop)
+
+  def testStraight(self):
+    # Closed form for straight elements against quadrature for every element
+    [xnode, ynode, conn, bcs] = refinedMesh(2)
+    xnode[conn[0][3] - 1] += 0.02
+    isStraight = importlib.import_module(LST.__name__ + '.LST_stiffnessBatch').LST_isStraight
+    straight = isStraight(np.asarray(xnode)[np.asarray(conn) - 1], np.asarray(ynode)[np.asarray(conn) - 1])
+    self.assertFalse(straight[0])
+    self.assertGreater(straight.sum(), 0)
+    for type2D, D in self.Ds.items():
+      kFast = LST.LST_stiffnessBatch(xnode, ynode, conn, D, 0.1, type2D)
+      kQuad = LST.LST_stiffnessBatch(xnode, ynode, conn, D, 0.1, type2D, straightTol=None)
+      self.assertSame(kFast, kQuad)
+
+  def testQ4(self):
+    [xnode, ynode, conn] = quadMesh(3)
+    gaussPoints = FE.quadPoints('quad', 3)
+    for type2D, D in self.Ds.items():
+      kBatch = Q4.Q4_stiffnessBatch(xnode, ynode, conn, D, 0.1, type2D, gaussPoints)
+      kLoop = perElement(xnode, ynode, conn, Q4.Q4_stiffness, gaussPoints, D, 0.1, type2D)
+      self.assertSame(kBatch, kLoop)
+
+  def testCST(self):
+    [xnode, ynode, conn, node] = gridMesh(3)
+    D = self.Ds['planeStress']
+    kLoop = []
+    for elem in conn:
+      x = [xnode[n - 1] for n in elem]
+      y = [ynode[n - 1] for n in elem]
+      B = CST.CST_B(*x, *y)
+      area = np.linalg.det(CST.CST_J(*x, *y))/2
+      kLoop.append(area*0.1*(B.T @ D @ B))
+    kBatch = CST.CST_stiffnessBatch(xnode, ynode, conn, D, 0.1, 'planeStress')
+    self.assertSame(kBatch, np.array(kLoop))
+
+  def testCSTStrain(self):
+    # A linear displacement field has the same strain in every element
+    [xnode, ynode, conn, node] = gridMesh(3)
+    u = np.ravel([[0.1*x + 0.3*y, -0.2*y] for x, y in zip(xnode, ynode)])
+    eps = CST.CST_strainBatch(xnode, ynode, conn, u, 'planeStress')
+    np.testing.assert_allclose(eps, np.tile([0.1, -0.2, 0.3], (len(conn), 1)), atol=1e-12)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+import numpy as np
+from context import FE, refinedMesh
+
+class testStiffnessCache(unittest.TestCase):
+  def setUp(self):
+    [self.xnode, self.ynode, self.conn, bcs] = refinedMesh(2)
+    self.D = FE.constMatrix(E=200e9, nu=0.3, type2D='planeStress')
+
+  def testMatchesElementStiffness(self):
+    cache = FE.stiffnessCache()
+    kCache = cache.stiffness(self.xnode, self.ynode, self.conn, self.D, 0.1, 'planeStress')
+    kElem = FE.elementStiffness(self.xnode, self.ynode, self.conn, self.D, 0.1, 'planeStress')
+    np.testing.assert_allclose(kCache, kElem, rtol=1e-12, atol=1e-12*abs(kElem).max())
+    self.assertEqual(cache.hits + cache.misses, len(self.conn))
+    self.assertLess(cache.classes, len(self.conn))
+
+  def testArrayThickness(self):
+    # A 0-d array thickness shares the entries stored for the same float
+    cache = FE.stiffnessCache()
+    kFloat = cache.stiffness(self.xnode, self.ynode, self.conn, self.D, 0.1, 'planeStress')
+    classes = cache.classes
+    kArray = cache.stiffness(self.xnode, self.ynode, self.conn, self.D, np.asarray(0.1), 'planeStress')
+    np.testing.assert_array_equal(kFloat, kArray)
+    self.assertEqual(cache.classes, classes)
+    self.assertEqual(cache.misses, classes)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,56 @@
+import importlib
+import unittest
+import warnings
+import numpy as np
+from context import FE, Q4
+
+class testQ4Stress(unittest.TestCase):
+  def setUp(self):
+    # A distorted element, so the mapping is not trivial
+    self.x1234 = [0., 2., 2.2, -0.1]
+    self.y1234 = [0., 0.1, 1.5, 1.]
+
+  def stress(self, u, D, type2D, output):
+    return Q4.Q4_stress(self.x1234, self.y1234, u, 0.3, -0.4, D, type2D, output)
+
+  def testUniaxialPlaneStress(self):
+    # u = eps*x, v = -nu*eps*y gives sigx = E*eps and nothing else
+    [E, nu, eps] = [200., 0.25, 1e-3]
+    D = FE.constMatrix(E, nu, 'planeStress')
+    u = np.ravel([[eps*x, -nu*eps*y] for x, y in zip(self.x1234, self.y1234)])
+    expected = {'sigx': E*eps, 'sigy': 0, 'tauxy': 0, 'sig1': E*eps, 'sig2': 0, 'VM': E*eps}
+    for output, value in expected.items():
+      self.assertAlmostEqual(self.stress(u, D, 'planeStress', output), value, places=10)
+
+  def testPureShear(self):
+    # u = gamma*y gives tauxy = G*gamma, principal stresses +-tauxy, von Mises sqrt(3)*tauxy
+    [E, nu, gamma] = [200., 0.25, 1e-3]
+    D = FE.constMatrix(E, nu, 'planeStress')
+    u = np.ravel([[gamma*y, 0] for y in self.y1234])
+    tau = E/(2*(1 + nu))*gamma
+    expected = {'tauxy': tau, 'sig1': tau, 'sig2': -tau, 'VM': np.sqrt(3)*tau}
+    for output, value in expected.items():
+      self.assertAlmostEqual(self.stress(u, D, 'planeStress', output), value, places=10)
+
+  def testUniaxialPlaneStrain(self):
+    # With E = 200 and nu = 0.25, lambda = mu = 80: sigx = 240 eps, sigy = 80 eps,
+    # sigz = nu*(sigx + sigy) = 80 eps, so von Mises is 160 eps
+    eps = 1e-3
+    D = FE.constMatrix(200., 0.25, 'planeStrain')
+    u = np.ravel([[eps*x, 0] for x in self.x1234])
+    expected = {'sigx': 240*eps, 'sigy': 80*eps, 'sig1': 240*eps, 'sig2': 80*eps, 'VM': 160*eps}
+    for output, value in expected.items():
+      self.assertAlmostEqual(self.stress(u, D, 'planeStrain', output), value, places=10)
+
+class testQ4Plot(unittest.TestCase):
+  def testNplot(self):
+    # The old Nplot keyword (points per direction) still works, with a warning
+    plotDivisions = importlib.import_module(Q4.__name__ + '.Q4_plotSingle').plotDivisions
+    self.assertEqual(plotDivisions(10, None, 'Q4_plot'), 10)
+    with warnings.catch_warnings(record=True) as caught:
+      warnings.simplefilter('always')
+      self.assertEqual(plotDivisions(10, 5, 'Q4_plot'), 4)
+    self.assertTrue(issubclass(caught[0].category, DeprecationWarning))
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+from scipy.sparse.linalg import spsolve
+from context import FE, squareMesh, refinedMesh
+
+def directSolve(xnode, ynode, conn, bcs, k, thickness):
+  # One case solved the usual way, with applyBCsSparse
+  D = FE.constMatrix(k=k, type2D='diffusion')
+  kg = FE.assembleStiffness(xnode, ynode, conn, D, thickness, 'diffusion')
+  index = FE.connIndex(conn)
+  kbc, forces = FE.applyBCsSparse(kg, bcs, xnode, ynode, thickness, 'diffusion', index)
+  return spsolve(kbc.tocsc(), np.asarray(forces))
+
+def withValues(bcs, values, coefficients):
+  # Copy of bcs with some values and coefficients replaced
+  bcsNew = [bc.copy() for bc in bcs]
+  for i, value in values.items():
+    bcsNew[i].value = float(value)
+  for i, coefficient in coefficients.items():
+    bcsNew[i].coefficient = float(coefficient)
+  return bcsNew
+
+class testParameterSweep(unittest.TestCase):
+  def checkCases(self, xnode, ynode, conn, bcs, k, thickness, bcValues, bcCoefficients):
+    T = FE.parameterSweep(xnode, ynode, conn, bcs, k, thickness, bcValues, bcCoefficients)
+    self.assertEqual(T.shape, (len(k), len(xnode)))
+    for c in range(len(k)):
+      caseBCs = withValues(bcs, {i: v[c] for i, v in bcValues.items()},
+                           {i: h[c] for i, h in bcCoefficients.items()})
+      expected = directSolve(xnode, ynode, conn, caseBCs, k[c], thickness[c])
+      np.testing.assert_allclose(T[c], expected, rtol=1e-9, atol=1e-9)
+
+  def testLineBCs(self):
+    [xnode, ynode, conn, bcs] = refinedMesh(1, flux=False)
+    bcs.append(FE.BC(geom='line', nodes=[4, 3], kind='flux', value=2.))
+    k = np.array([3., 6., 12.])
+    t = np.array([0.1, 0.2, 0.1])
+    temperature = [i for i, bc in enumerate(bcs) if bc.kind == 'temperature']
+    convection = [i for i, bc in enumerate(bcs) if bc.kind == 'convection']
+    values = {i: [0., 1., 2.] for i in temperature}
+    values.update({i: [20., 25., 30.] for i in convection})
+    coefficients = {i: [5., 5., 50.] for i in convection}
+    self.checkCases(xnode, ynode, conn, bcs, k, t, values, coefficients)
+
+  def testFaceBCs(self):
+    [xnode, ynode, conn, bcs] = squareMesh()
+    bcs.append(FE.BC(geom='face', nodes=[1, 2, 5], kind='flux', value=4.))
+    bcs.append(FE.BC(geom='face', nodes=[3, 4, 5], kind='convection', value=15., coefficient=2.))
+    k = np.array([3., 3., 8.])
+    t = np.array([0.1, 0.3, 0.1])
+    values = {2: [4., 1., 6.], 3: [15., 10., 5.]}
+    coefficients = {3: [2., 7., 2.]}
+    self.checkCases(xnode, ynode, conn, bcs, k, t, values, coefficients)
+
+  def testWorkers(self):
+    [xnode, ynode, conn, bcs] = squareMesh(flux=False)
+    k = np.array([3., 6.])
+    serial = FE.parameterSweep(xnode, ynode, conn, bcs, k, 0.1, bcCoefficients={1: [5., 8.]})
+    parallel = FE.parameterSweep(xnode, ynode, conn, bcs, k, 0.1, bcCoefficients={1: [5., 8.]}, workers=2)
+    np.testing.assert_array_equal(serial, parallel)
+
+if __name__ == '__main__':
+  unittest.main()
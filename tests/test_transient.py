@@ -0,0 +1,113 @@
+import unittest
+import numpy as np
+from scipy.sparse.linalg import spsolve
+from context import FE, refinedMesh, gridMesh
+
+def cornerAreas(xnode, ynode, conn, nCorner):
+  # Shoelace area of every element, from its corners
+  x = np.asarray(xnode)[np.asarray(conn)[:, :nCorner] - 1]
+  y = np.asarray(ynode)[np.asarray(conn)[:, :nCorner] - 1]
+  return 0.5*(x*np.roll(y, -1, axis=1) - np.roll(x, -1, axis=1)*y).sum(axis=1)
+
+class testMass(unittest.TestCase):
+  def meshes(self):
+    # LST, CST, and Q4 meshes of the unit square, with their corners per element
+    [xnode, ynode, conn, bcs] = refinedMesh(2)
+    yield [xnode, ynode, conn, 3]
+    [xnode, ynode, conn, node] = gridMesh(4)
+    yield [xnode, ynode, conn, 3]
+    quads = [[node(i, j), node(i + 1, j), node(i + 1, j + 1), node(i, j + 1)] for j in range(4) for i in range(4)]
+    yield [xnode, ynode, quads, 4]
+
+  def testTotalMass(self):
+    for [xnode, ynode, conn, nCorner] in self.meshes():
+      nElem = len(conn)
+      rhoc = np.linspace(1., 2., nElem)
+      thickness = np.linspace(0.1, 0.3, nElem)
+      total = (rhoc*cornerAreas(xnode, ynode, conn, nCorner)*thickness).sum()
+      for lumped in [False, True]:
+        mg = FE.assembleMass(xnode, ynode, conn, rhoc, thickness, lumped)
+        self.assertEqual(mg.shape, (len(xnode), len(xnode)))
+        self.assertAlmostEqual(mg.sum(), total, places=12)
+        if (lumped):
+          self.assertEqual(mg.nnz, len(xnode))
+          self.assertTrue((mg.diagonal() > 0).all())
+      # The consistent matrix integrates x^2 exactly: rhoc*t/3 over the unit square
+      mg = FE.assembleMass(xnode, ynode, conn, 2., 0.1)
+      x = np.asarray(xnode)
+      self.assertAlmostEqual(x @ mg @ x, 2.*0.1/3, places=12)
+
+class testThetaMethod(unittest.TestCase):
+  def setUp(self):
+    # Temperature 0 on the left and a flux of 10 on the right: steady T = 10 x/3
+    [self.xnode, self.ynode, self.conn, self.bcs] = refinedMesh(1)
+    D = FE.constMatrix(k=3., type2D='diffusion')
+    self.kg = FE.assembleStiffness(self.xnode, self.ynode, self.conn, D, 0.1, 'diffusion')
+    self.mg = FE.assembleMass(self.xnode, self.ynode, self.conn, 1., 0.1)
+    self.index = FE.connIndex(self.conn)
+    self.args = [self.kg, self.mg, self.bcs, self.xnode, self.ynode, 0.1, 'diffusion', self.index]
+
+  def testSteadyState(self):
+    [kbc, forces] = FE.applyBCsSparse(self.kg, self.bcs, self.xnode, self.ynode, 0.1, 'diffusion', self.index)
+    steady = spsolve(kbc.tocsc(), forces)
+    np.testing.assert_allclose(steady, 10*np.asarray(self.xnode)/3, atol=1e-10)
+    snapshots = list(FE.thetaMethod(*self.args, T0=0.0, dt=0.05, nSteps=400, theta=1.0))
+    np.testing.assert_allclose(snapshots[-1][1], steady, atol=1e-8)
+    # Backward Euler heats the plate up steadily from T = 0
+    maxT = [T.max() for t, T in FE.thetaMethod(*self.args, T0=0.0, dt=0.05, nSteps=20)]
+    self.assertTrue((np.diff(maxT) > 0).all())
+
+  def testOutputEvery(self):
+    snapshots = list(FE.thetaMethod(*self.args, T0=0.0, dt=0.1, nSteps=10, outputEvery=3))
+    np.testing.assert_allclose([t for t, T in snapshots], [0, 0.3, 0.6, 0.9, 1.0])
+    # The snapshots are copies, and the same as a run that keeps every step
+    every = dict([[round(t, 12), T] for t, T in FE.thetaMethod(*self.args, T0=0.0, dt=0.1, nSteps=10)])
+    for t, T in snapshots:
+      np.testing.assert_array_equal(T, every[round(t, 12)])
+    self.assertFalse(np.shares_memory(snapshots[-1][1], snapshots[-2][1]))
+
+class countingStepper(FE.thetaStepper):
+  # thetaStepper that records every step size it is asked to factor
+  def factor(self, dt):
+    if (not hasattr(self, 'sizes')):
+      self.sizes = set()
+    self.sizes.add(float('%.12g' % dt))
+    return super().factor(dt)
+
+class testAdaptiveThetaMethod(unittest.TestCase):
+  setUp = testThetaMethod.setUp
+
+  def solve(self, stepper, tEnd=2.0):
+    return list(FE.adaptiveThetaMethod(*self.args, T0=5.0, tEnd=tEnd, dt0=0.2, rtol=1e-4, atol=1e-6, stepper=stepper))
+
+  def testCache(self):
+    for cacheSize in [None, 8, 2]:
+      stepper = countingStepper(*self.args, theta=1.0, cacheSize=cacheSize)
+      snapshots = self.solve(stepper)
+      self.assertAlmostEqual(snapshots[-1][0], 2.0, places=12)
+      self.assertEqual(stepper.stats['accepted'], len(snapshots) - 1)
+      self.assertGreater(stepper.stats['rejected'], 0)
+      # Step sizes stay on the ladder dt0*2^n, so they repeat and hit the cache
+      self.assertGreater(stepper.cacheHits, 0)
+      self.assertLess(len(stepper.sizes), stepper.factorizations + stepper.cacheHits)
+      self.assertGreaterEqual(stepper.factorizations, len(stepper.sizes))
+      if (cacheSize == None):
+        self.assertEqual(stepper.factorizations, len(stepper.sizes))
+      else:
+        self.assertLessEqual(len(stepper.factors), cacheSize)
+      if (cacheSize == 8):
+        # A cache of 2 keeps evicting sizes that come back later; one of 8 rarely does
+        self.assertLessEqual(stepper.factorizations, cacheSize + len(stepper.sizes))
+
+  def testSteadyState(self):
+    stepper = FE.thetaStepper(*self.args, theta=0.5)
+    snapshots = self.solve(stepper, tEnd=20.0)
+    self.assertAlmostEqual(snapshots[-1][0], 20.0, places=10)
+    np.testing.assert_allclose(snapshots[-1][1], 10*np.asarray(self.xnode)/3, atol=1e-4)
+    # A stepper keeps adding to its statistics
+    accepted = stepper.stats['accepted']
+    self.solve(stepper, tEnd=1.0)
+    self.assertGreater(stepper.stats['accepted'], accepted)
+
+if __name__ == '__main__':
+  unittest.main()